@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+
+from users.authentication import aget_token_user
+
+
+READ_METHODS = ["GET", "HEAD"]
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_SYNC_WORKERS, thread_name_prefix="api-sync"
+)
+_compat_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_COMPAT_WORKERS, thread_name_prefix="api-compat"
+)
+
+
+def _call_sync(func, *args, **kwargs):
+    close_old_connections()
+
+    try:
+        response = func(*args, **kwargs)
+
+        if callable(getattr(response, "render", None)):
+            response = response.render()
+
+        return response
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Runs ``func`` on the bounded ``ASYNC_SYNC_WORKERS`` pool, so at most that
+    many requests hold a thread (and a database connection) at once.
+    """
+    return await sync_to_async(_call_sync, thread_sensitive=False, executor=_executor)(
+        func, *args, **kwargs
+    )
+
+
+async def run_compat(func, *args, **kwargs):
+    """
+    ``run_sync`` on the separate ``ASYNC_COMPAT_WORKERS`` pool, so whole sync
+    views offloaded by ``async_viewset_view`` can't starve the native views.
+    """
+    return await sync_to_async(
+        _call_sync, thread_sensitive=False, executor=_compat_executor
+    )(func, *args, **kwargs)
+
+
+def error_response(error: exceptions.APIException) -> JsonResponse:
+    return JsonResponse({"detail": str(error.detail)}, status=error.status_code)
+
+
+async def aauthenticate(request):
+    """
+    Token-only counterpart of the DRF authentication used by the async views.
+    Returns ``(user, key)`` or raises the same errors DRF would.
+    """
+    auth = get_authorization_header(request).split()
+
+    if not auth or auth[0].lower() != b"token" or len(auth) != 2:
+        raise exceptions.NotAuthenticated()
+
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed()
+
+    user = await aget_token_user(key)
+
+    if user is None:
+        raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+    return user, key
+
+
+def async_api_view(handler):
+    """
+    Authenticates a read request asynchronously, then hands it to
+    ``handler``. The user is forced on the request, so DRF views called
+    through ``run_sync`` do not authenticate again.
+    """
+
+    @wraps(handler)
+    async def view(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return HttpResponseNotAllowed(READ_METHODS)
+
+        try:
+            user, key = await aauthenticate(request)
+        except exceptions.APIException as error:
+            # Session authentication comes first in the sync API, so DRF
+            # answers 403 rather than 401 there; keep the same contract.
+            error.status_code = status.HTTP_403_FORBIDDEN
+
+            return error_response(error)
+
+        request.user = user
+        request._force_auth_user, request._force_auth_token = user, key
+
+        return await handler(request, *args, **kwargs)
+
+    return view
+
+
+def async_viewset_view(viewset, actions: dict):
+    """
+    Compatibility route: only authentication is async. The whole DRF view
+    then runs on a worker thread, so there is no async I/O to gain and it
+    costs a thread hop over the sync API; it exists so clients can use the
+    /api/async/ prefix for every read.
+    """
+    sync_view = viewset.as_view(actions)
+
+    @async_api_view
+    async def view(request, *args, **kwargs):
+        return await run_compat(sync_view, request, *args, **kwargs)
+
+    return view
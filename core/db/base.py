@@ -0,0 +1,47 @@
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend that applies ``OPTIONS["pragmas"]`` to every new
+    connection and opens write transactions with
+    ``BEGIN <OPTIONS["transaction_mode"]>``.
+
+    ``IMMEDIATE`` takes the write lock up front, so a transaction that reads
+    and then writes waits on ``busy_timeout`` instead of failing with
+    "database is locked" when another writer got there first.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        params.pop("transaction_mode", None)
+
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        return conn
+
+    @property
+    def pragmas(self) -> dict:
+        return self.settings_dict["OPTIONS"].get("pragmas") or {}
+
+    @property
+    def transaction_mode(self) -> str:
+        mode = self.settings_dict["OPTIONS"].get("transaction_mode") or "DEFERRED"
+
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ValueError(f"Modo de transação inválido: {mode}")
+
+        return mode.upper()
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Row layout: requests, latency sum, SQL queries, SQL seconds, response
+# bytes, then one (non-cumulative) counter per latency bucket plus +Inf.
+REQUESTS, LATENCY, QUERIES, SQL_TIME, BYTES = range(5)
+BUCKETS_START = 5
+ROW_SIZE = BUCKETS_START + len(LATENCY_BUCKETS) + 1
+
+request_sql = ContextVar("request_sql", default=None)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """
+    Permanent ``execute_wrapper`` for every connection. It only counts when
+    a request is being measured, and the context variable follows the
+    request into ``sync_to_async`` worker threads.
+    """
+    stats = request_sql.get()
+
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def install_sql_wrapper(sender=None, connection=None, **kwargs):
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+def bucket_index(duration: float) -> int:
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if duration <= bound:
+            return index
+
+    return len(LATENCY_BUCKETS)
+
+
+def merge_rows(target: dict, rows):
+    for key, row in rows:
+        total = target.setdefault(key, [0] * ROW_SIZE)
+
+        for index, value in enumerate(row):
+            total[index] += value
+
+    return target
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics. Every thread writes to its own buffer, so recording
+    takes no lock; ``snapshot`` sums the buffers. Each process periodically
+    publishes its snapshot to ``METRICS_DIR/<pid>.json`` and ``collect``
+    merges the files of all live workers.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._buffers = []
+        self._flushed_at = 0.0
+
+    def buffer(self) -> dict:
+        buffer = getattr(self._local, "buffer", None)
+
+        if buffer is None:
+            buffer = self._local.buffer = {}
+            self._buffers.append(buffer)
+
+        return buffer
+
+    def record(self, view, method, duration, queries, sql_time, size):
+        buffer = self.buffer()
+        row = buffer.get((view, method))
+
+        if row is None:
+            row = buffer[(view, method)] = [0] * ROW_SIZE
+
+        row[REQUESTS] += 1
+        row[LATENCY] += duration
+        row[QUERIES] += queries
+        row[SQL_TIME] += sql_time
+        row[BYTES] += size
+        row[BUCKETS_START + bucket_index(duration)] += 1
+
+        if time.monotonic() - self._flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def snapshot(self) -> dict:
+        rows = {}
+
+        for buffer in list(self._buffers):
+            merge_rows(rows, list(buffer.items()))
+
+        return rows
+
+    def reset(self):
+        for buffer in list(self._buffers):
+            buffer.clear()
+
+    def path(self, pid: int) -> str:
+        return os.path.join(settings.METRICS_DIR, f"{pid}.json")
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        path = self.path(os.getpid())
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        rows = [[*key, row] for key, row in self.snapshot().items()]
+
+        try:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+
+            with open(temporary, "w") as file:
+                json.dump(rows, file)
+
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+    def collect(self) -> tuple:
+        """
+        Returns ``(rows, workers)``: this process' live counters plus the
+        last published snapshot of every other live worker.
+        """
+        rows = self.snapshot()
+        workers = 1
+
+        try:
+            names = os.listdir(settings.METRICS_DIR)
+        except OSError:
+            names = []
+
+        for name in names:
+            pid = name.removesuffix(".json")
+
+            if not name.endswith(".json") or not pid.isdigit():
+                continue
+
+            if int(pid) == os.getpid():
+                continue
+
+            if not pid_alive(int(pid)):
+                try:
+                    os.remove(self.path(int(pid)))
+                except OSError:
+                    pass
+
+                continue
+
+            try:
+                with open(self.path(int(pid))) as file:
+                    published = json.load(file)
+            except (OSError, ValueError):
+                continue
+
+            merge_rows(rows, [((view, method), row) for view, method, row in published])
+            workers += 1
+
+        return rows, workers
+
+
+registry = MetricsRegistry()
+
+
+def endpoint_metrics(rows: dict) -> list:
+    endpoints = []
+
+    for (view, method), row in sorted(rows.items()):
+        requests = row[REQUESTS] or 1
+        cumulative, buckets = 0, {}
+
+        for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], row[BUCKETS_START:]):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+
+        endpoints.append(
+            {
+                "view": view,
+                "method": method,
+                "requests": row[REQUESTS],
+                "latency_seconds": {
+                    "sum": row[LATENCY],
+                    "mean": row[LATENCY] / requests,
+                    "buckets": buckets,
+                },
+                "sql_queries": row[QUERIES],
+                "sql_queries_per_request": row[QUERIES] / requests,
+                "sql_seconds": row[SQL_TIME],
+                "response_bytes": row[BYTES],
+            }
+        )
+
+    return endpoints
+
+
+def prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_labels(endpoint: dict) -> str:
+    return (
+        f'view="{prometheus_label(endpoint["view"])}",'
+        f'method="{prometheus_label(endpoint["method"])}"'
+    )
+
+
+def prometheus_text(endpoints: list) -> str:
+    counters = [
+        ("api_requests_total", "Requisições atendidas.", "requests"),
+        ("api_sql_queries_total", "Consultas SQL executadas.", "sql_queries"),
+        ("api_sql_seconds_total", "Tempo gasto em SQL.", "sql_seconds"),
+        ("api_response_bytes_total", "Bytes de resposta.", "response_bytes"),
+    ]
+    lines = []
+
+    for name, help_text, field in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+
+        for endpoint in endpoints:
+            lines.append(f"{name}{{{prometheus_labels(endpoint)}}} {endpoint[field]}")
+
+    name = "api_request_duration_seconds"
+    lines += [f"# HELP {name} Latência das requisições.", f"# TYPE {name} histogram"]
+
+    for endpoint in endpoints:
+        labels = prometheus_labels(endpoint)
+        latency = endpoint["latency_seconds"]
+
+        for bound, count in latency["buckets"].items():
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+
+        lines.append(f"{name}_sum{{{labels}}} {latency['sum']}")
+        lines.append(f"{name}_count{{{labels}}} {endpoint['requests']}")
+
+    return "\n".join(lines) + "\n"
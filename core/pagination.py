@@ -0,0 +1,134 @@
+import base64
+import binascii
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CountedPaginator(Paginator):
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if count is not None:
+            self.count = count
+
+
+class TimestampCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; sending ``?cursor=`` switches to keyset
+    pagination over ``(timestamp, id)``, which skips the count query and costs
+    the same on every page. The cursor only follows ``?ordering=`` on
+    ``timestamp``; any other ordering is rejected rather than ignored.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido."
+    cursor_orderings = {"": "-", "-timestamp": "-", "timestamp": ""}
+    invalid_ordering_message = (
+        "A paginação por cursor só aceita ordering=timestamp ou -timestamp."
+    )
+
+    def is_cursor_request(self, request) -> bool:
+        return self.cursor_query_param in request.query_params
+
+    def encode_cursor(self, timestamp, pk) -> str:
+        position = f"{timestamp.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, value: str):
+        if not value:
+            return None
+
+        try:
+            timestamp, pk = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return timestamp, pk
+
+    def get_cursor_window(self, queryset, request):
+        page_size = self.get_page_size(request)
+        ordering = request.query_params.get("ordering", "")
+
+        if ordering not in self.cursor_orderings:
+            raise ValidationError({"ordering": [self.invalid_ordering_message]})
+
+        sign = self.cursor_orderings[ordering]
+        lookup = "lt" if sign else "gt"
+
+        queryset = queryset.annotate(keyset_timestamp=F("timestamp")).order_by(
+            f"{sign}timestamp", f"{sign}id"
+        )
+        position = self.decode_cursor(request.query_params[self.cursor_query_param])
+
+        if position is not None:
+            timestamp, pk = position
+            queryset = queryset.filter(
+                Q(**{f"timestamp__{lookup}": timestamp})
+                | Q(timestamp=timestamp, **{f"id__{lookup}": pk})
+            )
+
+        return queryset[: page_size + 1]
+
+    def get_validator_state(self, queryset, request, field: str) -> dict:
+        """
+        Cheap state for conditional GETs. Page mode reuses the count for the
+        page itself; cursor mode only looks at the rows of the requested page.
+        """
+        if not self.is_cursor_request(request):
+            state = queryset.order_by().aggregate(
+                last_modified=Max(field), count=Count("pk")
+            )
+            self.known_count = state["count"]
+            return state
+
+        return self.get_cursor_window(queryset, request).aggregate(
+            last_modified=Max(field), rows=Sum("pk")
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.is_cursor_request(request)
+
+        if not self.cursor_mode:
+            self.django_paginator_class = partial(
+                CountedPaginator, count=getattr(self, "known_count", None)
+            )
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        items = list(self.get_cursor_window(queryset, request))
+        self.next_position = None
+
+        if len(items) > page_size:
+            items = items[:page_size]
+            self.next_position = (items[-1].keyset_timestamp, items[-1].pk)
+
+        return items
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(*self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+
+        return Response({"next": self.get_next_cursor_link(), "results": data})
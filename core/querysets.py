@@ -0,0 +1,92 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _collect(serializer, model, prefix: str, plan: dict):
+    serializer = getattr(serializer, "child", serializer)
+    plan["only"].append(f"{prefix}{model._meta.pk.name}")
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if isinstance(field, serializers.SerializerMethodField):
+            hint = getattr(serializer, "prefetch_method_fields", {}).get(name)
+
+            if hint:
+                lookup, queryset, to_attr, serializer_class = hint
+                related_field = model._meta.get_field(lookup).field
+                nested = None
+
+                if serializer.is_expanded(name):
+                    nested = serializer.nested_serializer(
+                        name, serializer_class, many=True
+                    )
+
+                plan["prefetch"].append(
+                    Prefetch(
+                        f"{prefix}{lookup}",
+                        queryset=plan_queryset(
+                            queryset(), nested, extra_only=[related_field.name]
+                        ),
+                        to_attr=to_attr,
+                    )
+                )
+            continue
+
+        if field.source == "*":
+            continue
+
+        attr = field.source_attrs[0] if field.source_attrs else name
+
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            continue
+
+        if not model_field.is_relation:
+            plan["only"].append(f"{prefix}{attr}")
+            continue
+
+        nested = getattr(field, "child", field)
+        nested = nested if isinstance(nested, serializers.ModelSerializer) else None
+
+        if model_field.many_to_many or model_field.one_to_many:
+            extra_only = [model_field.field.name] if model_field.one_to_many else []
+            plan["prefetch"].append(
+                Prefetch(
+                    f"{prefix}{attr}",
+                    queryset=plan_queryset(
+                        model_field.related_model.objects.all(),
+                        nested,
+                        extra_only=extra_only,
+                    ),
+                )
+            )
+            continue
+
+        plan["only"].append(f"{prefix}{attr}")
+
+        if nested is not None:
+            plan["select"].append(f"{prefix}{attr}")
+            _collect(nested, model_field.related_model, f"{prefix}{attr}__", plan)
+
+
+def plan_queryset(queryset, serializer, extra_only=None, defer=True):
+    if serializer is None:
+        return queryset.only(queryset.model._meta.pk.name, *(extra_only or []))
+
+    plan = {"only": list(extra_only or []), "select": [], "prefetch": []}
+    _collect(serializer, queryset.model, "", plan)
+
+    if plan["select"]:
+        queryset = queryset.select_related(*plan["select"])
+
+    if plan["prefetch"]:
+        queryset = queryset.prefetch_related(*plan["prefetch"])
+
+    if defer:
+        queryset = queryset.only(*plan["only"])
+
+    return queryset
@@ -0,0 +1,108 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_tree(value: str) -> dict:
+    tree = {}
+
+    for path in value.split(","):
+        node = tree
+        for part in filter(None, path.strip().split(".")):
+            node = node.setdefault(part, {})
+
+    return tree
+
+
+def merge_field_trees(target: dict, source: dict) -> dict:
+    for name, subtree in source.items():
+        if subtree:
+            merge_field_trees(target.setdefault(name, {}), subtree)
+
+    return target
+
+
+class DynamicFieldsMixin:
+    """
+    Honours ``?fields=a,b.c`` and ``?expand=b.d`` on read requests.
+
+    Without ``expand`` every nested serializer is rendered as before; once it
+    is given, only the listed relations are nested and the others collapse to
+    their primary keys.
+    """
+
+    prefetch_method_fields = {}
+
+    def is_root_serializer(self) -> bool:
+        if isinstance(self.parent, serializers.ListSerializer):
+            return self.parent.parent is None
+
+        return self.parent is None
+
+    def get_field_trees(self) -> tuple:
+        if hasattr(self, "_field_trees"):
+            return self._field_trees
+
+        request = self.context.get("request")
+        only, expand = None, None
+
+        if (
+            request is not None
+            and request.method in SAFE_METHODS
+            and self.is_root_serializer()
+        ):
+            fields = request.query_params.get("fields")
+            expand_value = request.query_params.get("expand")
+
+            if fields:
+                only = parse_field_tree(fields)
+
+            if expand_value is not None:
+                expand = merge_field_trees(parse_field_tree(expand_value), only or {})
+
+        self._field_trees = (only, expand)
+        return self._field_trees
+
+    def get_nested_trees(self, name: str) -> tuple:
+        only, expand = self.get_field_trees()
+        nested_only = (only or {}).get(name) or None
+        nested_expand = expand.get(name, {}) if expand is not None else None
+
+        return nested_only, nested_expand
+
+    def is_expanded(self, name: str) -> bool:
+        _, expand = self.get_field_trees()
+
+        return expand is None or name in expand
+
+    def nested_serializer(self, name: str, serializer_class, instance=None, **kwargs):
+        serializer = serializer_class(instance, context=self.context, **kwargs)
+        child = getattr(serializer, "child", serializer)
+        child._field_trees = self.get_nested_trees(name)
+
+        return serializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, _ = self.get_field_trees()
+
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only}
+
+        for name, field in list(fields.items()):
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+
+            if not isinstance(nested, DynamicFieldsMixin):
+                continue
+
+            if not self.is_expanded(name):
+                kwargs = {"read_only": True, "many": many}
+                if field.source and field.source != name:
+                    kwargs["source"] = field.source
+
+                fields[name] = serializers.PrimaryKeyRelatedField(**kwargs)
+                continue
+
+            nested._field_trees = self.get_nested_trees(name)
+
+        return fields
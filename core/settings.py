@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -47,7 +48,16 @@ INSTALLED_APPS = [
     "django_filters"
 ]
 
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "api-metrics")
+)
+
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
 MIDDLEWARE = [
+    *(["core.middleware.MetricsMiddleware"] if METRICS_ENABLED else []),
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -82,10 +92,42 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# "default" is the stock Django SQLite behaviour. Deployments opt in to
+# "production" (DB_PROFILE=production), which turns on WAL, the pragmas below,
+# persistent connections and BEGIN IMMEDIATE for write transactions (see
+# core.db.base).
+DB_PROFILE = os.environ.get("DB_PROFILE", "default")
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KB", 64 * 1024)),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "temp_store": "MEMORY",
+}
+
+DATABASE_PROFILES = {
+    "default": {
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {},
+    },
+    "production": {
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60 * 10)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            "pragmas": SQLITE_PRAGMAS,
+            "transaction_mode": "IMMEDIATE",
+        },
+    },
+}
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.db",
         "NAME": BASE_DIR / os.environ.get("DB_NAME"),
+        **DATABASE_PROFILES[DB_PROFILE],
     }
 }
 
@@ -111,9 +153,14 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-    ]
+        "users.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": [
+        "rest_framework.permissions.IsAuthenticated",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "PAGE_SIZE": 25,
 }
 
 # Internationalization
@@ -146,14 +193,54 @@ MEDIA_URL = os.environ.get("MEDIA_URL")
 
 MEDIA_ROOT = os.path.join(BASE_DIR, MEDIA_URL)
 
-REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-    ),
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticated',
-    ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 25, 
+STATISTICS_USE_ROLLUPS = os.environ.get("STATISTICS_USE_ROLLUPS", "True") == "True"
+
+STATISTICS_CACHE_ALIAS = "statistics"
+
+STATISTICS_CACHE_LOCATION = os.environ.get("STATISTICS_CACHE_LOCATION")
+
+PROTOCOL_PERMUTATION = os.environ.get("PROTOCOL_PERMUTATION", "True") == "True"
+
+PROTOCOL_PERMUTATION_KEY = (
+    os.environ.get("PROTOCOL_PERMUTATION_KEY") or SECRET_KEY or ""
+)
+
+AUTH_TOKEN_CACHE_ALIAS = "tokens"
+
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 60 * 5))
+
+# Shared by every worker when set, so revoking a token or changing its user
+# drops the cached entry everywhere. Without it each worker caches on its
+# own and only sees revocations made elsewhere once AUTH_TOKEN_CACHE_TTL
+# expires its entry.
+AUTH_TOKEN_CACHE_LOCATION = os.environ.get("AUTH_TOKEN_CACHE_LOCATION")
+
+ASYNC_SYNC_WORKERS = int(os.environ.get("ASYNC_SYNC_WORKERS", 8))
+
+ASYNC_COMPAT_WORKERS = int(os.environ.get("ASYNC_COMPAT_WORKERS", 4))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    STATISTICS_CACHE_ALIAS: {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if STATISTICS_CACHE_LOCATION
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": STATISTICS_CACHE_LOCATION or "statistics",
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 256},
+    },
+    AUTH_TOKEN_CACHE_ALIAS: {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if AUTH_TOKEN_CACHE_LOCATION
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": AUTH_TOKEN_CACHE_LOCATION or "tokens",
+        "TIMEOUT": AUTH_TOKEN_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": 1024},
+    },
 }
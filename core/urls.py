@@ -17,10 +17,13 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 
 from rest_framework.routers import DefaultRouter
 
+from core.views import MetricsView
+
+from requisitions import async_views as requisition_async_views
 from requisitions.views import (
     ProjectViewSet,
     DeliveryViewSet,
@@ -28,6 +31,7 @@ from requisitions.views import (
     RequisitionEventViewSet,
     RequisitionStatusViewSet,
     RequisitionTagViewSet,
+    SearchView,
     StatisticsViewSet
 )
 
@@ -38,6 +42,7 @@ from users.views import (
     InstituteViewSet,
     DepartmentViewSet
 )
+from users import async_views as user_async_views
 
 
 router = DefaultRouter()
@@ -53,8 +58,39 @@ router.register(r"departments", DepartmentViewSet, basename="departments")
 router.register(r"institutes", InstituteViewSet, basename="institutes")
 router.register(r"statistics", StatisticsViewSet, basename="statistics")
 
+async_urlpatterns = [
+    path(
+        "requisitions/",
+        requisition_async_views.requisition_list,
+        name="async-requisitions",
+    ),
+    re_path(
+        r"^requisitions/(?P<protocol>[0-9]+\.[0-9]+)/$",
+        requisition_async_views.requisition_detail,
+        name="async-requisition-detail",
+    ),
+    path(
+        "deliveries/",
+        requisition_async_views.delivery_list,
+        name="async-deliveries",
+    ),
+    path(
+        "statistics/",
+        requisition_async_views.statistics,
+        name="async-statistics",
+    ),
+    path(
+        "verify-token/",
+        user_async_views.verify_token,
+        name="async-verify-token",
+    ),
+]
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/search/", SearchView.as_view(), name="search"),
+    path("api/async/", include(async_urlpatterns)),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
     path("api/", include(router.urls)),
     path("get-token/", UserAuthenticationView.as_view(), name="get-token"),
     path("verify-token/", TokenVerifierView.as_view(), name="verify-token"),
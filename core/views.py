@@ -0,0 +1,127 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import endpoint_metrics, prometheus_text, registry
+from .querysets import plan_queryset
+
+
+class DynamicFieldsViewSetMixin:
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+
+        return plan_queryset(
+            queryset, serializer, defer=self.request.method in SAFE_METHODS
+        )
+
+
+def get_validators(request, state: dict) -> tuple:
+    """
+    Returns the weak ``ETag`` and ``Last-Modified`` datetime for a response
+    whose content is described by ``state``.
+    """
+    last_modified = state.pop("last_modified")
+    version = last_modified.isoformat() if last_modified else ""
+    digest = hashlib.md5(
+        f"{request.get_full_path()}|{version}|{sorted(state.items())}".encode()
+    ).hexdigest()
+
+    return f"W/{quote_etag(digest)}", last_modified
+
+
+def set_validators(response, etag: str, timestamp):
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answers ``If-None-Match`` / ``If-Modified-Since`` on list and retrieve
+    with a 304 computed from ``max(last_modified_field)`` and the row count,
+    before any object is loaded or serialized.
+    """
+
+    last_modified_field = "last_updated"
+
+    def get_validator_state(self, queryset) -> dict:
+        paginated = self.action == "list" and self.paginator is not None
+
+        if paginated and hasattr(self.paginator, "get_validator_state"):
+            return self.paginator.get_validator_state(
+                queryset, self.request, self.last_modified_field
+            )
+
+        return queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field), count=Count("pk")
+        )
+
+    def get_validators(self, request, state: dict) -> tuple:
+        return get_validators(request, state)
+
+    def conditional_response(self, request, queryset, handler, *args, **kwargs):
+        state = self.get_validator_state(queryset)
+        etag, last_modified = self.get_validators(request, state)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        return set_validators(response, etag, timestamp)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return self.conditional_response(
+            request, queryset, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+
+        return self.conditional_response(
+            request, queryset, super().retrieve, *args, **kwargs
+        )
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if "endpoints" not in data:
+            return "\n".join(f"# {key}: {value}" for key, value in data.items())
+
+        return prometheus_text(data["endpoints"])
+
+
+class MetricsView(APIView):
+    """
+    Per-endpoint metrics of all live workers, as JSON or, with
+    ``?format=prometheus``, in the Prometheus text format.
+    """
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [JSONRenderer, PrometheusRenderer]
+
+    def get(self, request, format=None):
+        rows, workers = registry.collect()
+
+        return Response({"workers": workers, "endpoints": endpoint_metrics(rows)})
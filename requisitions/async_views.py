@@ -0,0 +1,48 @@
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions
+
+from core.async_views import (
+    async_api_view,
+    async_viewset_view,
+    error_response,
+    run_sync,
+)
+from core.views import get_validators, set_validators
+
+from .models import Requisition
+from .views import DeliveryViewSet, RequisitionViewSet, StatisticsViewSet
+
+
+# Thread-offloaded compatibility routes (see async_viewset_view); only the
+# detail view below reads through the async ORM.
+requisition_list = async_viewset_view(RequisitionViewSet, {"get": "list"})
+delivery_list = async_viewset_view(DeliveryViewSet, {"get": "list"})
+statistics = async_viewset_view(StatisticsViewSet, {"get": "list"})
+
+_requisition_retrieve = RequisitionViewSet.as_view({"get": "retrieve"})
+
+
+@async_api_view
+async def requisition_detail(request, protocol):
+    """
+    Answers 404 and 304 straight from the async ORM; only a full render
+    takes a worker thread.
+    """
+    state = await (
+        Requisition.objects.filter(protocol=protocol)
+        .order_by()
+        .aaggregate(last_modified=Max("last_updated"), count=Count("pk"))
+    )
+
+    if not state["count"]:
+        return error_response(exceptions.NotFound())
+
+    etag, last_modified = get_validators(request, state)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    if response is None:
+        response = await run_sync(_requisition_retrieve, request, protocol=protocol)
+
+    return set_validators(response, etag, timestamp)
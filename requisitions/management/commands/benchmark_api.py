@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from requisitions.models import Requisition
+from requisitions.utils.benchmark import (
+    BENCHMARK_ENDPOINTS,
+    BENCHMARK_SERVERS,
+    RUNNERS,
+    auth_headers,
+    benchmark_requests,
+    benchmark_session,
+)
+
+
+def parse_levels(value: str) -> list:
+    try:
+        levels = [int(level) for level in value.split(",") if level.strip()]
+    except ValueError:
+        raise CommandError("Informe os níveis de concorrência separados por vírgula.")
+
+    if not levels or min(levels) < 1:
+        raise CommandError("Os níveis de concorrência devem ser maiores que zero.")
+
+    return levels
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara requisições por segundo e latência p99 da API servida via WSGI "
+        "e via ASGI (rotas /api/async/), dentro do próprio processo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", default="50,100,500")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=list(BENCHMARK_ENDPOINTS),
+            help="Pode ser repetido; por padrão todos os endpoints são usados.",
+        )
+        parser.add_argument("--server", action="append", choices=BENCHMARK_SERVERS)
+
+    def handle(self, *args, **options):
+        levels = parse_levels(options["concurrency"])
+        endpoints = options["endpoint"] or list(BENCHMARK_ENDPOINTS)
+        servers = options["server"] or BENCHMARK_SERVERS
+        protocol = (
+            Requisition.objects.order_by("-timestamp")
+            .values_list("protocol", flat=True)
+            .first()
+        )
+
+        if protocol is None and "requisition" in endpoints:
+            endpoints.remove("requisition")
+
+        if not endpoints:
+            raise CommandError("Nenhum endpoint disponível para o teste.")
+
+        with benchmark_session() as token:
+            self.report(
+                levels,
+                endpoints,
+                servers,
+                options["requests"],
+                auth_headers(token),
+                {"protocol": protocol, "token": token.key},
+            )
+
+    def report(self, levels, endpoints, servers, total, headers, context):
+        self.stdout.write(
+            f"{'servidor':<8} {'clientes':>8} {'req/s':>10} "
+            f"{'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>6}"
+        )
+
+        for concurrency in levels:
+            for server in servers:
+                requests = benchmark_requests(endpoints, server, total, **context)
+                result = RUNNERS[server](requests, concurrency, headers)
+
+                self.stdout.write(
+                    f"{server:<8} {concurrency:>8} {result['rps']:>10.1f} "
+                    f"{result['p50']:>10.1f} {result['p99']:>10.1f} "
+                    f"{result['errors']:>6}"
+                )
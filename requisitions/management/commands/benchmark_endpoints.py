@@ -0,0 +1,88 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.urls import router
+from requisitions.models import Delivery, Event, Project, Requisition, Status
+from requisitions.utils.benchmark import compare_baselines, run_endpoint_suite
+from users.models import Profile
+
+
+COUNTED_MODELS = [Profile, Project, Requisition, Delivery, Status, Event]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p90/p99), número de consultas e pico de memória de "
+        "cada endpoint do roteador e grava ou compara uma linha de base em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--output", help="Arquivo JSON para gravar os resultados.")
+        parser.add_argument("--compare", help="Linha de base JSON anterior.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Piora relativa de latência ou memória tolerada na comparação.",
+        )
+
+    def handle(self, *args, **options):
+        previous = None
+
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as file:
+                    previous = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Não foi possível ler a linha de base: {error}")
+
+        counts = {model._meta.label: model.objects.count() for model in COUNTED_MODELS}
+        baseline = run_endpoint_suite(router.registry, options["iterations"], counts)
+
+        self.stdout.write(
+            f"{'endpoint':<36} {'status':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+            f"{'consultas':>9} {'memória (KiB)':>13}"
+        )
+
+        for label, result in baseline["endpoints"].items():
+            self.stdout.write(
+                f"{label:<36} {result['status']:>6} {result['p50_ms']:>9.1f} "
+                f"{result['p99_ms']:>9.1f} {result['queries']:>9} "
+                f"{result['peak_memory_kb']:>13.0f}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(baseline, file, indent=2)
+
+            self.stdout.write(f"Linha de base gravada em {options['output']}.")
+
+        if previous is None:
+            return
+
+        if previous.get("counts") != counts:
+            self.stderr.write(
+                "Atenção: a linha de base foi medida com outro volume de dados."
+            )
+
+        regressions = []
+
+        for label, field, before, after, regressed in compare_baselines(
+            previous, baseline, options["threshold"]
+        ):
+            if regressed:
+                regressions.append(f"{label} {field}: {before:.1f} -> {after:.1f}")
+
+        for regression in regressions:
+            self.stderr.write(regression)
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} regressões em relação à linha de base."
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS("Nenhuma regressão em relação à linha de base.")
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.urls import router
+from requisitions.utils.query_plans import (
+    explain,
+    hot_queries,
+    plan_problems,
+    viewset_queries,
+)
+
+
+class Command(BaseCommand):
+    help = "Executa EXPLAIN QUERY PLAN nas consultas principais da API e falha em varreduras completas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--show-plans",
+            action="store_true",
+            help="Exibe o plano de todas as consultas, não apenas das problemáticas.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Este comando só suporta bancos SQLite.")
+
+        failures = 0
+
+        for label, sql, params in viewset_queries(router.registry) + hot_queries():
+            plan = explain(sql, params)
+            problems = plan_problems(sql, plan)
+
+            if problems:
+                failures += 1
+                self.stderr.write(f"{label}: {', '.join(problems)}\n  {sql}")
+
+            if problems or options["show_plans"]:
+                for detail in plan:
+                    self.stdout.write(f"  {label}: {detail}")
+
+        if failures:
+            raise CommandError(f"{failures} consultas sem índice adequado.")
+
+        self.stdout.write(self.style.SUCCESS("Todas as consultas usam índices."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from requisitions.utils.load_data import generate_load_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera dados sintéticos em massa (institutos, perfis, projetos, "
+        "requisições, entregas, status, eventos e etiquetas) para testes de carga."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1,
+            help="Multiplicador; cada unidade gera 1000 requisições.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["scale"] < 1:
+            raise CommandError("A escala deve ser maior que zero.")
+
+        counts = generate_load_data(
+            options["scale"], seed=options["seed"], batch_size=options["batch_size"]
+        )
+
+        for name, total in counts.items():
+            self.stdout.write(f"{name}: {total}")
+
+        self.stdout.write(self.style.SUCCESS("Dados sintéticos gerados."))
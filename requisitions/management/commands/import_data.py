@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from requisitions.utils.imports import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_TYPES,
+    IMPORTERS,
+    import_type_for,
+    read_rows,
+    run_import,
+)
+
+
+class Command(BaseCommand):
+    help = "Importa projetos ou requisições de um arquivo CSV ou XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--type", choices=IMPORT_TYPES)
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas valida as linhas, sem gravar nada.",
+        )
+
+    def handle(self, *args, **options):
+        import_type = options["type"] or import_type_for(options["path"])
+
+        try:
+            with open(options["path"], "rb") as file:
+                report = run_import(
+                    options["kind"],
+                    read_rows(file, import_type),
+                    dry_run=options["dry_run"],
+                    chunk_size=options["chunk_size"],
+                )
+        except OSError as error:
+            raise CommandError(f"Não foi possível ler o arquivo: {error}")
+        except ValidationError as error:
+            raise CommandError(error.detail)
+
+        for result in report["results"]:
+            if "errors" in result:
+                self.stderr.write(f"Linha {result['row']}: {result['errors']}")
+
+        if report["dry_run"]:
+            self.stdout.write(f"{report['valid']} de {report['total']} linhas válidas.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{report['created']} de {report['total']} linhas importadas."
+                )
+            )
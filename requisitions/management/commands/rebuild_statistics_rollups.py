@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from requisitions.models import Delivery
+from requisitions.utils.rollups import rebuild_rollups, statistics_from_rollups
+from requisitions.utils.statistics import generate_statistics
+
+
+class Command(BaseCommand):
+    help = "Reconstrói as tabelas de estatísticas agregadas e as compara com o cálculo direto."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas compara os agregados existentes, sem reconstruí-los.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            total = rebuild_rollups()
+            self.stdout.write(f"{total} agregados reconstruídos.")
+
+        live = generate_statistics(Delivery.objects.all())
+        rolled_up = statistics_from_rollups()
+        mismatches = []
+
+        for dimension, buckets in live.items():
+            if dimension == "by_total":
+                buckets, rolled_buckets = {None: buckets}, {None: rolled_up[dimension]}
+            else:
+                rolled_buckets = rolled_up.get(dimension, {})
+
+            for key in set(buckets) | set(rolled_buckets):
+                if buckets.get(key) != rolled_buckets.get(key):
+                    mismatches.append(
+                        f"{dimension}[{key}]: {rolled_buckets.get(key)} != {buckets.get(key)}"
+                    )
+
+        if mismatches:
+            for mismatch in mismatches:
+                self.stderr.write(mismatch)
+
+            raise CommandError(
+                f"{len(mismatches)} divergências entre os agregados e o cálculo direto."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Agregados consistentes."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from requisitions.utils.fulfillment import fulfillment_mismatches, repair_fulfillment
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula as quantidades entregues, o status atual e o percentual "
+        "atendido de cada requisição a partir das entregas e status."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas lista as divergências, sem corrigi-las.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = fulfillment_mismatches()
+        else:
+            mismatches = repair_fulfillment()
+
+        for requisition in mismatches:
+            for field, (stored, expected) in requisition.stale_fields.items():
+                self.stderr.write(
+                    f"{requisition.protocol}.{field}: {stored} != {expected}"
+                )
+
+        if mismatches and options["check"]:
+            raise CommandError(
+                f"{len(mismatches)} requisições com contadores divergentes."
+            )
+
+        if mismatches:
+            self.stdout.write(f"{len(mismatches)} requisições corrigidas.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Contadores consistentes."))
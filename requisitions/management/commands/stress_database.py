@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from requisitions.utils.stress import profile_database, run_stress
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede vazão e taxa de erros do SQLite com gravações de entregas e "
+        "leituras de painel concorrentes, para cada perfil de conexão."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=list(settings.DATABASE_PROFILES),
+            help="Pode ser repetido; por padrão todos os perfis são testados.",
+        )
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=10)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Este comando só suporta bancos SQLite.")
+
+        self.stdout.write(
+            f"{'perfil':<12} {'gravações/s':>12} {'leituras/s':>11} "
+            f"{'erros grav.':>12} {'erros leit.':>12} {'taxa de erro':>13}"
+        )
+
+        for profile in options["profile"] or list(settings.DATABASE_PROFILES):
+            with profile_database(profile) as alias:
+                result = run_stress(
+                    alias, options["writers"], options["readers"], options["seconds"]
+                )
+
+            self.stdout.write(
+                f"{profile:<12} {result['writes_per_second']:>12.1f} "
+                f"{result['reads_per_second']:>11.1f} "
+                f"{result['write_errors']:>12} {result['read_errors']:>12} "
+                f"{result['error_rate']:>13.2%}"
+            )
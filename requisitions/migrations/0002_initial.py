@@ -0,0 +1,142 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("users", "0001_initial"),
+        ("requisitions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="status",
+            name="author",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="status",
+            name="requisition",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requisition_status",
+                to="requisitions.requisition",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="statisticsrollup",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "key", "date"), name="unique_statistics_rollup"
+            ),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="author",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requisition_author",
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="project",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="requisitions.project"
+            ),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True, related_name="requisition_tags", to="requisitions.tag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="advisor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="profile_advisor",
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="project_author",
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="author",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="requisition",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requisition_event",
+                to="requisitions.requisition",
+            ),
+        ),
+        migrations.AddField(
+            model_name="delivery",
+            name="author",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.profile",
+            ),
+        ),
+        migrations.AddField(
+            model_name="delivery",
+            name="requisition",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requisition_delivery",
+                to="requisitions.requisition",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="status",
+            index=models.Index(
+                fields=["timestamp", "id"], name="status_timestamp_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["timestamp", "id"], name="requisition_timestamp_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["timestamp", "id"], name="event_timestamp_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="delivery",
+            index=models.Index(
+                fields=["timestamp", "id"], name="delivery_timestamp_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+def sequence_floors(Requisition) -> dict:
+    """
+    Maps each year to one past the highest sequence its protocols use, so
+    gaps left by the old random protocols can't produce colliding ones.
+    """
+    floors = {}
+
+    for protocol in Requisition.objects.values_list("protocol", flat=True):
+        sequence, _, year = protocol.partition(".")
+
+        if sequence.isdigit() and year.isdigit():
+            floors[int(year)] = max(floors.get(int(year), 0), int(sequence) + 1)
+
+    return floors
+
+
+def seed_protocol_counters(apps, schema_editor):
+    Requisition = apps.get_model("requisitions", "Requisition")
+    ProtocolCounter = apps.get_model("requisitions", "ProtocolCounter")
+
+    ProtocolCounter.objects.bulk_create(
+        ProtocolCounter(year=year, value=value)
+        for year, value in sequence_floors(Requisition).items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProtocolCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(unique=True)),
+                ("value", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_protocol_counters, migrations.RunPython.noop),
+    ]
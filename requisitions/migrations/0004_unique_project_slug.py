@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_project_slugs(apps, schema_editor):
+    Project = apps.get_model("requisitions", "Project")
+
+    duplicated = (
+        Project.objects.values("slug")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("slug", flat=True)
+    )
+
+    for project in Project.objects.filter(slug__in=list(duplicated)).order_by("id"):
+        suffix = f"-{project.id}"
+        project.slug = f"{project.slug[:50 - len(suffix)]}{suffix}"
+        project.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0003_protocolcounter"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_project_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="project",
+            name="slug",
+            field=models.SlugField(blank=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0004_unique_project_slug"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="delivery",
+            index=models.Index(
+                fields=["requisition", "is_active"], name="delivery_active_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="delivery",
+            index=models.Index(fields=["date"], name="delivery_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["title"], name="project_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(fields=["date"], name="requisition_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="status",
+            index=models.Index(
+                fields=["requisition", "status"], name="status_requisition_status_idx"
+            ),
+        ),
+    ]
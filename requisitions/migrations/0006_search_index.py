@@ -0,0 +1,89 @@
+from django.db import migrations
+
+
+# rowid = object id * 4 + kind, so every trigger touches a single row by rowid.
+# Kinds: 0 project, 1 profile, 2 requisition, 3 delivery.
+SEARCH_SOURCES = [
+    (
+        "project",
+        "requisitions_project",
+        0,
+        "slug, title, description, ceua_protocol",
+        "NEW.slug, NEW.title, NEW.description || ' ' || NEW.ceua_protocol",
+        "1",
+    ),
+    (
+        "profile",
+        "users_profile",
+        1,
+        "name, is_hidden",
+        "NEW.id, NEW.name, ''",
+        "NOT NEW.is_hidden",
+    ),
+    (
+        "requisition",
+        "requisitions_requisition",
+        2,
+        "protocol, author_notes",
+        "NEW.protocol, NEW.protocol, NEW.author_notes",
+        "1",
+    ),
+    (
+        "delivery",
+        "requisitions_delivery",
+        3,
+        "notes, is_active",
+        "NEW.id, (SELECT protocol FROM requisitions_requisition"
+        " WHERE id = NEW.requisition_id), NEW.notes",
+        "NEW.is_active AND NEW.notes <> ''",
+    ),
+]
+
+
+def search_sql():
+    statements = [
+        "CREATE VIRTUAL TABLE requisitions_search USING fts5("
+        "key UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+
+    for name, table, kind, columns, values, condition in SEARCH_SOURCES:
+        insert = (
+            f"INSERT INTO requisitions_search (rowid, key, title, body) "
+            f"SELECT NEW.id * 4 + {kind}, {values} WHERE {condition};"
+        )
+        delete = f"DELETE FROM requisitions_search WHERE rowid = OLD.id * 4 + {kind};"
+
+        statements += [
+            f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert} END",
+            f"CREATE TRIGGER {table}_search_update AFTER UPDATE OF {columns} "
+            f"ON {table} BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete} END",
+            f"INSERT INTO requisitions_search (rowid, key, title, body) "
+            f"SELECT NEW.id * 4 + {kind}, {values} FROM {table} AS NEW "
+            f"WHERE {condition}",
+        ]
+
+    return statements
+
+
+def reverse_search_sql():
+    statements = []
+
+    for name, table, *_ in SEARCH_SOURCES:
+        for event in ["insert", "update", "delete"]:
+            statements.append(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+
+    return statements + ["DROP TABLE IF EXISTS requisitions_search"]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0005_query_indexes"),
+        ("users", "0002_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(search_sql(), reverse_search_sql()),
+    ]
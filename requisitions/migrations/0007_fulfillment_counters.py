@@ -0,0 +1,135 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:49
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Least
+
+search_index = import_module("requisitions.migrations.0006_search_index")
+
+# SQLite rebuilds requisitions_requisition to add the columns: that drops
+# its search triggers, and the delivery ones, which read the table, would
+# fail mid-rebuild. Both sets are recreated afterwards.
+REBUILT_TABLES = ["requisitions_requisition", "requisitions_delivery"]
+SEARCH_TRIGGERS = [
+    statement
+    for statement in search_index.search_sql()
+    if statement.startswith(
+        tuple(f"CREATE TRIGGER {table}_" for table in REBUILT_TABLES)
+    )
+]
+DROP_SEARCH_TRIGGERS = [
+    f"DROP TRIGGER IF EXISTS {table}_search_{event}"
+    for table in REBUILT_TABLES
+    for event in ["insert", "update", "delete"]
+]
+
+
+def fill_fulfillment_counters(apps, schema_editor):
+    Requisition = apps.get_model("requisitions", "Requisition")
+    Delivery = apps.get_model("requisitions", "Delivery")
+    Status = apps.get_model("requisitions", "Status")
+
+    def delivered(field):
+        return Coalesce(
+            Subquery(
+                Delivery.objects.filter(is_active=True, requisition_id=OuterRef("pk"))
+                .order_by()
+                .values("requisition_id")
+                .annotate(total=Sum(field))
+                .values("total")
+            ),
+            0,
+        )
+
+    Requisition.objects.update(
+        delivered_males=delivered("males"),
+        delivered_females=delivered("females"),
+        current_status=Coalesce(
+            Subquery(
+                Status.objects.filter(requisition_id=OuterRef("pk"))
+                .order_by("-timestamp", "-id")
+                .values("status")[:1]
+            ),
+            Value("RE"),
+        ),
+    )
+    Requisition.objects.update(
+        fulfillment_ratio=Case(
+            When(males=0, females=0, then=Value(1.0)),
+            default=Cast(
+                Least(F("delivered_males"), F("males"))
+                + Least(F("delivered_females"), F("females")),
+                FloatField(),
+            )
+            / Cast(F("males") + F("females"), FloatField()),
+            output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0006_search_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_SEARCH_TRIGGERS, SEARCH_TRIGGERS),
+        migrations.AddField(
+            model_name="requisition",
+            name="current_status",
+            field=models.CharField(
+                choices=[
+                    ("RE", "Recebida"),
+                    ("PR", "Em Produção"),
+                    ("CO", "Concluída"),
+                    ("PA", "Parcialmente concluída"),
+                    ("SU", "Suspensa"),
+                    ("CA", "Cancelada"),
+                ],
+                default="RE",
+                editable=False,
+                max_length=2,
+            ),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="delivered_females",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="delivered_males",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="requisition",
+            name="fulfillment_ratio",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["current_status", "fulfillment_ratio"],
+                name="requisition_progress_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["fulfillment_ratio"], name="requisition_ratio_idx"
+            ),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGERS, DROP_SEARCH_TRIGGERS),
+        migrations.RunPython(fill_fulfillment_counters, migrations.RunPython.noop),
+    ]
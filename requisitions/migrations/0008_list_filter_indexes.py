@@ -0,0 +1,43 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0007_fulfillment_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["current_status", "timestamp", "id"],
+                name="requisition_status_page_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["project", "timestamp", "id"],
+                name="requisition_project_page_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                fields=["author", "timestamp", "id"], name="requisition_author_page_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="requisition",
+            index=models.Index(
+                condition=models.Q(
+                    ("fulfillment_ratio__lt", 1),
+                    models.Q(("current_status", "CA"), _negated=True),
+                ),
+                fields=["timestamp", "id"],
+                name="requisition_outstanding_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-18 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0008_list_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="delivery",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["requisition", "timestamp", "id"],
+                name="delivery_timeline_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["requisition", "timestamp", "id"], name="event_timeline_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="status",
+            index=models.Index(
+                fields=["requisition", "timestamp", "id"], name="status_timeline_idx"
+            ),
+        ),
+    ]
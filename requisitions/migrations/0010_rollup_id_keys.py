@@ -0,0 +1,20 @@
+# Generated by Django 4.2.4 on 2026-10-18 19:20
+
+from django.db import migrations
+
+
+def rekey_statistics_rollups(apps, schema_editor):
+    from requisitions.utils.rollups import rebuild_rollups
+
+    # Rollups used to be keyed by labels; ids are read back as labels now.
+    rebuild_rollups(apps)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0009_timeline_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_statistics_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-18 20:10
+
+from importlib import import_module
+
+from django.db import migrations
+
+search_index = import_module("requisitions.migrations.0006_search_index")
+
+# The project update trigger used to ignore slug, the stored search key, so
+# slug-only edits left stale keys: recreate it and re-key the project rows.
+PROJECT_TABLE = "requisitions_project"
+PROJECT_KIND = 0
+PROJECT_SQL = [
+    statement
+    for statement in search_index.search_sql()
+    if f"{PROJECT_TABLE}_search_update" in statement
+    or statement.endswith(f"FROM {PROJECT_TABLE} AS NEW WHERE 1")
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0010_rollup_id_keys"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                f"DROP TRIGGER IF EXISTS {PROJECT_TABLE}_search_update",
+                f"DELETE FROM requisitions_search WHERE (rowid & 3) = {PROJECT_KIND}",
+                *PROJECT_SQL,
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-18 20:20
+
+from importlib import import_module
+
+from django.db import migrations
+
+protocol_counter = import_module("requisitions.migrations.0003_protocolcounter")
+
+
+def raise_protocol_counters(apps, schema_editor):
+    Requisition = apps.get_model("requisitions", "Requisition")
+    ProtocolCounter = apps.get_model("requisitions", "ProtocolCounter")
+
+    # 0003 used to seed the per-year protocol count, which is below the
+    # highest sequence in use whenever the old random protocols left gaps.
+    for year, value in protocol_counter.sequence_floors(Requisition).items():
+        counter, created = ProtocolCounter.objects.get_or_create(
+            year=year, defaults={"value": value}
+        )
+
+        if not created and counter.value < value:
+            ProtocolCounter.objects.filter(pk=counter.pk).update(value=value)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("requisitions", "0011_search_project_slug"),
+    ]
+
+    operations = [
+        migrations.RunPython(raise_protocol_counters, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,9 @@
-import random
 from datetime import datetime
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
 from users.models import Profile
-from .utils.utils import generate_slug, generate_unique_slug
+from .utils.utils import save_with_unique_slug
 
 REQUISITION_OPTIONS = [
     ("RE", "Recebida"),
@@ -21,7 +21,7 @@ class Project(models.Model):
     project_file = models.FileField(upload_to="uploads/projects", null=True, blank=True)
     ceua_protocol = models.CharField(max_length=16, blank=False, null=False)
     ceua_file = models.FileField(upload_to="uploads/ceua", null=True, blank=True)
-    slug = models.SlugField(max_length=50, blank=True, null=False)
+    slug = models.SlugField(max_length=50, blank=True, null=False, unique=True)
     author = models.ForeignKey(
         "users.Profile", on_delete=models.CASCADE, related_name="project_author"
     )
@@ -29,17 +29,24 @@ class Project(models.Model):
         "users.Profile", on_delete=models.CASCADE, related_name="profile_advisor"
     )
 
+    class Meta:
+        indexes = [models.Index(fields=["title"], name="project_title_idx")]
+
     def __str__(self):
         return f"{self.title} - {self.author}, {self.advisor}"
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            slug = generate_unique_slug(self.title)
-            while Project.objects.filter(slug=slug).exists():
-                slug = generate_unique_slug(self.title)
-            self.slug = slug
-
-        super().save(*args, **kwargs)
+        from .utils.rollups import track_key_change
+
+        with track_key_change(
+            self,
+            ["author", "advisor"],
+            models.Q(project=self.pk),
+            kwargs.get("update_fields"),
+        ):
+            return save_with_unique_slug(
+                self, self.title, super().save, *args, **kwargs
+            )
 
 
 class Delivery(models.Model):
@@ -56,68 +63,61 @@ class Delivery(models.Model):
         related_name="requisition_delivery",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="delivery_timestamp_id_idx"),
+            models.Index(
+                fields=["requisition", "is_active"], name="delivery_active_idx"
+            ),
+            models.Index(fields=["date"], name="delivery_date_idx"),
+            # (requisition, timestamp, id) indexes back the requisition timeline.
+            models.Index(
+                fields=["requisition", "timestamp", "id"],
+                condition=models.Q(is_active=True),
+                name="delivery_timeline_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.requisition.protocol}: {self.date} - {self.males}M | {self.females}F"
 
     def update_tags(self):
-        requisition = Requisition.objects.get(id=self.requisition_id)
-        all_deliveries = Delivery.objects.filter(
-            requisition__id=self.requisition_id
-        ).aggregate(males=models.Sum("males"), females=models.Sum("females"))
-        received_tag, _ = Tag.objects.get_or_create(name="Recebida")
-        partial_tag, _ = Tag.objects.get_or_create(name="Parcialmente Concluída")
-        concluded_tag, _ = Tag.objects.get_or_create(name="Concluída")
-
-        males_satisfied = (
-            all_deliveries["males"] is None
-            or all_deliveries["males"] >= requisition.males
-        )
-        females_satisfied = (
-            all_deliveries["females"] is None
-            or all_deliveries["females"] >= requisition.females
-        )
+        from .utils.fulfillment import update_requisition_state
 
-        males_partially_satisfied = (
-            all_deliveries["males"] is None
-            or all_deliveries["males"] < requisition.males
-        )
-        females_partially_satisfied = (
-            all_deliveries["females"] is None
-            or all_deliveries["females"] < requisition.females
+        return update_requisition_state(self.requisition_id)
+
+    def save(self, *args, **kwargs):
+        from .utils.fulfillment import (
+            apply_delivered_delta,
+            delivery_counts,
+            stored_delivery_counts,
         )
+        from .utils.rollups import track_new_delivery, track_requisition
 
-        if males_satisfied and females_satisfied:
-            requisition.tags.add(concluded_tag)
-            requisition.tags.remove(partial_tag)
-            if not Status.objects.filter(status="CO", requisition=requisition):
-                Status.objects.create(
-                    status="CO",
-                    message="Estado alterado para requisição concluída.",
-                    requisition=requisition,
-                )
-            requisition.tags.remove(received_tag)
+        if self._state.adding:
+            with track_new_delivery(self):
+                super().save(*args, **kwargs)
+                apply_delivered_delta({}, delivery_counts([self]))
 
-        elif (males_partially_satisfied and females_satisfied) or (females_partially_satisfied and males_satisfied) or (females_partially_satisfied and males_partially_satisfied):
-            requisition.tags.add(partial_tag)
-            requisition.tags.remove(concluded_tag)
-            if not Status.objects.filter(status="PA", requisition=requisition):
-                Status.objects.create(
-                    status="PA",
-                    message="Estado alterado para requisição em andamento.",
-                    requisition=requisition,
-                )
+            return
 
-            requisition.tags.remove(received_tag)
+        with track_requisition(self.requisition):
+            before = stored_delivery_counts(self.pk)
+            super().save(*args, **kwargs)
+            apply_delivered_delta(before, delivery_counts([self]))
+            self.update_tags()
 
-        else:
-            requisition.tags.add(received_tag)
-            requisition.tags.remove(concluded_tag)
-            requisition.tags.remove(partial_tag)
+    def delete(self, *args, **kwargs):
+        from .utils.fulfillment import apply_delivered_delta, stored_delivery_counts
+        from .utils.rollups import track_requisition
 
+        with track_requisition(self.requisition):
+            before = stored_delivery_counts(self.pk)
+            deleted = super().delete(*args, **kwargs)
+            apply_delivered_delta(before, {})
+            self.update_tags()
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.update_tags()
+        return deleted
 
 
 class Event(models.Model):
@@ -131,6 +131,14 @@ class Event(models.Model):
         related_name="requisition_event",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="event_timestamp_id_idx"),
+            models.Index(
+                fields=["requisition", "timestamp", "id"], name="event_timeline_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -146,9 +154,36 @@ class Status(models.Model):
         related_name="requisition_status",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"], name="status_timestamp_id_idx"),
+            models.Index(
+                fields=["requisition", "status"], name="status_requisition_status_idx"
+            ),
+            models.Index(
+                fields=["requisition", "timestamp", "id"], name="status_timeline_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.requisition.protocol} - {self.get_status_display()} - {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        from .utils.fulfillment import refresh_current_status
+
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            refresh_current_status(self.requisition_id)
+
+    def delete(self, *args, **kwargs):
+        from .utils.fulfillment import refresh_current_status
+
+        with transaction.atomic(savepoint=False):
+            deleted = super().delete(*args, **kwargs)
+            refresh_current_status(self.requisition_id)
+
+        return deleted
+
 
 class Tag(models.Model):
     TAG_COLOR_CHOICES = [
@@ -187,10 +222,12 @@ class Tag(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = generate_slug(self.name.lower(), 16)
+        return save_with_unique_slug(self, self.name, super().save, *args, **kwargs)
 
-        super().save(*args, **kwargs)
+
+class RequisitionQuerySet(models.QuerySet):
+    def touch(self) -> int:
+        return self.update(last_updated=timezone.now())
 
 
 class Requisition(models.Model):
@@ -211,37 +248,162 @@ class Requisition(models.Model):
         null=True,
     )
     author_notes = models.TextField(blank=True, default="")
+    delivered_males = models.PositiveIntegerField(default=0, editable=False)
+    delivered_females = models.PositiveIntegerField(default=0, editable=False)
+    current_status = models.CharField(
+        max_length=2, choices=REQUISITION_OPTIONS, default="RE", editable=False
+    )
+    fulfillment_ratio = models.FloatField(default=0.0, editable=False)
+
+    objects = RequisitionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["timestamp", "id"], name="requisition_timestamp_id_idx"
+            ),
+            models.Index(fields=["date"], name="requisition_date_idx"),
+            models.Index(
+                fields=["current_status", "fulfillment_ratio"],
+                name="requisition_progress_idx",
+            ),
+            models.Index(fields=["fulfillment_ratio"], name="requisition_ratio_idx"),
+            # Filtered list pages: equality on the first column, then the
+            # rows come out already in (timestamp, id) order.
+            models.Index(
+                fields=["current_status", "timestamp", "id"],
+                name="requisition_status_page_idx",
+            ),
+            models.Index(
+                fields=["project", "timestamp", "id"],
+                name="requisition_project_page_idx",
+            ),
+            models.Index(
+                fields=["author", "timestamp", "id"],
+                name="requisition_author_page_idx",
+            ),
+            # Same condition as utils.fulfillment.outstanding().
+            models.Index(
+                fields=["timestamp", "id"],
+                name="requisition_outstanding_idx",
+                condition=models.Q(fulfillment_ratio__lt=1)
+                & ~models.Q(current_status="CA"),
+            ),
+        ]
 
     def __str__(self):
         return self.protocol
 
     def generate_protocol(self):
-        current_year = datetime.now().year
+        from .utils.protocols import allocate_protocol
+
+        return allocate_protocol()
+
+    def save_with_protocol(self, *args, **kwargs):
+        allocated = not self.protocol
 
         while True:
-            random_id = "".join([str(random.randint(0, 9)) for _ in range(5)])
-            protocol = f"{random_id}.{current_year}"
+            if allocated:
+                self.protocol = self.generate_protocol()
+
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = Requisition.objects.filter(protocol=self.protocol).exists()
 
-            if not Requisition.objects.filter(protocol=protocol).exists():
-                return protocol
+                if not allocated or not taken:
+                    raise
 
     def save(self, *args, **kwargs):
-        if not self.protocol:
-            self.protocol = self.generate_protocol()
+        from .utils.fulfillment import (
+            FULFILLMENT_FIELDS,
+            fulfillment_ratio,
+            refresh_fulfillment_ratio,
+            update_requisition_state,
+        )
+        from .utils.rollups import track_requisition
 
-        super().save(*args, **kwargs)
+        adding = self._state.adding
 
-        if not Delivery.objects.filter(requisition=self).exists():
-            Delivery.objects.create(
-                requisition=self,
-                is_active=False,
-                date=datetime.now(),
-                notes="Inicialização de entrega.",
+        if adding:
+            self.fulfillment_ratio = fulfillment_ratio(
+                self.males, self.females, self.delivered_males, self.delivered_females
             )
+        elif kwargs.get("update_fields") is None:
+            # A stale instance must not overwrite counters that deliveries
+            # and statuses moved since it was loaded.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in FULFILLMENT_FIELDS
+            ]
+
+        required_changed = not adding and {"males", "females"} & set(
+            kwargs.get("update_fields") or ()
+        )
+
+        with track_requisition(self):
+            self.save_with_protocol(*args, **kwargs)
+
+            if required_changed:
+                refresh_fulfillment_ratio(self.pk)
+                update_requisition_state(self.pk)
+
+            if not Delivery.objects.filter(requisition=self).exists():
+                Delivery.objects.create(
+                    requisition=self,
+                    is_active=False,
+                    date=datetime.now(),
+                    notes="Inicialização de entrega.",
+                )
+
+            if not Status.objects.filter(requisition=self).exists():
+                Status.objects.create(
+                    status="RE",
+                    message="Requisição recebida.",
+                    requisition=self,
+                )
+
+    def delete(self, *args, **kwargs):
+        from .utils.rollups import track_requisition
+
+        with track_requisition(self):
+            return super().delete(*args, **kwargs)
 
-        if not Status.objects.filter(requisition=self).exists():
-            Status.objects.create(
-                status="RE",
-                message="Requisição recebida.",
-                requisition=self,
+
+class StatisticsRollup(models.Model):
+    dimension = models.CharField(max_length=16)
+    key = models.CharField(max_length=255, null=True)
+    date = models.DateField()
+    requisitions = models.IntegerField(default=0)
+    required_males = models.IntegerField(default=0)
+    required_females = models.IntegerField(default=0)
+    delivered_males = models.IntegerField(default=0)
+    delivered_females = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "key", "date"], name="unique_statistics_rollup"
             )
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}: {self.key} - {self.date}"
+
+
+class ProtocolCounter(models.Model):
+    year = models.PositiveSmallIntegerField(unique=True)
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.value}"
+
+
+class DataVersion(models.Model):
+    name = models.CharField(max_length=32, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from core.serializers import DynamicFieldsMixin
 from users.serializers import ProfileSerializer
 
 from .models import (
@@ -12,13 +13,13 @@ from .models import (
 )
 
 
-class RequisitionBaseSerializer(serializers.ModelSerializer):
+class RequisitionBaseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Requisition
         fields = "__all__"
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
     advisor = ProfileSerializer(read_only=True)
     lookup_field = "slug"
@@ -32,13 +33,13 @@ class ProjectSerializer(serializers.ModelSerializer):
         }
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = "__all__"
 
 
-class DeliverySerializer(serializers.ModelSerializer):
+class DeliverySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
     requisition = RequisitionBaseSerializer(read_only=True)
 
@@ -47,7 +48,7 @@ class DeliverySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
 
     class Meta:
@@ -55,7 +56,7 @@ class EventSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class StatusSerializer(serializers.ModelSerializer):
+class StatusSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
 
     class Meta:
@@ -63,34 +64,52 @@ class StatusSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class RequisitionSerializer(serializers.ModelSerializer):
+class RequisitionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = ProfileSerializer(read_only=True)
     project = ProjectSerializer(read_only=True)
     deliveries = serializers.SerializerMethodField()
     events = EventSerializer(many=True, source="requisition_event", read_only=True)
     status = StatusSerializer(many=True, source="requisition_status", read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    prefetch_method_fields = {
+        "deliveries": (
+            "requisition_delivery",
+            lambda: Delivery.objects.filter(is_active=True),
+            "active_deliveries",
+            DeliverySerializer,
+        )
+    }
 
     class Meta:
         model = Requisition
         fields = "__all__"
 
-    def to_representation(self, instance):
-        instance = (
-            Requisition.objects.select_related("author", "project")
-            .prefetch_related("tags")
-            .get(pk=instance.pk)
-        )
+    def get_fields(self):
+        fields = super().get_fields()
 
-        return super().to_representation(instance)
+        # ``?timeline=N`` replaces the unbounded history on the detail view.
+        if self.context.get("timeline"):
+            for name in ["deliveries", "events", "status"]:
+                fields.pop(name, None)
+
+        return fields
 
     def get_deliveries(self, instance):
-        active_deliveries = instance.requisition_delivery.filter(is_active=True)
-        serializer = DeliverySerializer(active_deliveries, many=True)
+        active_deliveries = getattr(instance, "active_deliveries", None)
+
+        if active_deliveries is None:
+            active_deliveries = instance.requisition_delivery.filter(is_active=True)
+
+        if not self.is_expanded("deliveries"):
+            return [delivery.id for delivery in active_deliveries]
+
+        serializer = self.nested_serializer(
+            "deliveries", DeliverySerializer, active_deliveries, many=True
+        )
         return serializer.data
 
 
-class StatisticsSerializer(serializers.ModelSerializer):
+class StatisticsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     requisition = RequisitionSerializer(read_only=True)
 
     class Meta:
@@ -0,0 +1,152 @@
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import Department, Institute, Profile
+
+from .models import Delivery, Event, Project, Requisition, Status, Tag
+from .utils.cache import bump_data_version
+from .utils.rollups import (
+    begin_cascade_delete,
+    begin_tags_change,
+    end_cascade_delete,
+    end_tags_change,
+)
+from .utils.tags import tag_registry
+
+STATISTICS_SOURCES = [
+    Delivery,
+    Requisition,
+    Project,
+    Tag,
+    Profile,
+    Institute,
+    Department,
+]
+
+REQUISITION_CHILDREN = [Delivery, Status, Event]
+
+
+def profile_requisitions(profiles) -> Q:
+    return (
+        Q(project__author__in=profiles)
+        | Q(project__advisor__in=profiles)
+        | Q(author__in=profiles)
+        | Q(requisition_delivery__author__in=profiles)
+        | Q(requisition_event__author__in=profiles)
+        | Q(requisition_status__author__in=profiles)
+    )
+
+
+# Requisitions that embed each model in their representation. Deleting one
+# cascades into them (or into their deliveries) without Requisition.delete
+# or Delivery.delete, and editing one changes them without touching their
+# row.
+RELATED_REQUISITIONS = {
+    Project: lambda project: Q(project=project),
+    Profile: lambda profile: profile_requisitions([profile.pk]),
+    Department: lambda department: profile_requisitions(
+        Profile.objects.filter(department=department).values("pk")
+    ),
+    Institute: lambda institute: profile_requisitions(
+        Profile.objects.filter(
+            Q(institute=institute) | Q(department__institute=institute)
+        ).values("pk")
+    ),
+    Tag: lambda tag: Q(tags=tag),
+    User: lambda user: profile_requisitions(
+        Profile.objects.filter(user=user).values("pk")
+    ),
+}
+
+
+@receiver(m2m_changed, sender=Requisition.tags.through)
+def track_requisition_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_add", "pre_remove", "pre_clear"):
+        if not reverse:
+            requisitions = [instance]
+        elif pk_set is None:
+            requisitions = list(instance.requisition_tags.all())
+        else:
+            requisitions = list(Requisition.objects.filter(pk__in=pk_set))
+
+        if action != "pre_clear" and not pk_set:
+            requisitions = []
+
+        begin_tags_change(instance, requisitions)
+
+    elif action in ("post_add", "post_remove", "post_clear"):
+        requisitions = end_tags_change(instance)
+        Requisition.objects.filter(
+            pk__in=[requisition.pk for requisition in requisitions]
+        ).touch()
+        bump_data_version()
+
+
+def bump_statistics_version(sender, **kwargs):
+    bump_data_version()
+
+
+for model in STATISTICS_SOURCES:
+    post_save.connect(bump_statistics_version, sender=model)
+    post_delete.connect(bump_statistics_version, sender=model)
+
+
+def begin_statistics_cascade(sender, instance, origin=None, **kwargs):
+    requisitions = ()
+    # Delivery.delete tracks its own delivery; queryset deletes and cascades
+    # only pass through here. Only the pk of the requisition is needed.
+    deliveries = [instance] if sender is Delivery and origin is not instance else ()
+
+    if deliveries:
+        requisitions = [Requisition(pk=instance.requisition_id)]
+
+    if sender in RELATED_REQUISITIONS:
+        requisitions = (
+            Requisition.objects.filter(RELATED_REQUISITIONS[sender](instance))
+            .distinct()
+            .only("pk")
+        )
+
+    begin_cascade_delete(origin, requisitions, deliveries)
+
+
+def end_statistics_cascade(sender, instance, origin=None, **kwargs):
+    end_cascade_delete(origin)
+
+
+# Delivery and Requisition are counted too, so the last post_delete of a
+# cascade comes after its deliveries and requisitions are gone. Listening to
+# every sender would turn off fast deletes for the m2m through tables.
+for model in STATISTICS_SOURCES:
+    pre_delete.connect(begin_statistics_cascade, sender=model)
+    post_delete.connect(end_statistics_cascade, sender=model)
+
+
+def touch_related_requisitions(sender, instance, created=False, **kwargs):
+    update_fields = kwargs.get("update_fields")
+
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+
+    Requisition.objects.filter(RELATED_REQUISITIONS[sender](instance)).touch()
+
+
+for model in RELATED_REQUISITIONS:
+    post_save.connect(touch_related_requisitions, sender=model)
+
+
+def touch_parent_requisition(sender, instance, **kwargs):
+    Requisition.objects.filter(pk=instance.requisition_id).touch()
+
+
+for model in REQUISITION_CHILDREN:
+    post_save.connect(touch_parent_requisition, sender=model)
+    post_delete.connect(touch_parent_requisition, sender=model)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_registry(sender, **kwargs):
+    tag_registry.invalidate()
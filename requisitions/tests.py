@@ -1,9 +1,96 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Project, Delivery, Requisition
-from users.models import Profile
+from .models import (
+    Project,
+    Delivery,
+    Event,
+    ProtocolCounter,
+    Requisition,
+    StatisticsRollup,
+    Status,
+    Tag,
+)
+from .utils.benchmark import (
+    BENCHMARK_USERNAME,
+    benchmark_session,
+    compare_baselines,
+    run_endpoint_suite,
+    sample_lookup,
+)
+from .utils.fulfillment import CONCLUDED, PARTIAL, STATE_TAGS
+from .utils.imports import IMPORT_CHUNK_SIZE
+from .utils.load_data import SCALE_UNIT, generate_load_data
+from .utils.query_budget import check_query_budgets
+from .utils.protocols import (
+    PROTOCOL_SPACE,
+    allocate_protocol,
+    allocate_protocols,
+    format_protocol,
+    permute_sequence,
+)
+from .utils.query_plans import plan_problems
+from .utils.tags import tag_registry
+from .utils.timeline import TIMELINE_SOURCES
+from .utils.utils import generate_unique_slugs
+from .views import RequisitionViewSet
+from core import async_views
+from core.metrics import ROW_SIZE, registry
+from core.urls import router
+from users.models import Profile, Institute, Department
+
+
+class ProjectFixtureMixin:
+    def create_fixture(
+        self, is_staff=False, profile=None, project=None, requisition=None
+    ):
+        """
+        Creates ``self.user`` with its ``self.profile`` and ``self.project``,
+        plus ``self.requisition`` when ``requisition`` is given, and
+        authenticates ``self.client``. The dicts override the default fields.
+        """
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword", is_staff=is_staff
+        )
+        self.profile = Profile.objects.create(
+            user=self.user, **{"name": "Test User", **(profile or {})}
+        )
+        self.project = Project.objects.create(
+            author=self.profile,
+            advisor=self.profile,
+            **{"title": "Test Project", "ceua_protocol": "CEUA123", **(project or {})},
+        )
+
+        if requisition is not None:
+            self.requisition = Requisition.objects.create(
+                project=self.project, **{"date": "2023-08-25", **requisition}
+            )
+
+        self.client.force_authenticate(user=self.user)
 
 
 class RequisitionAppTests(TestCase):
@@ -85,4 +172,1800 @@ class RequisitionAppTests(TestCase):
     def test_list_deliveries(self):
         response = self.client.get("/api/deliveries/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data), 1)
+
+
+class StatisticsTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.institute = Institute.objects.create(name="Centro de Biociencias")
+        self.department = Department.objects.create(
+            name="Nutrição", institute=self.institute
+        )
+        self.create_fixture(
+            profile={"institute": self.institute, "department": self.department}
+        )
+        self.tag = Tag.objects.create(name="Ratos")
+        caches[settings.STATISTICS_CACHE_ALIAS].clear()
+
+    def create_requisitions(self, amount, date="2023-08-25"):
+        for _ in range(amount):
+            requisition = Requisition.objects.create(
+                date=date, males=10, females=6, project=self.project
+            )
+            requisition.tags.add(self.tag)
+            Delivery.objects.create(
+                date=date, males=4, females=2, requisition=requisition
+            )
+            Delivery.objects.create(
+                date=date, males=1, females=1, requisition=requisition
+            )
+
+    def test_statistics_totals(self):
+        self.create_requisitions(2)
+        self.create_requisitions(1, date="2022-01-01")
+
+        response = self.client.get("/api/statistics/", {"start_date": "2023-01-01"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = {
+            "required_males": 20,
+            "required_females": 12,
+            "delivered_males": 10,
+            "delivered_females": 6,
+        }
+        self.assertEqual(response.data["by_total"], expected)
+        self.assertEqual(response.data["by_institute"]["CDB"], expected)
+        self.assertEqual(response.data["by_department"]["Nutrição (CDB)"], expected)
+        self.assertEqual(response.data["by_advisor"]["Test User"], expected)
+        self.assertEqual(response.data["by_project"]["Test Project"], expected)
+        self.assertEqual(response.data["by_tags"]["Ratos"], expected)
+        self.assertEqual(len(response.data["by_protocol"]), 2)
+
+        for bucket in response.data["by_protocol"].values():
+            self.assertEqual(bucket["required_males"], 10)
+            self.assertEqual(bucket["delivered_males"], 5)
+
+    def test_statistics_query_count_is_constant(self):
+        self.create_requisitions(1)
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get("/api/statistics/")
+
+        self.create_requisitions(10)
+
+        with CaptureQueriesContext(connection) as large:
+            self.client.get("/api/statistics/")
+
+        self.assertEqual(len(small), len(large))
+
+    def test_rollups_follow_writes(self):
+        self.create_requisitions(3)
+        requisition = Requisition.objects.first()
+        delivery = Delivery.objects.filter(requisition=requisition).last()
+
+        response = self.client.delete(f"/api/deliveries/{delivery.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        requisition.males = 30
+        requisition.date = "2022-05-05"
+        requisition.save()
+        requisition.tags.clear()
+        Tag.objects.create(name="Camundongos").requisition_tags.add(requisition)
+        Requisition.objects.last().delete()
+
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+        with self.settings(STATISTICS_USE_ROLLUPS=False):
+            live = self.client.get("/api/statistics/", {"end_date": "2023-01-01"})
+
+        rolled_up = self.client.get("/api/statistics/", {"end_date": "2023-01-01"})
+        self.assertEqual(rolled_up.data, live.data)
+        self.assertEqual(rolled_up.data["by_total"]["required_males"], 30)
+
+    def test_rollups_follow_renames(self):
+        self.create_requisitions(1)
+        self.client.get("/api/statistics/")
+
+        self.project.title = "Projeto Renomeado"
+        self.project.save()
+        self.profile.name = "Outro Nome"
+        self.profile.save()
+        self.institute.abbreviation = "CB"
+        self.institute.save()
+        self.tag.name = "Camundongos"
+        self.tag.save()
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(list(data["by_project"]), ["Projeto Renomeado"])
+        self.assertEqual(list(data["by_advisor"]), ["Outro Nome"])
+        self.assertEqual(list(data["by_department"]), ["Nutrição (CB)"])
+        self.assertIn("Camundongos", data["by_tags"])
+        self.assertNotIn("Ratos", data["by_tags"])
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_rollups_follow_queryset_deletes(self):
+        self.create_requisitions(2)
+
+        Delivery.objects.filter(males=4).delete()
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(data["by_total"]["delivered_males"], 2)
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_rollups_follow_project_reassignments(self):
+        self.create_requisitions(2)
+        other = Profile.objects.create(
+            user=User.objects.create_user(username="other"),
+            name="Outro",
+            institute=Institute.objects.create(name="Instituto de Quimica"),
+        )
+
+        response = self.client.put(
+            f"/api/projects/{self.project.slug}/",
+            {
+                "title": "Test Project",
+                "ceua_protocol": "CEUA123",
+                "author": "Outro",
+                "advisor": "Outro",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(list(data["by_advisor"]), ["Outro"])
+        self.assertEqual(list(data["by_author"]), ["Outro"])
+        self.assertEqual(list(data["by_institute"]), ["IDQ"])
+        self.assertEqual(data["by_institute"]["IDQ"]["required_males"], 20)
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_rollups_follow_profile_moves(self):
+        self.create_requisitions(2)
+        institute = Institute.objects.create(name="Instituto de Quimica")
+        department = Department.objects.create(name="Orgânica", institute=institute)
+
+        response = self.client.patch(
+            f"/api/profiles/{self.profile.id}/",
+            {
+                "id": self.profile.id,
+                "email": "test@example.com",
+                "institute": institute.name,
+                "department": department.name,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(list(data["by_institute"]), ["IDQ"])
+        self.assertEqual(list(data["by_department"]), ["Orgânica (IDQ)"])
+        self.assertEqual(data["by_department"]["Orgânica (IDQ)"]["required_males"], 20)
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+        self.profile.department = None
+        self.profile.save(update_fields=["department"])
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_rollups_follow_cascade_deletes(self):
+        self.create_requisitions(2)
+        other = Profile.objects.create(
+            user=User.objects.create_user(username="other"), name="Outro"
+        )
+        other_project = Project.objects.create(
+            title="Outro Projeto", ceua_protocol="CEUA2", author=other, advisor=other
+        )
+        requisition = Requisition.objects.create(
+            date="2023-08-25", males=3, project=other_project
+        )
+        Delivery.objects.create(date="2023-08-25", males=1, requisition=requisition)
+
+        self.project.delete()
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(data["by_total"]["required_males"], 3)
+        self.assertEqual(list(data["by_project"]), ["Outro Projeto"])
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+        # Deliveries authored by a deleted profile go with it.
+        Delivery.objects.create(
+            date="2023-08-25", males=2, author=self.profile, requisition=requisition
+        )
+        self.tag.requisition_tags.add(requisition)
+        self.tag.delete()
+        self.institute.delete()
+
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(data["by_total"]["delivered_males"], 1)
+        self.assertNotIn("Ratos", data["by_tags"])
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+        other.user.delete()
+
+        data = self.client.get("/api/statistics/").data
+        self.assertEqual(data["by_total"]["required_males"], 0)
+        self.assertFalse(StatisticsRollup.objects.exclude(requisitions=0).exists())
+
+    def test_rebuild_rollups(self):
+        self.create_requisitions(2)
+        StatisticsRollup.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_statistics_rollups", check=True, stderr=StringIO())
+
+        call_command("rebuild_statistics_rollups", stdout=StringIO())
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_statistics_cache_is_versioned(self):
+        self.create_requisitions(1)
+        params = {"start_date": "2023-01-01", "ordering": "date"}
+
+        first = self.client.get("/api/statistics/", params)
+        second = self.client.get("/api/statistics/", params)
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+        self.create_requisitions(1)
+        third = self.client.get("/api/statistics/", params)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.data["by_total"]["required_males"], 20)
+
+        info = self.client.get("/api/statistics/cache/").data
+        self.assertGreaterEqual(info["hits"], 1)
+        self.assertGreaterEqual(info["misses"], 2)
+
+    def test_export_deliveries(self):
+        self.create_requisitions(2)
+
+        response = self.client.get("/api/deliveries/export/")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(
+            lines[0].split(",")[:4], ["id", "date", "timestamp", "protocol"]
+        )
+        self.assertEqual(len(lines), 5)
+
+        response = self.client.get(
+            "/api/deliveries/export/", {"type": "ndjson", "end_date": "2020-01-01"}
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_export_statistics(self):
+        self.create_requisitions(2)
+
+        response = self.client.get("/api/statistics/export/", {"type": "ndjson"})
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        total = next(row for row in rows if row["dimension"] == "by_total")
+        self.assertEqual(total["required_males"], 20)
+        self.assertEqual(total["delivered_females"], 6)
+        self.assertIn(
+            {"dimension": "by_tags", "key": "Ratos"},
+            [{"dimension": row["dimension"], "key": row["key"]} for row in rows],
+        )
+
+
+class RequisitionListTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.institute = Institute.objects.create(name="Centro de Biociencias")
+        self.department = Department.objects.create(
+            name="Nutrição", institute=self.institute
+        )
+        self.create_fixture(
+            is_staff=True,
+            profile={"institute": self.institute, "department": self.department},
+        )
+
+    def create_requisitions(self, amount):
+        for index in range(amount):
+            requisition = Requisition.objects.create(
+                date="2023-08-25",
+                males=10,
+                females=6,
+                project=self.project,
+                author=self.profile,
+            )
+            requisition.tags.add(Tag.objects.create(name=f"Tag {requisition.id}"))
+            Delivery.objects.create(
+                date="2023-08-25",
+                males=4,
+                females=2,
+                requisition=requisition,
+                author=self.profile,
+            )
+            Event.objects.create(
+                title="Evento", requisition=requisition, author=self.profile
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def test_requisition_list_query_count_is_constant(self):
+        self.create_requisitions(1)
+        small = self.count_queries("/api/requisitions/")
+        self.create_requisitions(5)
+        large = self.count_queries("/api/requisitions/")
+
+        self.assertEqual(small, large)
+
+    def test_requisition_list_payload(self):
+        self.create_requisitions(2)
+        response = self.client.get("/api/requisitions/")
+        requisition = response.data["results"][0]
+
+        self.assertEqual(len(requisition["deliveries"]), 1)
+        self.assertEqual(len(requisition["events"]), 1)
+        self.assertEqual(requisition["project"]["advisor"]["name"], "Test User")
+        self.assertEqual(
+            requisition["deliveries"][0]["author"]["department"]["institute"]["name"],
+            "Centro de Biociencias",
+        )
+
+    def test_delivery_list_query_count_is_constant(self):
+        self.create_requisitions(1)
+        small = self.count_queries("/api/deliveries/")
+        self.create_requisitions(5)
+        large = self.count_queries("/api/deliveries/")
+
+        self.assertEqual(small, large)
+
+    def test_sparse_fieldsets(self):
+        self.create_requisitions(3)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                "/api/requisitions/", {"fields": "protocol,date"}
+            )
+
+        self.assertEqual(set(response.data["results"][0]), {"protocol", "date"})
+        self.assertEqual(len(context), 2)
+        self.assertNotIn("author_notes", context.captured_queries[-1]["sql"])
+
+    def test_opt_in_expansion(self):
+        self.create_requisitions(2)
+        response = self.client.get(
+            "/api/requisitions/",
+            {"expand": "project.advisor", "fields": "protocol,project,tags,deliveries"},
+        )
+        requisition = response.data["results"][0]
+
+        self.assertEqual(
+            set(requisition), {"protocol", "project", "tags", "deliveries"}
+        )
+        self.assertEqual(requisition["project"]["advisor"]["name"], "Test User")
+        self.assertEqual(requisition["project"]["author"], self.profile.id)
+        self.assertTrue(all(isinstance(tag, int) for tag in requisition["tags"]))
+        self.assertTrue(
+            all(isinstance(delivery, int) for delivery in requisition["deliveries"])
+        )
+
+    def test_nested_fields_on_profiles(self):
+        response = self.client.get(
+            "/api/profiles/", {"fields": "name,department.institute.abbreviation"}
+        )
+        profile = response.data["results"][0]
+
+        self.assertEqual(
+            profile,
+            {"name": "Test User", "department": {"institute": {"abbreviation": "CDB"}}},
+        )
+
+    def test_cursor_pagination(self):
+        self.create_requisitions(30)
+        Requisition.objects.filter(id__lte=10).update(
+            timestamp=Requisition.objects.get(id=1).timestamp
+        )
+
+        protocols = []
+        url = "/api/requisitions/?cursor=&fields=protocol"
+
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            self.assertFalse(
+                any("COUNT(" in query["sql"] for query in context.captured_queries)
+            )
+            protocols += [item["protocol"] for item in response.data["results"]]
+            url = response.data["next"]
+
+        expected = Requisition.objects.order_by("-timestamp", "-id").values_list(
+            "protocol", flat=True
+        )
+        self.assertEqual(protocols, list(expected))
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/requisitions/", {"cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_rejects_orderings_it_cannot_follow(self):
+        self.create_requisitions(2)
+
+        for ordering, expected in [
+            ("fulfillment_ratio", status.HTTP_400_BAD_REQUEST),
+            ("-timestamp", status.HTTP_200_OK),
+            ("timestamp", status.HTTP_200_OK),
+        ]:
+            with self.subTest(ordering=ordering):
+                response = self.client.get(
+                    "/api/requisitions/", {"cursor": "", "ordering": ordering}
+                )
+                self.assertEqual(response.status_code, expected)
+
+        response = self.client.get(
+            "/api/requisitions/", {"ordering": "fulfillment_ratio"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_delivery_ingestion(self):
+        self.create_requisitions(2)
+        first, second = Requisition.objects.order_by("id")
+        payload = [
+            {"requisition": first.protocol, "date": "2023-09-01", "males": 6},
+            {"requisition": first.protocol, "date": "2023-09-02", "females": 4},
+            {"requisition": second.protocol, "date": "2023-09-01", "males": 1},
+            {"requisition": "00000.2023", "date": "2023-09-01"},
+            {"requisition": second.protocol, "date": "data"},
+            {"requisition": [first.protocol], "date": "2023-09-01"},
+            {"requisition": {"protocol": first.protocol}, "date": "2023-09-01"},
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/deliveries/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 3)
+        self.assertIn("requisition", response.data["results"][3]["errors"])
+        self.assertIn("date", response.data["results"][4]["errors"])
+        self.assertIn("requisition", response.data["results"][5]["errors"])
+        self.assertIn("requisition", response.data["results"][6]["errors"])
+        self.assertEqual(
+            Delivery.objects.filter(date__range=("2023-09-01", "2023-09-02")).count(),
+            3,
+        )
+        inserts = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "requisitions_delivery"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(first.tags.filter(name="Concluída").exists())
+        self.assertTrue(second.tags.filter(name="Parcialmente Concluída").exists())
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+
+class RequisitionFilterTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.institute = Institute.objects.create(name="Centro de Biociencias")
+        self.other_institute = Institute.objects.create(name="Centro de Saúde")
+        self.department = Department.objects.create(
+            name="Nutrição", institute=self.institute
+        )
+        self.create_fixture(
+            is_staff=True,
+            profile={"institute": self.institute, "department": self.department},
+            project={"title": "Dieta"},
+        )
+        self.other_advisor = Profile.objects.create(
+            user=User.objects.create_user(username="other"),
+            name="Outro Orientador",
+            institute=self.other_institute,
+        )
+        self.other_project = Project.objects.create(
+            title="Estresse",
+            ceua_protocol="CEUA2",
+            author=self.other_advisor,
+            advisor=self.other_advisor,
+        )
+        self.wistar = Tag.objects.create(name="Wistar")
+        self.urgent = Tag.objects.create(name="Urgente")
+
+        self.received = self.requisition(self.project, "2023-01-10", self.wistar)
+        self.partial = self.requisition(
+            self.project, "2023-02-10", self.wistar, self.urgent
+        )
+        self.done = self.requisition(self.other_project, "2023-03-10", self.urgent)
+        self.deliver(self.partial, 2)
+        self.deliver(self.done, 10)
+
+    def requisition(self, project, date, *tags):
+        requisition = Requisition.objects.create(
+            date=date, males=10, project=project, author=project.author
+        )
+        requisition.tags.add(*tags)
+
+        return requisition
+
+    def deliver(self, requisition, males):
+        return Delivery.objects.create(
+            date=requisition.date, males=males, requisition=requisition
+        )
+
+    def ids(self, url, **params):
+        response = self.client.get(url, {"fields": "id", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        return {item["id"] for item in response.data["results"]}
+
+    def assertRequisitions(self, params, expected):
+        self.assertEqual(
+            self.ids("/api/requisitions/", **params),
+            {requisition.id for requisition in expected},
+        )
+
+    def test_requisition_filters(self):
+        cases = [
+            ({"status": "RE"}, [self.received]),
+            ({"status": "PA"}, [self.partial]),
+            ({"tags": "wistar,urgente"}, [self.received, self.partial, self.done]),
+            ({"tags_all": "wistar,urgente"}, [self.partial]),
+            ({"project": self.project.slug}, [self.received, self.partial]),
+            ({"advisor": self.other_advisor.id}, [self.done]),
+            ({"author": self.profile.id}, [self.received, self.partial]),
+            ({"institute": self.other_institute.id}, [self.done]),
+            ({"department": self.department.id}, [self.received, self.partial]),
+            ({"start_date": "2023-02-01", "end_date": "2023-02-28"}, [self.partial]),
+            ({"outstanding": "true"}, [self.received, self.partial]),
+            ({"outstanding": "false"}, [self.done]),
+            ({"status": "RE", "project": self.project.slug}, [self.received]),
+        ]
+
+        for params, expected in cases:
+            with self.subTest(**params):
+                self.assertRequisitions(params, expected)
+
+    def test_timestamp_range(self):
+        Requisition.objects.filter(pk=self.received.pk).update(
+            timestamp=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertRequisitions(
+            {"created_before": "2021-01-01T00:00:00Z"}, [self.received]
+        )
+        self.assertRequisitions(
+            {"created_after": "2021-01-01T00:00:00Z"}, [self.partial, self.done]
+        )
+
+    def test_delivery_filters_follow_the_requisition(self):
+        partial = self.deliver(self.partial, 1)
+
+        self.assertEqual(
+            self.ids("/api/deliveries/", status="PA", tags="urgente"),
+            {partial.id, Delivery.objects.get(requisition=self.partial, males=2).id},
+        )
+        self.assertEqual(
+            self.ids("/api/deliveries/", outstanding="false"),
+            {Delivery.objects.get(requisition=self.done, males=10).id},
+        )
+
+    def test_invalid_filter_value(self):
+        response = self.client.get("/api/requisitions/", {"status": "XX"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("status", response.data)
+
+
+class RequisitionTimelineTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture(is_staff=True)
+        self.requisition = Requisition.objects.create(
+            date="2024-01-01", males=10, project=self.project, author=self.profile
+        )
+        self.url = f"/api/requisitions/{self.requisition.protocol}/timeline/"
+
+        Status.objects.filter(requisition=self.requisition).delete()
+        Delivery.objects.filter(requisition=self.requisition).delete()
+
+        # Two entries of different tables share the 10h timestamp.
+        self.received = self.entry(Status, 8, status="RE")
+        self.inactive = self.entry(Delivery, 9, date="2024-01-01", is_active=False)
+        self.delivery = self.entry(Delivery, 10, date="2024-01-01", males=4)
+        self.event = self.entry(Event, 10, title="Contato")
+        self.partial = self.entry(Status, 11, status="PA")
+        Status.objects.filter(requisition=self.requisition).exclude(
+            pk__in=[self.received.pk, self.partial.pk]
+        ).delete()
+
+    def entry(self, model, hour, **fields):
+        instance = model.objects.create(requisition=self.requisition, **fields)
+        moment = datetime(2024, 1, 1, hour, tzinfo=timezone.utc)
+        model.objects.filter(pk=instance.pk).update(timestamp=moment)
+
+        return instance
+
+    def entries(self, results):
+        return [(item["type"], item["data"]["id"]) for item in results]
+
+    def test_timeline_merges_entries_newest_first(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(
+            self.entries(response.data["results"]),
+            [
+                ("status", self.partial.id),
+                ("event", self.event.id),
+                ("delivery", self.delivery.id),
+                ("status", self.received.id),
+            ],
+        )
+        self.assertEqual(response.data["results"][-1]["data"]["status"], "RE")
+
+    def test_cursor_pages_cover_every_entry(self):
+        expected = self.entries(self.client.get(self.url).data["results"])
+        seen, url, pages = [], f"{self.url}?limit=1", 0
+
+        while url:
+            response = self.client.get(url)
+            seen += self.entries(response.data["results"])
+            url = response.data["next"]
+            pages += 1
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, len(expected))
+
+    def test_since_returns_newer_entries(self):
+        response = self.client.get(self.url, {"since": "2024-01-01T10:00:00+00:00"})
+
+        self.assertEqual(
+            self.entries(response.data["results"]), [("status", self.partial.id)]
+        )
+
+        response = self.client.get(self.url, {"since": "ontem"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_with_every_entry_type(self):
+        # Validators and id, the UNION, one query per entry type and the
+        # delivery's requisition tags.
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+
+        self.assertEqual(
+            {item["type"] for item in response.data["results"]}, set(TIMELINE_SOURCES)
+        )
+
+    def test_budgets_sample_a_requisition_with_every_entry_type(self):
+        Event.objects.filter(requisition=self.requisition).delete()
+        complete = Requisition.objects.create(date="2024-01-02", project=self.project)
+        Delivery.objects.create(date="2024-01-02", requisition=complete, males=1)
+        Event.objects.create(requisition=complete, title="Contato")
+
+        self.assertEqual(
+            sample_lookup(RequisitionViewSet, self.user), complete.protocol
+        )
+
+    def test_invalid_cursor_and_protocol(self):
+        response = self.client.get(self.url, {"cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get("/api/requisitions/1.1999/timeline/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail_returns_latest_entries(self):
+        detail = f"/api/requisitions/{self.requisition.protocol}/"
+        response = self.client.get(detail, {"timeline": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for name in ["deliveries", "events", "status"]:
+            self.assertNotIn(name, response.data)
+
+        timeline = response.data["timeline"]
+        self.assertEqual(
+            self.entries(timeline["results"]),
+            [("status", self.partial.id), ("event", self.event.id)],
+        )
+
+        response = self.client.get(timeline["next"])
+        self.assertEqual(
+            self.entries(response.data["results"]),
+            [("delivery", self.delivery.id), ("status", self.received.id)],
+        )
+
+        response = self.client.get(detail, {"timeline": "0"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(detail)
+        self.assertIn("events", response.data)
+        self.assertNotIn("timeline", response.data)
+
+
+class FulfillmentStateTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture(requisition={"males": 10, "females": 6})
+
+    def system_tags(self):
+        return set(
+            self.requisition.tags.filter(name__in=STATE_TAGS.values()).values_list(
+                "name", flat=True
+            )
+        )
+
+    def statuses(self):
+        return list(
+            self.requisition.requisition_status.order_by("id").values_list(
+                "status", flat=True
+            )
+        )
+
+    def deliver(self, males, females):
+        return Delivery.objects.create(
+            date="2023-08-25",
+            males=males,
+            females=females,
+            requisition=self.requisition,
+        )
+
+    def test_state_transitions(self):
+        self.assertEqual(self.system_tags(), {"Recebida"})
+        self.assertEqual(self.statuses(), ["RE"])
+
+        self.deliver(4, 2)
+        self.assertEqual(self.system_tags(), {"Parcialmente Concluída"})
+
+        self.deliver(1, 1)
+        self.assertEqual(self.statuses(), ["RE", "PA"])
+
+        last = self.deliver(5, 3)
+        self.assertEqual(self.system_tags(), {"Concluída"})
+        self.assertEqual(self.statuses(), ["RE", "PA", "CO"])
+
+        last.delete()
+        self.assertEqual(self.system_tags(), {"Parcialmente Concluída"})
+        self.assertEqual(self.statuses(), ["RE", "PA", "CO", "PA"])
+
+    def test_required_count_edits_resolve_the_state(self):
+        self.deliver(4, 6)
+        self.requisition.males = 4
+        self.requisition.save()
+        self.assertEqual(self.system_tags(), {"Concluída"})
+        self.assertEqual(self.statuses(), ["RE", "PA", "CO"])
+
+        self.requisition.males = 10
+        self.requisition.save()
+        self.assertEqual(self.system_tags(), {"Parcialmente Concluída"})
+        self.assertEqual(self.statuses(), ["RE", "PA", "CO", "PA"])
+        self.assertEqual(
+            Requisition.objects.get(pk=self.requisition.pk).current_status, "PA"
+        )
+
+    def test_state_query_count(self):
+        delivery = self.deliver(4, 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(delivery.update_tags(), PARTIAL)
+
+        Requisition.objects.filter(id=self.requisition.id).update(
+            delivered_males=10, delivered_females=6
+        )
+
+        with self.assertNumQueries(7):
+            self.assertEqual(delivery.update_tags(), CONCLUDED)
+
+
+class FulfillmentCounterTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture(is_staff=True, requisition={"males": 10, "females": 6})
+
+    def counters(self, requisition=None):
+        return (
+            Requisition.objects.filter(pk=(requisition or self.requisition).pk)
+            .values_list(
+                "delivered_males",
+                "delivered_females",
+                "current_status",
+                "fulfillment_ratio",
+            )
+            .get()
+        )
+
+    def deliver(self, males, females):
+        return Delivery.objects.create(
+            date="2023-08-25",
+            males=males,
+            females=females,
+            requisition=self.requisition,
+        )
+
+    def test_counters_follow_delivery_writes(self):
+        self.assertEqual(self.counters(), (0, 0, "RE", 0.0))
+
+        first = self.deliver(4, 2)
+        self.assertEqual(self.counters(), (4, 2, "PA", 6 / 16))
+
+        second = self.deliver(8, 4)
+        self.assertEqual(self.counters(), (12, 6, "CO", 1.0))
+
+        second.males = 2
+        second.save()
+        self.assertEqual(self.counters(), (6, 6, "PA", 12 / 16))
+
+        response = self.client.patch(
+            f"/api/deliveries/{first.id}/", {"is_active": False}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counters()[:2], (2, 4))
+
+        second.delete()
+        self.assertEqual(self.counters()[:2], (0, 0))
+
+        call_command("repair_fulfillment", "--check", stdout=StringIO())
+
+    def test_counters_follow_cascade_deletes(self):
+        other = Profile.objects.create(
+            user=User.objects.create_user(username="other"), name="Outro"
+        )
+        self.deliver(4, 2)
+        Delivery.objects.create(
+            date="2023-08-25",
+            males=6,
+            females=4,
+            author=other,
+            requisition=self.requisition,
+        )
+        self.assertEqual(self.counters(), (10, 6, "CO", 1.0))
+
+        other.delete()
+
+        self.assertEqual(self.counters(), (4, 2, "PA", 6 / 16))
+        self.assertIn(
+            "Parcialmente Concluída",
+            self.requisition.tags.values_list("name", flat=True),
+        )
+        call_command("repair_fulfillment", "--check", stdout=StringIO())
+
+        Delivery.objects.filter(requisition=self.requisition).delete()
+        self.assertEqual(self.counters()[:2], (0, 0))
+        self.assertIn("Recebida", self.requisition.tags.values_list("name", flat=True))
+        call_command("repair_fulfillment", "--check", stdout=StringIO())
+
+    def test_delivery_post_query_count(self):
+        self.deliver(1, 0)
+        payload = {
+            "date": "2023-08-25",
+            "males": 2,
+            "requisition": self.requisition.protocol,
+        }
+
+        with self.assertNumQueries(13):
+            response = self.client.post("/api/deliveries/", payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.counters()[:2], (3, 0))
+
+        payload.update(males=7, females=6)
+        self.client.post("/api/deliveries/", payload, format="json")
+        self.assertEqual(self.counters(), (10, 6, "CO", 1.0))
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+        Delivery.objects.filter(requisition=self.requisition).delete()
+        self.deliver(4, 2)
+        self.assertEqual(self.counters()[:2], (4, 2))
+        call_command("rebuild_statistics_rollups", check=True, stdout=StringIO())
+
+    def test_requisition_saves_keep_counters(self):
+        stale = Requisition.objects.get(pk=self.requisition.pk)
+        self.deliver(5, 3)
+
+        stale.author_notes = "Nota"
+        stale.save()
+        self.assertEqual(self.counters()[:2], (5, 3))
+
+        stale.males = 5
+        stale.females = 3
+        stale.save()
+        self.assertEqual(self.counters()[3], 1.0)
+
+        empty = Requisition.objects.create(
+            date="2023-08-25", males=0, females=0, project=self.project
+        )
+        self.assertEqual(self.counters(empty), (0, 0, "CO", 1.0))
+
+    def test_current_status_is_the_latest_status(self):
+        suspended = Status.objects.create(status="SU", requisition=self.requisition)
+        self.assertEqual(self.counters()[2], "SU")
+
+        suspended.delete()
+        self.assertEqual(self.counters()[2], "RE")
+
+    def test_bulk_deliveries_update_counters(self):
+        response = self.client.post(
+            "/api/deliveries/bulk/",
+            [
+                {
+                    "date": "2023-08-25",
+                    "males": 3,
+                    "requisition": self.requisition.protocol,
+                },
+                {
+                    "date": "2023-08-26",
+                    "females": 6,
+                    "requisition": self.requisition.protocol,
+                },
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.counters(), (3, 6, "PA", 9 / 16))
+
+    def test_list_orders_by_progress(self):
+        ahead = Requisition.objects.create(
+            date="2023-08-25", males=2, females=0, project=self.project
+        )
+        Delivery.objects.create(date="2023-08-25", males=1, requisition=ahead)
+        self.deliver(1, 0)
+
+        response = self.client.get(
+            "/api/requisitions/",
+            {"ordering": "fulfillment_ratio", "fields": "protocol"},
+        )
+
+        self.assertEqual(
+            [item["protocol"] for item in response.data["results"]],
+            [self.requisition.protocol, ahead.protocol],
+        )
+
+    def test_repair_command(self):
+        self.deliver(4, 2)
+        Requisition.objects.filter(pk=self.requisition.pk).update(
+            delivered_males=0, current_status="CA", fulfillment_ratio=0.5
+        )
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "repair_fulfillment", "--check", stdout=StringIO(), stderr=StringIO()
+            )
+
+        stdout = StringIO()
+        call_command("repair_fulfillment", stdout=stdout, stderr=StringIO())
+
+        self.assertIn("1 requisições corrigidas.", stdout.getvalue())
+        self.assertEqual(self.counters(), (4, 2, "PA", 6 / 16))
+
+
+class TagRegistryTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def test_resolve_creates_missing_tags_in_bulk(self):
+        Tag.objects.create(name="Ratos")
+        tag_registry.resolve(["Ratos"])
+
+        with CaptureQueriesContext(connection) as small:
+            tag_registry.resolve(["Ratos", "Novo 1"])
+
+        tag_registry.resolve(["Ratos"])
+
+        with CaptureQueriesContext(connection) as large:
+            tag_registry.resolve(["Ratos", *[f"Outro {index}" for index in range(8)]])
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Tag.objects.count(), 10)
+        self.assertEqual(
+            tag_registry.resolve(["Outro 3"])["Outro 3"],
+            Tag.objects.get(name="Outro 3").id,
+        )
+
+    def test_registry_follows_tag_writes(self):
+        tag = Tag.objects.create(name="Ratos")
+        self.assertEqual(tag_registry.resolve(["Ratos"]), {"Ratos": tag.id})
+
+        tag.delete()
+        replacement = Tag.objects.create(name="Ratos")
+        self.assertEqual(tag_registry.resolve(["Ratos"]), {"Ratos": replacement.id})
+
+        with self.assertNumQueries(1):
+            tag_registry.resolve(["Ratos"])
+
+    def create_requisition(self, tags):
+        payload = {
+            "date": "2023-08-26",
+            "project": f"{self.project.slug}-{self.project.id}",
+            "tags": tags,
+        }
+        tag_registry.resolve([])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/requisitions/", payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response, len(context)
+
+    def test_requisition_create_query_count_ignores_tag_count(self):
+        self.create_requisition(["Aquecimento"])
+        _, small = self.create_requisition(["Ratos"])
+        response, large = self.create_requisition(
+            [f"Tag {index}" for index in range(10)]
+        )
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data["tags"]), 11)
+
+
+class ProtocolAllocatorTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+
+    def create_requisition(self, **kwargs):
+        return Requisition.objects.create(
+            date="2023-08-25", project=self.project, **kwargs
+        )
+
+    def test_permutation_is_a_bijection(self):
+        outputs = {permute_sequence(value, b"key") for value in range(PROTOCOL_SPACE)}
+
+        self.assertEqual(len(outputs), PROTOCOL_SPACE)
+        self.assertEqual(max(outputs), PROTOCOL_SPACE - 1)
+
+    def test_protocols_are_unique_and_counted(self):
+        protocols = {self.create_requisition().protocol for _ in range(50)}
+        year = datetime.now().year
+
+        self.assertEqual(len(protocols), 50)
+        self.assertEqual(ProtocolCounter.objects.get(year=year).value, 50)
+        self.assertTrue(all(p.endswith(f".{year}") for p in protocols))
+
+    def test_allocation_skips_protocols_taken_outside_the_counter(self):
+        year = datetime.now().year
+        self.create_requisition(protocol=format_protocol(0, year))
+
+        requisition = self.create_requisition()
+
+        self.assertEqual(requisition.protocol, format_protocol(1, year))
+
+    def test_counters_start_past_the_highest_sequence_in_use(self):
+        for protocol in ["00003.2020", "00010.2020", "00007.2021", "00003.2022"]:
+            self.create_requisition(protocol=protocol)
+        ProtocolCounter.objects.create(year=2022, value=50)
+        migration = import_module(
+            "requisitions.migrations.0012_protocol_counter_floors"
+        )
+
+        migration.raise_protocol_counters(apps, None)
+
+        self.assertEqual(
+            dict(ProtocolCounter.objects.values_list("year", "value")),
+            {2020: 11, 2021: 8, 2022: 50},
+        )
+
+    def test_explicit_protocol_collision_is_not_retried(self):
+        self.create_requisition(protocol="123.2023")
+
+        with self.assertRaises(IntegrityError):
+            self.create_requisition(protocol="123.2023")
+
+    def test_exhausted_year_raises_validation_error(self):
+        year = datetime.now().year
+        ProtocolCounter.objects.create(year=year, value=PROTOCOL_SPACE)
+
+        with self.assertRaises(ValidationError):
+            self.create_requisition()
+
+    def test_exhausted_year_is_a_bad_request(self):
+        ProtocolCounter.objects.create(year=datetime.now().year, value=PROTOCOL_SPACE)
+        client = APIClient()
+        client.force_authenticate(user=self.profile.user)
+
+        response = client.post(
+            "/api/requisitions/",
+            {"project": f"{self.project.slug}-{self.project.id}", "date": "2023-08-25"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Requisition.objects.exists())
+
+
+class ProtocolConcurrencyTests(TransactionTestCase):
+    workers = 8
+    per_worker = 25
+
+    @contextmanager
+    def file_database(self):
+        """
+        Points the default alias of new (worker thread) connections at a file
+        copy of the test database using the production profile: the
+        shared-cache in-memory one fails concurrent writers at once instead of
+        waiting on ``busy_timeout``.
+        """
+        handle, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connection.ensure_connection()
+
+        with sqlite3.connect(path) as copy:
+            connection.connection.backup(copy)
+
+        original = connections.settings[DEFAULT_DB_ALIAS]
+        connections.settings[DEFAULT_DB_ALIAS] = {
+            **original,
+            **settings.DATABASE_PROFILES["production"],
+            "NAME": path,
+        }
+
+        try:
+            yield path
+        finally:
+            connections.settings[DEFAULT_DB_ALIAS] = original
+
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def allocate(self, barrier, year):
+        try:
+            barrier.wait()
+            return [
+                *allocate_protocols(self.per_worker - 5, year),
+                *(allocate_protocol(year) for _ in range(5)),
+            ]
+        finally:
+            connection.close()
+
+    def test_concurrent_allocations_are_unique(self):
+        year = datetime.now().year
+        barrier = threading.Barrier(self.workers)
+
+        with self.file_database() as path:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                batches = list(
+                    executor.map(
+                        lambda _: self.allocate(barrier, year), range(self.workers)
+                    )
+                )
+
+            with sqlite3.connect(path) as database:
+                counter = database.execute(
+                    "SELECT value FROM requisitions_protocolcounter WHERE year = ?",
+                    [year],
+                ).fetchone()[0]
+
+        protocols = [protocol for batch in batches for protocol in batch]
+        total = self.workers * self.per_worker
+
+        self.assertEqual(len(protocols), total)
+        self.assertEqual(len(set(protocols)), total)
+        self.assertEqual(counter, total)
+
+
+class SlugTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        self.profile = Profile.objects.create(user=user, name="Test User")
+
+    def create_project(self, title):
+        return Project.objects.create(
+            title=title,
+            ceua_protocol="CEUA123",
+            author=self.profile,
+            advisor=self.profile,
+        )
+
+    def test_project_slugs_are_sequential(self):
+        slugs = [self.create_project("Test Project").slug for _ in range(3)]
+
+        self.assertEqual(slugs, ["test-project", "test-project-2", "test-project-3"])
+
+    def test_bulk_slugs_use_one_query(self):
+        self.create_project("Test Project")
+        titles = ["Test Project", "Test Project", "Other Project"]
+
+        with self.assertNumQueries(1):
+            slugs = generate_unique_slugs(Project, titles)
+
+        self.assertEqual(slugs, ["test-project-2", "test-project-3", "other-project"])
+
+    def test_bulk_slugs_batch_the_prefix_query(self):
+        titles = [f"Projeto {index}" for index in range(1200)]
+
+        with self.assertNumQueries(3):
+            slugs = generate_unique_slugs(Project, titles)
+
+        self.assertEqual(len(set(slugs)), len(titles))
+
+    def test_tags_sharing_a_truncated_slug_are_created(self):
+        first = Tag.objects.create(name="Camundongos Swiss")
+        second = Tag.objects.create(name="Camundongos Swiss Webster")
+
+        self.assertEqual(first.slug, "camundongos-swis")
+        self.assertEqual(second.slug, "camundongos-sw-2")
+
+
+class ImportTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+        tag_registry.resolve([])
+
+    def upload(self, url, lines, **params):
+        content = "\n".join(lines).encode()
+        upload = SimpleUploadedFile("import.csv", content, content_type="text/csv")
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+
+        return self.client.post(f"{url}?{query}", {"file": upload}, format="multipart")
+
+    def requisition_lines(self, count):
+        return ["project,date,males,females,tags"] + [
+            f"test-project,2023-08-25,10,5,Ratos;Lote {index}" for index in range(count)
+        ]
+
+    def test_project_import_reports_row_errors(self):
+        response = self.upload(
+            "/api/projects/import/",
+            [
+                "title,ceua_protocol,author,advisor",
+                "Test Project,CEUA1,Test User,Test User",
+                "Outro Projeto,CEUA2,Test User,Test User",
+                "Sem Autor,CEUA3,Ninguém,Test User",
+            ],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [result.get("slug") for result in response.data["results"]],
+            ["test-project-2", "outro-projeto", None],
+        )
+        self.assertEqual(response.data["results"][2]["row"], 4)
+        self.assertIn("author", response.data["results"][2]["errors"])
+        self.assertEqual(Project.objects.count(), 3)
+
+    def test_requisition_import_creates_related_rows(self):
+        response = self.upload(
+            "/api/requisitions/import/",
+            self.requisition_lines(3) + ["outro-projeto,2023-08-01,1,1,"],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        protocols = [r["protocol"] for r in response.data["results"][:3]]
+        requisitions = Requisition.objects.filter(protocol__in=protocols)
+
+        self.assertEqual(requisitions.count(), 3)
+        self.assertEqual(
+            Delivery.objects.filter(requisition__in=requisitions).count(), 3
+        )
+        self.assertEqual(
+            set(requisitions.first().tags.values_list("name", flat=True)),
+            {"Recebida", "Ratos", "Lote 0"},
+        )
+        self.assertEqual(
+            set(requisitions.values_list("requisition_status__status", flat=True)),
+            {"RE"},
+        )
+        call_command("rebuild_statistics_rollups", "--check", stdout=StringIO())
+
+    def test_requisition_import_query_count_is_constant(self):
+        self.upload("/api/requisitions/import/", self.requisition_lines(1))
+
+        with CaptureQueriesContext(connection) as small:
+            self.upload("/api/requisitions/import/", self.requisition_lines(2))
+
+        with CaptureQueriesContext(connection) as large:
+            self.upload("/api/requisitions/import/", self.requisition_lines(20))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Requisition.objects.count(), 23)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.upload(
+            "/api/requisitions/import/", self.requisition_lines(2), dry_run="true"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["valid"], 2)
+        self.assertEqual(response.data["created"], 0)
+        self.assertFalse(Requisition.objects.exists())
+
+    def test_full_chunk_spread_over_many_dates(self):
+        lines = ["project,date,males,females,tags"] + [
+            f"test-project,{2000 + index // 300}-{index // 28 % 12 + 1:02}-"
+            f"{index % 28 + 1:02},10,5,Lote {index}"
+            for index in range(IMPORT_CHUNK_SIZE)
+        ]
+
+        # The second import updates the rollup rows the first one created.
+        for _ in range(2):
+            response = self.upload("/api/requisitions/import/", lines)
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data["created"], IMPORT_CHUNK_SIZE)
+
+        call_command("rebuild_statistics_rollups", "--check", stdout=StringIO())
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("\n".join(self.requisition_lines(5)))
+            file.flush()
+            out = StringIO()
+            call_command(
+                "import_data", "requisitions", file.name, chunk_size=2, stdout=out
+            )
+
+        self.assertIn("5 de 5 linhas importadas.", out.getvalue())
+        self.assertEqual(Requisition.objects.count(), 5)
+
+
+class QueryPlanTests(TestCase):
+    def test_check_query_plans_passes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out, stderr=StringIO())
+
+        self.assertIn("Todas as consultas usam índices.", out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+    def test_plan_problems_flags_filtered_full_scans(self):
+        sql = 'SELECT * FROM "t" WHERE "t"."a" = 1 ORDER BY "t"."b" LIMIT 25'
+
+        self.assertEqual(plan_problems(sql, ["SCAN t USING INDEX t_b"]), [])
+        self.assertEqual(
+            plan_problems(sql, ["SCAN t", "USE TEMP B-TREE FOR ORDER BY"]),
+            ["varredura completa de t", "ordenação em memória para paginação"],
+        )
+        self.assertEqual(plan_problems('SELECT * FROM "t"', ["SCAN t"]), [])
+        self.assertEqual(
+            plan_problems(
+                sql, ["SEARCH t USING INDEX t_a (a=?)", "USE TEMP B-TREE FOR ORDER BY"]
+            ),
+            [],
+        )
+
+
+class SearchTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture(
+            profile={"name": "João Nutrição"},
+            project={
+                "title": "Dieta hipercalórica",
+                "description": "Efeitos da suplementação em camundongos",
+            },
+        )
+        self.other = Project.objects.create(
+            title="Camundongos idosos",
+            description="Envelhecimento",
+            ceua_protocol="CEUA456",
+            author=self.profile,
+            advisor=self.profile,
+        )
+        self.requisition = Requisition.objects.create(
+            date="2023-08-25",
+            project=self.project,
+            author=self.profile,
+            author_notes="Entregar na sala de nutrição",
+        )
+
+    def test_search_is_accent_insensitive_and_ranked(self):
+        response = self.client.get("/api/search/", {"q": "camundongo"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(result["type"], result["id"]) for result in response.data["results"]],
+            [("projects", self.other.id), ("projects", self.project.id)],
+        )
+
+        response = self.client.get("/api/search/", {"q": "NUTRICAO"})
+        self.assertEqual(
+            {result["type"] for result in response.data["results"]},
+            {"profiles", "requisitions"},
+        )
+
+    def test_index_follows_writes(self):
+        self.project.title = "Dieta cetogênica"
+        self.project.save()
+        self.profile.is_hidden = True
+        self.profile.save()
+        Delivery.objects.create(
+            date="2023-08-26",
+            requisition=self.requisition,
+            notes="Lote com atraso",
+        )
+
+        project = self.client.get("/api/search/", {"q": "cetogenica"})
+        delivery = self.client.get(
+            "/api/search/", {"q": "atraso", "type": "deliveries"}
+        )
+        profile = self.client.get("/api/search/", {"q": "joao"})
+
+        self.assertEqual(project.data["results"][0]["key"], self.project.slug)
+        self.assertEqual(
+            delivery.data["results"][0]["title"], self.requisition.protocol
+        )
+        self.assertEqual(profile.data["count"], 0)
+
+        Project.objects.filter(pk=self.project.pk).update(slug="dieta-nova")
+        project = self.client.get("/api/search/", {"q": "cetogenica"})
+        self.assertEqual(project.data["results"][0]["key"], "dieta-nova")
+
+        self.project.delete()
+        self.assertEqual(
+            self.client.get("/api/search/", {"q": "cetogenica"}).data["count"], 0
+        )
+
+    def test_viewset_q_filter(self):
+        response = self.client.get("/api/projects/", {"q": "suplementacao"})
+
+        self.assertEqual(
+            [project["id"] for project in response.data["results"]], [self.project.id]
+        )
+
+        response = self.client.get("/api/requisitions/", {"q": "sala"})
+        self.assertEqual(
+            [item["protocol"] for item in response.data["results"]],
+            [self.requisition.protocol],
+        )
+
+    def test_q_filter_is_not_truncated(self):
+        Requisition.objects.bulk_create(
+            [
+                Requisition(
+                    protocol=f"{index}.2020",
+                    date="2020-01-01",
+                    project=self.other,
+                    author_notes=f"Entregar na sala {index}",
+                )
+                for index in range(520)
+            ]
+        )
+
+        response = self.client.get("/api/requisitions/", {"q": "sala", "page": 21})
+        self.assertEqual(response.data["count"], 521)
+        self.assertEqual(len(response.data["results"]), 21)
+
+        response = self.client.get(
+            "/api/requisitions/", {"q": "sala", "project": self.project.slug}
+        )
+        self.assertEqual(
+            [item["protocol"] for item in response.data["results"]],
+            [self.requisition.protocol],
+        )
+
+    def test_invalid_search_type(self):
+        response = self.client.get("/api/search/", {"q": "x", "type": "users"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTests(ProjectFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture(is_staff=True, requisition={"males": 10})
+        self.url = f"/api/requisitions/{self.requisition.protocol}/"
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response["ETag"]
+
+    def test_detail_returns_304_without_serializing(self):
+        etag = self.etag(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_related_writes_change_the_validator(self):
+        etags = [self.etag(self.url)]
+
+        Delivery.objects.create(
+            date="2023-08-26", requisition=self.requisition, males=2
+        )
+        etags.append(self.etag(self.url))
+
+        Event.objects.create(title="Nota", requisition=self.requisition)
+        etags.append(self.etag(self.url))
+
+        self.requisition.tags.add(Tag.objects.create(name="Ratos"))
+        etags.append(self.etag(self.url))
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_nested_writes_change_the_validator(self):
+        institute = Institute.objects.create(name="Centro de Biociencias")
+        self.profile.institute = institute
+        self.profile.save()
+        tag = Tag.objects.create(name="Ratos")
+        self.requisition.tags.add(tag)
+        etags = [self.etag(self.url)]
+
+        self.project.title = "Outro Título"
+        self.project.save()
+        etags.append(self.etag(self.url))
+
+        self.profile.name = "Outro Nome"
+        self.profile.save()
+        etags.append(self.etag(self.url))
+
+        institute.abbreviation = "CB"
+        institute.save()
+        etags.append(self.etag(self.url))
+
+        tag.color = "red"
+        tag.save()
+        etags.append(self.etag(self.url))
+
+        self.user.email = "outro@example.com"
+        self.user.save()
+        etags.append(self.etag(self.url))
+
+        self.assertEqual(len(set(etags)), 6)
+
+    def test_list_validator_follows_new_rows_and_query(self):
+        etag = self.etag("/api/requisitions/")
+
+        response = self.client.get("/api/requisitions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            "/api/requisitions/", {"page": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        cursor_etag = self.etag("/api/requisitions/?cursor=")
+        Requisition.objects.create(date="2023-08-26", project=self.project)
+
+        for url, tag in [
+            ("/api/requisitions/", etag),
+            ("/api/requisitions/?cursor=", cursor_etag),
+        ]:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=tag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncReadPathTests(ProjectFixtureMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_fixture(is_staff=True, requisition={"males": 10})
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {"authorization": f"Token {self.token.key}"}
+        Delivery.objects.create(
+            date="2023-08-26",
+            author=self.profile,
+            requisition=self.requisition,
+            males=4,
+        )
+        self.url = f"/api/async/requisitions/{self.requisition.protocol}/"
+
+    async def test_read_endpoints_match_the_sync_api(self):
+        for path in ["requisitions", "deliveries", "statistics"]:
+            response = await self.async_client.get(
+                f"/api/async/{path}/", headers=self.headers
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK, path)
+
+        response = await self.async_client.get(
+            "/api/async/requisitions/", headers=self.headers
+        )
+        self.assertEqual(
+            response.json()["results"][0]["protocol"], self.requisition.protocol
+        )
+
+        response = await self.async_client.get("/api/async/requisitions/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = await self.async_client.get(
+            "/api/async/deliveries/", headers={"authorization": "Token invalido"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_detail_answers_304_and_404_natively(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["protocol"], self.requisition.protocol)
+
+        response = await self.async_client.get(
+            self.url, headers={**self.headers, "if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = await self.async_client.get(
+            "/api/async/requisitions/1.1900/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_compat_routes_do_not_share_the_native_pool(self):
+        pools = {
+            name: mock.patch.object(executor, "submit", wraps=executor.submit).start()
+            for name, executor in [
+                ("native", async_views._executor),
+                ("compat", async_views._compat_executor),
+            ]
+        }
+        self.addCleanup(mock.patch.stopall)
+
+        response = await self.async_client.get(
+            "/api/async/deliveries/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(pools["compat"].call_count, 1)
+        self.assertEqual(pools["native"].call_count, 0)
+
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(pools["compat"].call_count, 1)
+        self.assertEqual(pools["native"].call_count, 1)
+
+    async def test_verify_token(self):
+        response = await self.async_client.post(
+            "/api/async/verify-token/",
+            {"token": self.token.key},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["is_token_valid"])
+
+        response = await self.async_client.post(
+            "/api/async/verify-token/",
+            {"token": "invalido"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["non_field_errors"], ["Token inválido."])
+
+
+PRAGMA_VALUES = {"NORMAL": 1, "MEMORY": 2}
+
+
+class DatabaseProfileTests(TestCase):
+    def test_connection_applies_the_configured_pragmas(self):
+        options = connection.settings_dict["OPTIONS"]
+
+        with connection.cursor() as cursor:
+            for name, value in options.get("pragmas", {}).items():
+                # In-memory test databases ignore WAL and mmap.
+                if name in ("journal_mode", "mmap_size"):
+                    continue
+
+                cursor.execute(f"PRAGMA {name}")
+                self.assertEqual(
+                    cursor.fetchone()[0], PRAGMA_VALUES.get(value, value), name
+                )
+
+        self.assertEqual(
+            connection.transaction_mode,
+            options.get("transaction_mode", "DEFERRED").upper(),
+        )
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.settings_override = self.settings(METRICS_DIR=self.directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        registry.reset()
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword", is_staff=True
+        )
+        self.profile = Profile.objects.create(user=self.user, name="Test User")
+        self.client.force_authenticate(user=self.user)
+
+    def endpoint(self, data, view, method="GET"):
+        for endpoint in data["endpoints"]:
+            if endpoint["view"] == view and endpoint["method"] == method:
+                return endpoint
+
+        self.fail(f"{method} {view} não encontrado")
+
+    def test_records_requests_queries_and_size_per_view(self):
+        for _ in range(3):
+            self.assertEqual(
+                self.client.get("/api/requisitions/").status_code, status.HTTP_200_OK
+            )
+
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        endpoint = self.endpoint(response.json(), "requisition-list")
+        self.assertEqual(endpoint["requests"], 3)
+        self.assertGreater(endpoint["sql_queries"], 0)
+        self.assertGreater(endpoint["response_bytes"], 0)
+        self.assertEqual(endpoint["latency_seconds"]["buckets"]["+Inf"], 3)
+
+    def test_prometheus_format_and_other_workers(self):
+        self.client.get("/api/requisitions/")
+
+        path = os.path.join(self.directory.name, f"{os.getppid()}.json")
+
+        with open(path, "w") as file:
+            json.dump([["requisition-list", "GET", [2] + [0] * (ROW_SIZE - 1)]], file)
+
+        data = self.client.get("/api/metrics/").json()
+        self.assertEqual(data["workers"], 2)
+        self.assertEqual(self.endpoint(data, "requisition-list")["requests"], 3)
+
+        response = self.client.get("/api/metrics/", {"format": "prometheus"})
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertIn(
+            'api_requests_total{view="requisition-list",method="GET"} 3',
+            response.content.decode(),
+        )
+        self.assertIn(
+            'api_request_duration_seconds_bucket{view="requisition-list",'
+            'method="GET",le="+Inf"}',
+            response.content.decode(),
+        )
+
+    def test_requires_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LoadDataTests(TestCase):
+    def test_generates_consistent_seeded_data(self):
+        counts = generate_load_data(1, seed=7)
+
+        self.assertEqual(counts["requisitions"], SCALE_UNIT["requisitions"])
+        self.assertEqual(Requisition.objects.count(), counts["requisitions"])
+        self.assertEqual(Delivery.objects.count(), counts["deliveries"])
+        self.assertGreater(counts["deliveries"], counts["requisitions"])
+        self.assertFalse(Requisition.objects.filter(tags=None).exists())
+        self.assertGreater(Requisition.objects.dates("timestamp", "year").count(), 1)
+
+        first = list(
+            Requisition.objects.order_by("pk").values_list("males", "females", "date")
+        )
+        generate_load_data(1, seed=7)
+        second = list(
+            Requisition.objects.order_by("pk").values_list("males", "females", "date")
+        )
+        self.assertEqual(first, second[len(first) :])
+
+        call_command("rebuild_statistics_rollups", "--check", stdout=StringIO())
+        call_command("repair_fulfillment", "--check", stdout=StringIO())
+
+    def test_benchmark_session_leaves_no_credentials_behind(self):
+        User.objects.create_user(BENCHMARK_USERNAME, is_staff=True)
+
+        with self.assertRaises(RuntimeError):
+            with benchmark_session() as token:
+                self.assertTrue(Token.objects.filter(key=token.key).exists())
+                raise RuntimeError
+
+        self.assertFalse(User.objects.filter(username=BENCHMARK_USERNAME).exists())
+        self.assertFalse(Token.objects.exists())
+
+    def test_endpoint_suite_and_baseline_comparison(self):
+        generate_load_data(1, seed=7)
+
+        baseline = run_endpoint_suite(router.registry, 1, counts={})
+        results = baseline["endpoints"]
+
+        self.assertIn("requisition: list", results)
+        self.assertIn("requisition: retrieve", results)
+        self.assertTrue(all(result["status"] < 500 for result in results.values()))
+        self.assertGreater(results["requisition: list"]["queries"], 0)
+
+        slower = json.loads(json.dumps(baseline))
+        slower["endpoints"]["requisition: list"]["queries"] += 1
+        regressions = [
+            (label, field)
+            for label, field, _, _, regressed in compare_baselines(
+                baseline, slower, 0.25
+            )
+            if regressed
+        ]
+        self.assertEqual(regressions, [("requisition: list", "queries")])
+
+
+class QueryBudgetTests(TestCase):
+    def test_every_endpoint_stays_within_its_query_budget(self):
+        failures = check_query_budgets(router.registry)
+
+        self.assertFalse(failures, "\n\n" + "\n\n".join(failures))
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import math
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import cycle, islice
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from users.models import Profile
+
+from ..models import Requisition
+from .timeline import has_every_entry_type
+
+
+Endpoint = namedtuple("Endpoint", ["method", "wsgi_path", "asgi_path", "body"])
+
+BENCHMARK_ENDPOINTS = {
+    "requisitions": Endpoint(
+        "GET", "/api/requisitions/", "/api/async/requisitions/", None
+    ),
+    "requisition": Endpoint(
+        "GET",
+        "/api/requisitions/{protocol}/",
+        "/api/async/requisitions/{protocol}/",
+        None,
+    ),
+    "deliveries": Endpoint("GET", "/api/deliveries/", "/api/async/deliveries/", None),
+    "statistics": Endpoint("GET", "/api/statistics/", "/api/async/statistics/", None),
+    "verify-token": Endpoint(
+        "POST", "/verify-token/", "/api/async/verify-token/", {"token": "{token}"}
+    ),
+}
+
+BENCHMARK_SERVERS = ["wsgi", "asgi"]
+
+BENCHMARK_USERNAME = "benchmark-api"
+
+# Detail routes are sampled on a row that reaches every branch of their
+# serializers when one exists, so budgets and baselines see the worst case.
+SAMPLE_PREFERENCES = {Requisition: has_every_entry_type}
+
+
+def auth_headers(token: Token) -> dict:
+    return {"authorization": f"Token {token.key}"}
+
+
+@contextmanager
+def benchmark_session():
+    """
+    Yields the token of a temporary hidden staff user, with the test
+    client's host allowed. The user, and its token with it, is deleted on
+    exit however the block ends, and one left behind by a killed run is
+    deleted before a new one is created.
+    """
+    users = User.objects.filter(username=BENCHMARK_USERNAME)
+    users.delete()
+
+    try:
+        user = User.objects.create_user(BENCHMARK_USERNAME, is_staff=True)
+        Profile.objects.create(user=user, name=BENCHMARK_USERNAME, is_hidden=True)
+        token = Token.objects.create(user=user)
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            yield token
+    finally:
+        users.delete()
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+
+    return ordered[index]
+
+
+def benchmark_requests(endpoints: list, server: str, total: int, **context) -> list:
+    """
+    Expands ``endpoints`` into ``total`` ``(method, path, body)`` tuples,
+    round-robin, with ``{protocol}`` and ``{token}`` filled from ``context``.
+    """
+    requests = []
+
+    for name in endpoints:
+        endpoint = BENCHMARK_ENDPOINTS[name]
+        path = getattr(endpoint, f"{server}_path").format(**context)
+        body = endpoint.body and json.dumps(
+            {key: value.format(**context) for key, value in endpoint.body.items()}
+        )
+        requests.append((endpoint.method, path, body))
+
+    return list(islice(cycle(requests), total))
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def run_wsgi(requests: list, concurrency: int, headers: dict) -> dict:
+    """
+    Replays ``requests`` through the WSGI handler from ``concurrency``
+    threads, the way a threaded WSGI server would.
+    """
+
+    def send(request):
+        method, path, body = request
+        started = time.perf_counter()
+        response = Client().generic(
+            method, path, body or "", "application/json", headers=headers
+        )
+
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, requests))
+
+    elapsed = time.perf_counter() - started
+
+    return summarize(
+        [latency for latency, _ in results],
+        sum(status >= 400 for _, status in results),
+        elapsed,
+    )
+
+
+async def _run_asgi(requests: list, concurrency: int, headers: dict) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(request):
+        method, path, body = request
+
+        async with semaphore:
+            started = time.perf_counter()
+            response = await AsyncClient().generic(
+                method, path, body or "", "application/json", headers=headers
+            )
+
+            return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(send(request) for request in requests))
+
+    return results, time.perf_counter() - started
+
+
+def run_asgi(requests: list, concurrency: int, headers: dict) -> dict:
+    """
+    Replays ``requests`` through the ASGI handler with at most
+    ``concurrency`` requests in flight on one event loop.
+    """
+    results, elapsed = asyncio.run(_run_asgi(requests, concurrency, headers))
+
+    return summarize(
+        [latency for latency, _ in results],
+        sum(status >= 400 for _, status in results),
+        elapsed,
+    )
+
+
+RUNNERS = {"wsgi": run_wsgi, "asgi": run_asgi}
+
+
+def sample_lookup(viewset, user):
+    view = viewset(action="retrieve", format_kwarg=None, kwargs={})
+    view.request = Request(APIRequestFactory().get("/"))
+    view.request.user = user
+
+    queryset = view.get_queryset()
+    ordering = ["pk"]
+    preference = SAMPLE_PREFERENCES.get(queryset.model)
+
+    if preference is not None:
+        ordering.insert(
+            0, ExpressionWrapper(preference(), output_field=BooleanField()).desc()
+        )
+
+    return queryset.order_by(*ordering).values_list(view.lookup_field, flat=True).first()
+
+
+def router_endpoints(registry, user) -> list:
+    """
+    Returns ``(label, path)`` for the list route, every list-level GET action
+    and one detail route (when ``user`` can see any row), with its GET
+    actions, of each registered viewset.
+    """
+    endpoints = []
+
+    for prefix, viewset, basename in registry:
+        endpoints.append((f"{basename}: list", f"/api/{prefix}/"))
+
+        for extra in viewset.get_extra_actions():
+            if not extra.detail and "get" in extra.mapping:
+                endpoints.append(
+                    (
+                        f"{basename}: {extra.url_path}",
+                        f"/api/{prefix}/{extra.url_path}/",
+                    )
+                )
+
+        if not hasattr(viewset, "retrieve"):
+            continue
+
+        lookup = sample_lookup(viewset, user)
+
+        if lookup is None:
+            continue
+
+        endpoints.append((f"{basename}: retrieve", f"/api/{prefix}/{lookup}/"))
+
+        for extra in viewset.get_extra_actions():
+            if extra.detail and "get" in extra.mapping:
+                endpoints.append(
+                    (
+                        f"{basename}: {extra.url_path}",
+                        f"/api/{prefix}/{lookup}/{extra.url_path}/",
+                    )
+                )
+
+    return endpoints
+
+
+def measure_endpoint(path: str, headers: dict, iterations: int) -> dict:
+    """
+    Latency percentiles over ``iterations`` warm requests, plus the query
+    count and peak Python memory of one extra request each, measured apart
+    so their instrumentation does not skew the timings.
+    """
+    client = Client()
+    response = client.get(path, headers=headers)
+    latencies = []
+
+    for _ in range(max(iterations, 1)):
+        started = time.perf_counter()
+        client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+
+    with CaptureQueriesContext(connection) as context:
+        client.get(path, headers=headers)
+
+    # Read now: the next request resets the connection's queries log.
+    queries = len(context.captured_queries)
+
+    tracemalloc.start()
+
+    try:
+        client.get(path, headers=headers)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": path,
+        "status": response.status_code,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "queries": queries,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def run_endpoint_suite(registry, iterations: int, counts: dict) -> dict:
+    with benchmark_session() as token:
+        results = {
+            label: measure_endpoint(path, auth_headers(token), iterations)
+            for label, path in router_endpoints(registry, token.user)
+        }
+
+    return {
+        "created": timezone.now().isoformat(),
+        "iterations": iterations,
+        "counts": counts,
+        "endpoints": results,
+    }
+
+
+# Absolute slack on top of the relative threshold, so sub-millisecond
+# endpoints and small allocations do not flap.
+COMPARED_FIELDS = {"p50_ms": 1, "p90_ms": 1, "queries": 0, "peak_memory_kb": 64}
+
+
+def compare_baselines(previous: dict, current: dict, threshold: float) -> list:
+    """
+    Returns ``(label, field, before, after, regressed)`` for every endpoint
+    present in both runs. Latency and memory regress past ``threshold``
+    (relative) plus their slack; any extra query is a regression. p99 is
+    recorded but too noisy to gate on.
+    """
+    changes = []
+
+    for label, after in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(label)
+
+        if before is None:
+            continue
+
+        for field, slack in COMPARED_FIELDS.items():
+            if field == "queries":
+                regressed = after[field] > before[field]
+            else:
+                regressed = after[field] > before[field] * (1 + threshold) + slack
+
+            changes.append((label, field, before[field], after[field], regressed))
+
+    return changes
@@ -0,0 +1,99 @@
+from contextlib import ExitStack
+
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from ..models import Delivery, Requisition
+from ..serializers import DeliverySerializer
+from .cache import bump_data_version
+from .fulfillment import apply_delivered_delta, delivery_counts
+from .rollups import track_requisition
+
+
+def read_protocol(item: dict):
+    """
+    Returns the ``requisition`` protocol of a bulk item and its field errors,
+    so a list or an object in its place is reported instead of failing the
+    protocol lookup.
+    """
+    field = serializers.CharField(
+        max_length=Requisition._meta.get_field("protocol").max_length
+    )
+
+    try:
+        return field.run_validation(item.get("requisition", empty)), None
+    except serializers.ValidationError as error:
+        return None, error.detail
+
+
+def bulk_create_deliveries(items: list, author) -> list:
+    protocols = [
+        read_protocol(item) if isinstance(item, dict) else (None, None)
+        for item in items
+    ]
+    requisitions = Requisition.objects.in_bulk(
+        {protocol for protocol, _ in protocols if protocol}, field_name="protocol"
+    )
+
+    results = []
+    pending = []
+
+    for index, (item, (protocol, errors)) in enumerate(zip(items, protocols)):
+        if not isinstance(item, dict):
+            results.append({"index": index, "errors": ["Formato de entrega inválido."]})
+            continue
+
+        if errors:
+            results.append({"index": index, "errors": {"requisition": errors}})
+            continue
+
+        requisition = requisitions.get(protocol)
+
+        if requisition is None:
+            results.append(
+                {
+                    "index": index,
+                    "errors": {"requisition": ["Requisição não encontrada."]},
+                }
+            )
+            continue
+
+        serializer = DeliverySerializer(data=item)
+
+        if not serializer.is_valid():
+            results.append({"index": index, "errors": serializer.errors})
+            continue
+
+        delivery = Delivery(
+            **serializer.validated_data, author=author, requisition=requisition
+        )
+        results.append({"index": index, "delivery": delivery})
+        pending.append(delivery)
+
+    if not pending:
+        return results
+
+    affected = {delivery.requisition_id: delivery for delivery in pending}
+
+    with transaction.atomic(), ExitStack() as stack:
+        for delivery in affected.values():
+            stack.enter_context(track_requisition(delivery.requisition))
+
+        Delivery.objects.bulk_create(pending)
+        apply_delivered_delta({}, delivery_counts(pending))
+
+        for delivery in affected.values():
+            delivery.update_tags()
+
+        Requisition.objects.filter(pk__in=affected).touch()
+        bump_data_version()
+
+    for result in results:
+        delivery = result.pop("delivery", None)
+
+        if delivery is not None:
+            result["id"] = delivery.id
+            result["requisition"] = delivery.requisition.protocol
+
+    return results
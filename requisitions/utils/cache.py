@@ -0,0 +1,69 @@
+import hashlib
+import json
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+
+from ..models import DataVersion
+
+
+DATA_VERSION_NAME = "statistics"
+
+_counters = {"hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def get_data_version(name: str = DATA_VERSION_NAME) -> int:
+    version = (
+        DataVersion.objects.filter(name=name).values_list("version", flat=True).first()
+    )
+
+    return version or 0
+
+
+def bump_data_version(name: str = DATA_VERSION_NAME):
+    # Random steps keep versions monotonic while making a value seen inside a
+    # rolled back transaction unlikely to ever be reused.
+    step = random.randint(1, 2**31)
+    updated = DataVersion.objects.filter(name=name).update(version=F("version") + step)
+
+    if not updated:
+        DataVersion.objects.create(name=name, version=step)
+
+
+def _count(counter: str):
+    with _counters_lock:
+        _counters[counter] += 1
+
+
+def build_cache_key(namespace: str, version: int, params: dict) -> str:
+    normalized = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+
+    return f"{namespace}:{version}:{digest}"
+
+
+def get_or_compute(namespace: str, params: dict, compute):
+    cache = caches[settings.STATISTICS_CACHE_ALIAS]
+    key = build_cache_key(namespace, get_data_version(), params)
+    data = cache.get(key)
+
+    if data is not None:
+        _count("hits")
+        return data, True
+
+    _count("misses")
+    data = compute()
+    cache.set(key, data)
+
+    return data, False
+
+
+def cache_info() -> dict:
+    with _counters_lock:
+        counters = dict(_counters)
+
+    return {**counters, "version": get_data_version()}
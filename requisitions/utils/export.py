@@ -0,0 +1,76 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+DELIVERY_EXPORT_FIELDS = [
+    "id",
+    "date",
+    "timestamp",
+    "requisition__protocol",
+    "requisition__project__title",
+    "author__name",
+    "males",
+    "females",
+    "notes",
+]
+
+DELIVERY_EXPORT_HEADER = [
+    "id",
+    "date",
+    "timestamp",
+    "protocol",
+    "project",
+    "author",
+    "males",
+    "females",
+    "notes",
+]
+
+STATISTICS_EXPORT_HEADER = [
+    "dimension",
+    "key",
+    "required_males",
+    "required_females",
+    "delivered_males",
+    "delivered_females",
+]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(header: list, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(header: list, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), default=str, ensure_ascii=False) + "\n"
+
+
+def export_response(header: list, rows, export_type: str, filename: str):
+    stream = stream_ndjson if export_type == "ndjson" else stream_csv
+    extension = "ndjson" if export_type == "ndjson" else "csv"
+
+    response = StreamingHttpResponse(
+        stream(header, rows), content_type=EXPORT_CONTENT_TYPES[extension]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+
+    return response
@@ -0,0 +1,296 @@
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Least
+
+from ..models import Delivery, Requisition, Status
+from .tags import tag_registry
+
+
+RECEIVED = "received"
+PARTIAL = "partial"
+CONCLUDED = "concluded"
+
+STATE_TAGS = {
+    RECEIVED: "Recebida",
+    PARTIAL: "Parcialmente Concluída",
+    CONCLUDED: "Concluída",
+}
+
+STATE_STATUSES = {
+    PARTIAL: ("PA", "Estado alterado para requisição em andamento."),
+    CONCLUDED: ("CO", "Estado alterado para requisição concluída."),
+}
+
+# Denormalized on Requisition; only the helpers below write them.
+FULFILLMENT_FIELDS = [
+    "delivered_males",
+    "delivered_females",
+    "current_status",
+    "fulfillment_ratio",
+]
+
+
+def resolve_state(males, females, delivered_males, delivered_females) -> str:
+    if delivered_males >= males and delivered_females >= females:
+        return CONCLUDED
+
+    if not delivered_males and not delivered_females:
+        return RECEIVED
+
+    return PARTIAL
+
+
+def outstanding(prefix: str = "") -> Q:
+    """
+    Requisitions still owed animals; cancelled ones owe nothing. Matches the
+    condition of ``requisition_outstanding_idx``.
+    """
+    return Q(**{f"{prefix}fulfillment_ratio__lt": 1}) & ~Q(
+        **{f"{prefix}current_status": "CA"}
+    )
+
+
+def fulfillment_ratio(males, females, delivered_males, delivered_females) -> float:
+    """
+    Share of the required animals already delivered, capped per sex, so it
+    reaches 1.0 exactly when ``resolve_state`` says the requisition is
+    concluded.
+    """
+    required = males + females
+
+    if not required:
+        return 1.0
+
+    return (min(delivered_males, males) + min(delivered_females, females)) / required
+
+
+def fulfillment_ratio_expression(delivered_males, delivered_females):
+    """
+    ``fulfillment_ratio`` as SQL, for ``update()`` calls where the delivered
+    counters are themselves expressions.
+    """
+    delivered = Least(delivered_males, F("males")) + Least(
+        delivered_females, F("females")
+    )
+
+    return Case(
+        When(males=0, females=0, then=Value(1.0)),
+        default=Cast(delivered, FloatField())
+        / Cast(F("males") + F("females"), FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def delivery_counts(deliveries) -> dict:
+    """
+    Animals per requisition among the active ``deliveries``.
+    """
+    counts = {}
+
+    for delivery in deliveries:
+        if delivery.is_active:
+            males, females = counts.get(delivery.requisition_id, (0, 0))
+            counts[delivery.requisition_id] = (
+                males + delivery.males,
+                females + delivery.females,
+            )
+
+    return counts
+
+
+def stored_delivery_counts(pk) -> dict:
+    if pk is None:
+        return {}
+
+    return delivery_counts(
+        Delivery.objects.filter(pk=pk).only(
+            "requisition_id", "males", "females", "is_active"
+        )
+    )
+
+
+def apply_delivered_delta(before: dict, after: dict):
+    """
+    Moves the delivered counters of each requisition from ``before`` to
+    ``after`` (both from ``delivery_counts``) with F expressions, so
+    concurrent writers never overwrite each other's totals.
+    """
+    for requisition_id in set(before) | set(after):
+        old = before.get(requisition_id, (0, 0))
+        new = after.get(requisition_id, (0, 0))
+        males, females = new[0] - old[0], new[1] - old[1]
+
+        if not males and not females:
+            continue
+
+        delivered_males = F("delivered_males") + males
+        delivered_females = F("delivered_females") + females
+        Requisition.objects.filter(pk=requisition_id).update(
+            delivered_males=delivered_males,
+            delivered_females=delivered_females,
+            fulfillment_ratio=fulfillment_ratio_expression(
+                delivered_males, delivered_females
+            ),
+        )
+
+
+def refresh_fulfillment_ratio(requisition_id):
+    Requisition.objects.filter(pk=requisition_id).update(
+        fulfillment_ratio=fulfillment_ratio_expression(
+            F("delivered_males"), F("delivered_females")
+        )
+    )
+
+
+def latest_status():
+    return Coalesce(
+        Subquery(
+            Status.objects.filter(requisition_id=OuterRef("pk"))
+            .order_by("-timestamp", "-id")
+            .values("status")[:1]
+        ),
+        Value("RE"),
+    )
+
+
+def refresh_current_status(requisition_id):
+    Requisition.objects.filter(pk=requisition_id).update(current_status=latest_status())
+
+
+def fulfillment_mismatches(queryset=None) -> list:
+    """
+    Recomputes the denormalized fulfillment columns from the deliveries and
+    statuses and returns every requisition whose stored values differ, with
+    the expected values already set on the instance.
+    """
+    active = Q(requisition_delivery__is_active=True)
+    queryset = queryset if queryset is not None else Requisition.objects.all()
+    rows = (
+        queryset.order_by("pk")
+        .only("protocol", "males", "females", *FULFILLMENT_FIELDS)
+        .annotate(
+            expected_males=Sum("requisition_delivery__males", filter=active, default=0),
+            expected_females=Sum(
+                "requisition_delivery__females", filter=active, default=0
+            ),
+            expected_status=latest_status(),
+        )
+    )
+    mismatches = []
+
+    for requisition in rows.iterator(chunk_size=2000):
+        expected = {
+            "delivered_males": requisition.expected_males,
+            "delivered_females": requisition.expected_females,
+            "current_status": requisition.expected_status,
+            "fulfillment_ratio": fulfillment_ratio(
+                requisition.males,
+                requisition.females,
+                requisition.expected_males,
+                requisition.expected_females,
+            ),
+        }
+        stale = {
+            field: (getattr(requisition, field), value)
+            for field, value in expected.items()
+            if getattr(requisition, field) != value
+        }
+
+        if stale:
+            for field, value in expected.items():
+                setattr(requisition, field, value)
+
+            requisition.stale_fields = stale
+            mismatches.append(requisition)
+
+    return mismatches
+
+
+def repair_fulfillment(queryset=None, batch_size: int = 500) -> list:
+    mismatches = fulfillment_mismatches(queryset)
+    Requisition.objects.bulk_update(
+        mismatches, FULFILLMENT_FIELDS, batch_size=batch_size
+    )
+
+    return mismatches
+
+
+def state_tag_ids() -> dict:
+    tags = tag_registry.resolve(STATE_TAGS.values())
+
+    return {state: tags[name] for state, name in STATE_TAGS.items()}
+
+
+def state_flags(tag_names) -> dict:
+    """
+    Which state tags are among ``tag_names``, keyed like ``STATE_TAGS``.
+    """
+    tag_names = set(tag_names)
+
+    return {state: name in tag_names for state, name in STATE_TAGS.items()}
+
+
+def update_requisition_state(requisition_id, row=None) -> str:
+    """
+    Resolves the fulfillment state of a requisition from its delivered
+    counters and syncs its system tags. Raw through-table writes skip m2m
+    signals, so callers run inside ``track_requisition`` to keep the
+    statistics rollups exact. Callers that already read the requisition in
+    this transaction pass its required and delivered counts with its
+    ``state_flags`` as ``row``.
+    """
+    through = Requisition.tags.through
+
+    if row is None:
+        flags = {
+            state: Exists(
+                through.objects.filter(requisition_id=OuterRef("pk"), tag__name=name)
+            )
+            for state, name in STATE_TAGS.items()
+        }
+        row = (
+            Requisition.objects.filter(pk=requisition_id)
+            .annotate(**flags)
+            .values("males", "females", "delivered_males", "delivered_females", *flags)
+            .first()
+        )
+
+    if row is None:
+        return None
+
+    state = resolve_state(
+        row["males"], row["females"], row["delivered_males"], row["delivered_females"]
+    )
+    stale = [current for current in STATE_TAGS if current != state and row[current]]
+
+    if row[state] and not stale:
+        return state
+
+    tag_ids = state_tag_ids()
+
+    if stale:
+        through.objects.filter(
+            requisition_id=requisition_id,
+            tag_id__in=[tag_ids[current] for current in stale],
+        ).delete()
+
+    if not row[state]:
+        through.objects.create(requisition_id=requisition_id, tag_id=tag_ids[state])
+
+        if state in STATE_STATUSES:
+            status, message = STATE_STATUSES[state]
+            Status.objects.create(
+                status=status, message=message, requisition_id=requisition_id
+            )
+
+    return state
@@ -0,0 +1,270 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from users.models import Profile
+
+from ..models import Delivery, Project, Requisition, Status
+from ..serializers import ProjectSerializer, RequisitionSerializer
+from .cache import bump_data_version
+from .fulfillment import STATE_STATUSES, STATE_TAGS, fulfillment_ratio, resolve_state
+from .protocols import allocate_protocols
+from .rollups import (
+    apply_rollup_delta,
+    merge_contributions,
+    requisition_contributions,
+)
+from .tags import tag_registry
+from .utils import generate_unique_slugs
+
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_TYPES = ["csv", "xlsx"]
+TAG_SEPARATOR = ";"
+
+
+def read_csv_rows(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+
+    for line, row in enumerate(reader, start=2):
+        yield line, row
+
+
+def read_xlsx_rows(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError("A importação de planilhas XLSX requer o openpyxl.")
+
+    sheet = load_workbook(file, read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = [str(value or "").strip() for value in next(rows, [])]
+
+    for line, values in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in values):
+            continue
+
+        yield line, {
+            name: "" if value is None else value
+            for name, value in zip(header, values)
+            if name
+        }
+
+
+def read_rows(file, import_type: str):
+    if import_type not in IMPORT_TYPES:
+        raise ValidationError(
+            f"Tipo de importação inválido. Use: {', '.join(IMPORT_TYPES)}."
+        )
+
+    if import_type == "xlsx":
+        return read_xlsx_rows(file)
+
+    return read_csv_rows(file)
+
+
+def import_type_for(filename: str, default: str = "csv") -> str:
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+    return extension if extension in IMPORT_TYPES else default
+
+
+def split_tags(value) -> list:
+    return [
+        name.strip() for name in str(value or "").split(TAG_SEPARATOR) if name.strip()
+    ]
+
+
+def resolve_profiles(names) -> dict:
+    profiles = {}
+
+    for profile in Profile.objects.filter(name__in=set(names)):
+        profiles.setdefault(profile.name, []).append(profile)
+
+    return profiles
+
+
+def profile_error(profiles: dict, name):
+    matches = profiles.get(name, [])
+
+    if not matches:
+        return None, ["Perfil não encontrado."]
+
+    if len(matches) > 1:
+        return None, ["Mais de um perfil com este nome."]
+
+    return matches[0], None
+
+
+def import_projects_chunk(rows: list, dry_run: bool) -> list:
+    profiles = resolve_profiles(
+        row.get(field) for _, row in rows for field in ("author", "advisor")
+    )
+    results = []
+    pending = []
+
+    for line, row in rows:
+        errors = {}
+        people = {}
+
+        for field in ("author", "advisor"):
+            people[field], error = profile_error(profiles, row.get(field))
+
+            if error:
+                errors[field] = error
+
+        serializer = ProjectSerializer(data=row)
+
+        if not serializer.is_valid():
+            errors.update(serializer.errors)
+
+        if errors:
+            results.append({"row": line, "errors": errors})
+            continue
+
+        project = Project(**serializer.validated_data, **people)
+        results.append({"row": line, "project": project})
+        pending.append(project)
+
+    if not pending:
+        return results
+
+    with transaction.atomic():
+        slugs = generate_unique_slugs(Project, [project.title for project in pending])
+
+        for project, slug in zip(pending, slugs):
+            project.slug = slug
+
+        if not dry_run:
+            Project.objects.bulk_create(pending)
+            bump_data_version()
+
+    for result in results:
+        project = result.pop("project", None)
+
+        if project is not None:
+            result["slug"] = project.slug
+
+    return results
+
+
+def import_requisitions_chunk(rows: list, dry_run: bool) -> list:
+    projects = Project.objects.in_bulk(
+        {row.get("project") for _, row in rows if row.get("project")},
+        field_name="slug",
+    )
+    results = []
+    pending = []
+
+    for line, row in rows:
+        project = projects.get(row.get("project"))
+        serializer = RequisitionSerializer(data=row)
+        errors = {} if serializer.is_valid() else dict(serializer.errors)
+
+        if project is None:
+            errors["project"] = ["Projeto não encontrado."]
+
+        if errors:
+            results.append({"row": line, "errors": errors})
+            continue
+
+        requisition = Requisition(
+            **serializer.validated_data, project=project, author_id=project.author_id
+        )
+        results.append({"row": line, "requisition": requisition})
+        pending.append((requisition, split_tags(row.get("tags"))))
+
+    if not pending or dry_run:
+        for result in results:
+            result.pop("requisition", None)
+
+        return results
+
+    with transaction.atomic():
+        protocols = allocate_protocols(len(pending))
+        tags = tag_registry.resolve(
+            [*STATE_TAGS.values(), *(name for _, names in pending for name in names)]
+        )
+
+        for (requisition, _), protocol in zip(pending, protocols):
+            state = resolve_state(requisition.males, requisition.females, 0, 0)
+            requisition.protocol = protocol
+            requisition.current_status = STATE_STATUSES.get(state, ("RE",))[0]
+            requisition.fulfillment_ratio = fulfillment_ratio(
+                requisition.males, requisition.females, 0, 0
+            )
+
+        Requisition.objects.bulk_create([requisition for requisition, _ in pending])
+
+        deliveries = []
+        statuses = []
+        links = []
+
+        for requisition, names in pending:
+            state = resolve_state(requisition.males, requisition.females, 0, 0)
+            status, message = STATE_STATUSES.get(state, ("RE", "Requisição recebida."))
+            deliveries.append(
+                Delivery(
+                    requisition=requisition,
+                    is_active=False,
+                    date=datetime.now(),
+                    notes="Inicialização de entrega.",
+                )
+            )
+            statuses.append(
+                Status(status=status, message=message, requisition=requisition)
+            )
+            links.extend(
+                Requisition.tags.through(requisition_id=requisition.id, tag_id=tag_id)
+                for tag_id in {tags[name] for name in [STATE_TAGS[state], *names]}
+            )
+
+        Delivery.objects.bulk_create(deliveries)
+        Status.objects.bulk_create(statuses)
+        Requisition.tags.through.objects.bulk_create(links)
+
+        contributions = requisition_contributions(
+            [requisition.id for requisition, _ in pending]
+        )
+        apply_rollup_delta({}, merge_contributions(contributions.values()))
+        bump_data_version()
+
+    for result in results:
+        requisition = result.pop("requisition", None)
+
+        if requisition is not None:
+            result["protocol"] = requisition.protocol
+
+    return results
+
+
+IMPORTERS = {
+    "projects": import_projects_chunk,
+    "requisitions": import_requisitions_chunk,
+}
+
+
+def run_import(
+    kind: str, rows, dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict:
+    importer = IMPORTERS[kind]
+    rows = iter(rows)
+    results = []
+
+    while chunk := list(islice(rows, chunk_size)):
+        results.extend(importer(chunk, dry_run))
+
+    valid = sum(1 for result in results if "errors" not in result)
+
+    return {
+        "dry_run": dry_run,
+        "total": len(results),
+        "created": 0 if dry_run else valid,
+        "valid": valid,
+        "results": results,
+    }
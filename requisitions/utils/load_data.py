@@ -0,0 +1,377 @@
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import Department, Institute, Profile
+from ..models import Delivery, Event, Project, Requisition, Status
+from .cache import bump_data_version
+from .fulfillment import (
+    FULFILLMENT_FIELDS,
+    STATE_STATUSES,
+    STATE_TAGS,
+    fulfillment_ratio,
+    resolve_state,
+)
+from .protocols import allocate_protocols
+from .rollups import rebuild_rollups
+from .tags import tag_registry
+from .utils import generate_unique_slugs
+
+
+# Rows per unit of ``--scale``; deliveries, statuses and events follow from
+# the requisitions.
+SCALE_UNIT = {
+    "institutes": 2,
+    "departments": 8,
+    "profiles": 60,
+    "projects": 150,
+    "requisitions": 1000,
+}
+
+LOAD_DATA_DAYS = 3 * 365
+
+FIRST_NAMES = (
+    "Ana Bruno Camila Daniel Eduarda Felipe Gabriela Henrique Isabela João "
+    "Larissa Lucas Mariana Pedro Rafaela Thiago Vanessa Vinícius"
+).split()
+
+LAST_NAMES = (
+    "Almeida Barbosa Cavalcanti Costa Ferreira Lima Melo Oliveira Pereira "
+    "Ribeiro Santos Silva Souza"
+).split()
+
+PROJECT_TOPICS = [
+    "Efeito da dieta hiperlipídica",
+    "Exercício físico e metabolismo",
+    "Estresse oxidativo",
+    "Desnutrição perinatal",
+    "Modelo de obesidade",
+    "Resposta inflamatória",
+    "Comportamento alimentar",
+    "Microbiota intestinal",
+]
+
+TOPIC_TAGS = ["Wistar", "Swiss", "Urgente", "Gestantes", "Filhotes", "Idosos"]
+
+EVENT_TITLES = [
+    "Requisição revisada",
+    "Contato com o pesquisador",
+    "Ajuste de quantidade",
+    "Entrega agendada",
+]
+
+ANIMAL_AMOUNTS = [2, 4, 5, 6, 8, 10, 12, 15, 20, 24, 30, 40, 60]
+
+
+def scaled(name: str, scale: float) -> int:
+    return max(1, round(SCALE_UNIT[name] * scale))
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> list:
+    """
+    Cumulative weights for ``random.choices``: a few items get most picks,
+    like the handful of labs that file most requisitions.
+    """
+    return list(accumulate(1 / (rank**exponent) for rank in range(1, count + 1)))
+
+
+def aware(day: date, rng: random.Random) -> datetime:
+    moment = datetime.combine(day, time(rng.randint(7, 18), rng.randint(0, 59)))
+
+    return timezone.make_aware(moment)
+
+
+def recent_day(rng: random.Random, today: date) -> date:
+    # Triangular towards today: the backlog grows, so recent years are busier.
+    return today - timedelta(days=int(rng.triangular(0, LOAD_DATA_DAYS, 0)))
+
+
+def next_offset(model) -> int:
+    return (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+
+
+def generate_people(rng: random.Random, scale: float, batch_size: int) -> dict:
+    offset = next_offset(Institute)
+    institutes = Institute.objects.bulk_create(
+        [
+            Institute(
+                name=f"Instituto Sintético {offset + index}",
+                abbreviation=f"IS{offset + index}",
+            )
+            for index in range(scaled("institutes", scale))
+        ]
+    )
+
+    offset = next_offset(Department)
+    departments = Department.objects.bulk_create(
+        [
+            Department(
+                name=f"Departamento Sintético {offset + index}",
+                institute=rng.choice(institutes),
+            )
+            for index in range(scaled("departments", scale))
+        ]
+    )
+
+    offset = next_offset(User)
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        [
+            User(username=f"load-{offset + index}", password=password)
+            for index in range(scaled("profiles", scale))
+        ],
+        batch_size=batch_size,
+    )
+    department_weights = zipf_weights(len(departments))
+    profiles = []
+
+    for user in users:
+        department = rng.choices(departments, cum_weights=department_weights)[0]
+        profiles.append(
+            Profile(
+                user=user,
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                is_advisor=rng.random() < 0.2,
+                institute_id=department.institute_id,
+                department=department,
+                phone=f"81 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            )
+        )
+
+    profiles = Profile.objects.bulk_create(profiles, batch_size=batch_size)
+
+    return {
+        "institutes": institutes,
+        "departments": departments,
+        "profiles": profiles,
+    }
+
+
+def generate_projects(rng, scale: float, profiles: list, batch_size: int) -> list:
+    advisors = [profile for profile in profiles if profile.is_advisor] or profiles
+    students = [profile for profile in profiles if not profile.is_advisor] or profiles
+    author_weights = zipf_weights(len(students))
+    titles = [
+        f"{rng.choice(PROJECT_TOPICS)} {index + 1}"
+        for index in range(scaled("projects", scale))
+    ]
+    projects = [
+        Project(
+            title=title,
+            slug=slug,
+            description=f"Projeto sintético sobre {title.lower()}.",
+            ceua_protocol=f"{rng.randint(1, 999):03d}/{rng.randint(2015, 2024)}",
+            author=rng.choices(students, cum_weights=author_weights)[0],
+            advisor=rng.choice(advisors),
+        )
+        for title, slug in zip(titles, generate_unique_slugs(Project, titles))
+    ]
+
+    return Project.objects.bulk_create(projects, batch_size=batch_size)
+
+
+def delivery_plan(rng, males: int, females: int) -> list:
+    """
+    Splits a requisition into zero or more deliveries. Most are delivered in
+    one or two batches, some stay partial and a few are never delivered.
+    """
+    outcome = rng.random()
+
+    if outcome < 0.15:
+        return []
+
+    batches = rng.choices([1, 2, 3, 4], weights=[50, 30, 15, 5])[0]
+    share = 1.0 if outcome > 0.35 else rng.uniform(0.2, 0.8)
+    plan = []
+
+    for index in range(batches):
+        remaining = batches - index
+        plan.append(
+            (round(males * share / remaining), round(females * share / remaining))
+        )
+        males -= plan[-1][0]
+        females -= plan[-1][1]
+
+    return plan
+
+
+def generate_requisitions(rng, scale: float, people: dict, projects: list, batch_size):
+    now = timezone.now()
+    today = timezone.localdate(now)
+    profiles = people["profiles"]
+    project_weights = zipf_weights(len(projects), exponent=0.9)
+    tag_weights = zipf_weights(len(TOPIC_TAGS))
+    tags = tag_registry.resolve([*STATE_TAGS.values(), *TOPIC_TAGS])
+    requisitions = []
+
+    for _ in range(scaled("requisitions", scale)):
+        project = rng.choices(projects, cum_weights=project_weights)[0]
+        males, females = rng.choice(
+            [
+                (rng.choice(ANIMAL_AMOUNTS), 0),
+                (0, rng.choice(ANIMAL_AMOUNTS)),
+                (rng.choice(ANIMAL_AMOUNTS), rng.choice(ANIMAL_AMOUNTS)),
+            ]
+        )
+        requisitions.append(
+            Requisition(
+                date=recent_day(rng, today),
+                males=males,
+                females=females,
+                project=project,
+                author_id=project.author_id,
+            )
+        )
+
+    for year in {requisition.date.year for requisition in requisitions}:
+        batch = [
+            requisition for requisition in requisitions if requisition.date.year == year
+        ]
+
+        for requisition, protocol in zip(batch, allocate_protocols(len(batch), year)):
+            requisition.protocol = protocol
+
+    Requisition.objects.bulk_create(requisitions, batch_size=batch_size)
+
+    deliveries, statuses, events, links = [], [], [], []
+
+    for requisition in requisitions:
+        created = aware(requisition.date, rng)
+        requisition.timestamp = created
+        delivered = [0, 0]
+
+        deliveries.append(
+            Delivery(
+                requisition=requisition,
+                date=requisition.date,
+                timestamp=created,
+                is_active=False,
+                notes="Inicialização de entrega.",
+            )
+        )
+        statuses.append(
+            Status(
+                requisition=requisition,
+                status="RE",
+                message="Requisição recebida.",
+                timestamp=created,
+            )
+        )
+
+        moment = created
+
+        for males, females in delivery_plan(
+            rng, requisition.males, requisition.females
+        ):
+            moment = min(
+                moment + timedelta(days=rng.randint(1, 30), hours=rng.randint(0, 8)),
+                now,
+            )
+            delivered[0] += males
+            delivered[1] += females
+            deliveries.append(
+                Delivery(
+                    requisition=requisition,
+                    date=moment.date(),
+                    timestamp=moment,
+                    males=males,
+                    females=females,
+                    author=rng.choice(profiles),
+                )
+            )
+
+        state = resolve_state(requisition.males, requisition.females, *delivered)
+        requisition.delivered_males, requisition.delivered_females = delivered
+        requisition.fulfillment_ratio = fulfillment_ratio(
+            requisition.males, requisition.females, *delivered
+        )
+
+        if state in STATE_STATUSES:
+            status, message = STATE_STATUSES[state]
+            statuses.append(
+                Status(
+                    requisition=requisition,
+                    status=status,
+                    message=message,
+                    timestamp=moment,
+                )
+            )
+        elif rng.random() < 0.1:
+            statuses.append(
+                Status(
+                    requisition=requisition,
+                    status=rng.choice(["SU", "CA"]),
+                    timestamp=min(moment + timedelta(days=rng.randint(1, 60)), now),
+                )
+            )
+
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[55, 25, 15, 5])[0]):
+            events.append(
+                Event(
+                    requisition=requisition,
+                    title=rng.choice(EVENT_TITLES),
+                    author=rng.choice(profiles),
+                    timestamp=min(created + timedelta(days=rng.randint(0, 45)), now),
+                )
+            )
+
+        requisition.current_status = statuses[-1].status
+        names = [STATE_TAGS[state]]
+
+        if rng.random() < 0.4:
+            names.append(rng.choices(TOPIC_TAGS, cum_weights=tag_weights)[0])
+
+        requisition.last_updated = moment
+        links.extend(
+            Requisition.tags.through(requisition_id=requisition.id, tag_id=tags[name])
+            for name in names
+        )
+
+    for model, rows in [(Delivery, deliveries), (Status, statuses), (Event, events)]:
+        model.objects.bulk_create(rows, batch_size=batch_size)
+        # auto_now_add overrides the spread timestamps on insert;
+        # bulk_update writes them back without calling pre_save.
+        model.objects.bulk_update(rows, ["timestamp"], batch_size=batch_size)
+
+    Requisition.objects.bulk_update(
+        requisitions,
+        ["timestamp", "last_updated", *FULFILLMENT_FIELDS],
+        batch_size=batch_size,
+    )
+    Requisition.tags.through.objects.bulk_create(links, batch_size=batch_size)
+
+    return {
+        "requisitions": len(requisitions),
+        "deliveries": len(deliveries),
+        "statuses": len(statuses),
+        "events": len(events),
+        "tags": len(links),
+    }
+
+
+def generate_load_data(scale: float, seed: int = 0, batch_size: int = 500) -> dict:
+    """
+    Bulk-inserts a seeded, skewed data set proportional to ``scale`` and
+    rebuilds the statistics rollups, which bulk inserts bypass.
+    """
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        people = generate_people(rng, scale, batch_size)
+        projects = generate_projects(rng, scale, people["profiles"], batch_size)
+        counts = generate_requisitions(rng, scale, people, projects, batch_size)
+        rebuild_rollups()
+
+    bump_data_version()
+
+    return {
+        **{name: len(rows) for name, rows in people.items()},
+        "projects": len(projects),
+        **counts,
+    }
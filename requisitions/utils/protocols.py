@@ -0,0 +1,95 @@
+import hashlib
+import hmac
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+
+from ..models import ProtocolCounter, Requisition
+
+
+PROTOCOL_DIGITS = 5
+PROTOCOL_SPACE = 10**PROTOCOL_DIGITS
+FEISTEL_HALF_BITS = 9
+FEISTEL_ROUNDS = 4
+
+
+def permute_sequence(value: int, key: bytes) -> int:
+    """
+    Keyed Feistel permutation over ``[0, PROTOCOL_SPACE)``. Outputs outside
+    the domain are re-encrypted (cycle walking), so the mapping stays a
+    bijection and distinct sequence numbers never collide.
+    """
+    mask = (1 << FEISTEL_HALF_BITS) - 1
+
+    while True:
+        left, right = value >> FEISTEL_HALF_BITS, value & mask
+
+        for round_number in range(FEISTEL_ROUNDS):
+            digest = hmac.new(
+                key, f"{round_number}:{right}".encode(), hashlib.sha256
+            ).digest()
+            left, right = right, left ^ (int.from_bytes(digest[:4], "big") & mask)
+
+        value = (left << FEISTEL_HALF_BITS) | right
+
+        if value < PROTOCOL_SPACE:
+            return value
+
+
+def format_protocol(sequence: int, year: int) -> str:
+    if settings.PROTOCOL_PERMUTATION:
+        key = settings.PROTOCOL_PERMUTATION_KEY.encode()
+        sequence = permute_sequence(sequence, key)
+
+    return f"{sequence:0{PROTOCOL_DIGITS}d}.{year}"
+
+
+def next_sequences(year: int, count: int = 1) -> range:
+    with transaction.atomic():
+        updated = ProtocolCounter.objects.filter(year=year).update(
+            value=F("value") + count
+        )
+
+        if not updated:
+            try:
+                with transaction.atomic():
+                    ProtocolCounter.objects.create(year=year, value=count)
+            except IntegrityError:
+                ProtocolCounter.objects.filter(year=year).update(
+                    value=F("value") + count
+                )
+
+        value = ProtocolCounter.objects.values_list("value", flat=True).get(year=year)
+
+    if value > PROTOCOL_SPACE:
+        raise ValidationError(f"Não há protocolos disponíveis para o ano de {year}.")
+
+    return range(value - count, value)
+
+
+def allocate_protocol(year: int = None) -> str:
+    year = year or datetime.now().year
+
+    return format_protocol(next_sequences(year)[0], year)
+
+
+def allocate_protocols(count: int, year: int = None) -> list:
+    year = year or datetime.now().year
+    protocols = []
+
+    while len(protocols) < count:
+        candidates = [
+            format_protocol(sequence, year)
+            for sequence in next_sequences(year, count - len(protocols))
+        ]
+        taken = set(
+            Requisition.objects.filter(protocol__in=candidates).values_list(
+                "protocol", flat=True
+            )
+        )
+        protocols.extend(protocol for protocol in candidates if protocol not in taken)
+
+    return protocols
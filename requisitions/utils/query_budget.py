@@ -0,0 +1,187 @@
+import os
+import traceback
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+
+from .benchmark import auth_headers, benchmark_session, router_endpoints
+from .load_data import generate_load_data
+
+
+# Maximum queries per endpoint, keyed like ``router_endpoints`` labels. The
+# budget must hold at any data volume: a count that grows with the rows is
+# an N+1 even while it is still under budget.
+QUERY_BUDGETS = {
+    "requisition: list": 8,
+    "requisition: retrieve": 8,
+    "requisition: timeline": 6,
+    "events: list": 3,
+    "events: retrieve": 2,
+    "status: list": 3,
+    "status: retrieve": 2,
+    "tags: list": 2,
+    "tags: retrieve": 2,
+    "profiles: list": 3,
+    "profiles: retrieve": 2,
+    "projects: list": 3,
+    "projects: retrieve": 2,
+    "deliveries: list": 4,
+    "deliveries: export": 4,
+    "deliveries: retrieve": 3,
+    "departments: list": 2,
+    "departments: retrieve": 2,
+    "institutes: list": 2,
+    "institutes: retrieve": 2,
+    "statistics: list": 7,
+    "statistics: cache": 2,
+    "statistics: export": 3,
+    "statistics: retrieve": 8,
+}
+
+# Two volumes whose first page differs in size (10 vs. 25+ requisitions),
+# so per-row queries show up as growth.
+BUDGET_SCALES = (0.01, 0.05)
+
+LIBRARY_MARKER = f"site-packages{os.sep}"
+
+# Frames that never explain a query: the ORM itself and this harness.
+SKIPPED_FRAMES = (
+    os.path.join(LIBRARY_MARKER, "django", "db", ""),
+    os.path.join(LIBRARY_MARKER, "django", "test", ""),
+    __file__,
+)
+
+
+def frame_label(frame, root: str) -> str:
+    return f"{os.path.relpath(frame.filename, root)}:{frame.lineno} em {frame.name}"
+
+
+def call_site(stack) -> str:
+    """
+    Innermost frame of the project's own code that issued the query and,
+    when the query really comes from a library (a DRF field resolving a
+    relation, say), the innermost library frame as well.
+    """
+    base = str(settings.BASE_DIR)
+    library = None
+
+    for frame in reversed(stack):
+        if any(part in frame.filename for part in SKIPPED_FRAMES):
+            continue
+
+        if LIBRARY_MARKER in frame.filename:
+            if library is None:
+                root = frame.filename.split(LIBRARY_MARKER)[0] + LIBRARY_MARKER
+                library = frame_label(frame, root)
+
+            continue
+
+        if frame.filename.startswith(base):
+            site = frame_label(frame, base)
+
+            return f"{site} via {library}" if library else site
+
+    return library or "<desconhecido>"
+
+
+def capture_queries(client: Client, path: str, headers: dict) -> list:
+    """
+    Returns ``(call_site, sql)`` for every query ``GET path`` runs.
+    """
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append((call_site(traceback.extract_stack()[:-1]), sql))
+
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        client.get(path, headers=headers)
+
+    return queries
+
+
+def format_queries(queries: list, baseline: list = ()) -> list:
+    """
+    Groups ``queries`` by call site, most frequent first, marking how many
+    more each site ran than in ``baseline``.
+    """
+    counts = Counter(site for site, _ in queries)
+    before = Counter(site for site, _ in baseline)
+    samples = defaultdict(str)
+
+    for site, sql in queries:
+        samples[site] = samples[site] or sql
+
+    lines = []
+
+    for site, count in counts.most_common():
+        growth = (
+            f" (+{count - before[site]})" if count > before[site] and baseline else ""
+        )
+        lines.append(f"  {count}x {site}{growth}")
+        lines.append(f"      {samples[site][:200]}")
+
+    return lines
+
+
+def check_query_budgets(registry, scales=BUDGET_SCALES, seed: int = 0) -> list:
+    """
+    Measures every router endpoint after loading ``scales[0]`` and then
+    ``scales[1]`` worth of data, and returns one failure message (with the
+    offending SQL grouped by call site) per endpoint that has no budget,
+    exceeds it, or runs more queries at the larger volume.
+    """
+    small = scales[0]
+    client = Client()
+    runs = []
+
+    with benchmark_session() as token:
+        headers = auth_headers(token)
+        generate_load_data(small, seed=seed)
+        endpoints = router_endpoints(registry, token.user)
+
+        for index, scale in enumerate(scales):
+            if index:
+                generate_load_data(scale - small, seed=seed + index)
+
+            runs.append(
+                {
+                    label: capture_queries(client, path, headers)
+                    for label, path in endpoints
+                }
+            )
+
+    failures = []
+
+    for label, _ in endpoints:
+        before, after = runs[0][label], runs[1][label]
+        budget = QUERY_BUDGETS.get(label)
+
+        if budget is None:
+            failures.append(
+                f"{label}: sem orçamento de consultas ({len(after)} consultas)"
+            )
+        elif len(after) > budget:
+            failures.append(
+                "\n".join(
+                    [
+                        f"{label}: {len(after)} consultas, orçamento de {budget}",
+                        *format_queries(after),
+                    ]
+                )
+            )
+        elif len(after) > len(before):
+            failures.append(
+                "\n".join(
+                    [
+                        f"{label}: consultas crescem com os dados "
+                        f"({len(before)} -> {len(after)})",
+                        *format_queries(after, before),
+                    ]
+                )
+            )
+
+    return failures
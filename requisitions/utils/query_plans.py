@@ -0,0 +1,177 @@
+import re
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from django_filters import rest_framework as django_filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import Profile
+
+from ..models import Delivery, Requisition, Status
+from .rollups import rollup_rows
+from .timeline import timeline_queryset
+
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+HOT_QUERIES = {
+    "active deliveries of a requisition": lambda: Delivery.objects.filter(
+        requisition_id=0, is_active=True
+    ),
+    "deliveries by date": lambda: Delivery.objects.filter(
+        date__gte=date.today(), date__lte=date.today()
+    ),
+    "requisitions by date": lambda: Requisition.objects.filter(
+        date__range=(date.today(), date.today())
+    ),
+    "status of a requisition": lambda: Status.objects.filter(
+        requisition_id=0, status="CO"
+    ),
+    "profile by name": lambda: Profile.objects.filter(name=""),
+    "profile by user": lambda: Profile.objects.filter(user_id=0),
+    "statistics rollups by date": lambda: rollup_rows(date.today(), date.today()),
+    "timeline of a requisition": lambda: timeline_queryset(
+        0, (timezone.now(), "event", 0), timezone.now()
+    )[:25],
+}
+
+
+def sample_filter_value(name: str, filter) -> str:
+    """
+    A well-formed value for ``filter``, so its query reaches the database.
+    """
+    if isinstance(filter, django_filters.ChoiceFilter):
+        return filter.extra["choices"][0][0]
+
+    if isinstance(filter, django_filters.BooleanFilter):
+        return "true"
+
+    if isinstance(filter, django_filters.IsoDateTimeFilter):
+        return timezone.now().isoformat()
+
+    if isinstance(filter, django_filters.DateFilter):
+        return date.today().isoformat()
+
+    if isinstance(filter, django_filters.NumberFilter):
+        return "0"
+
+    if isinstance(filter, django_filters.BaseInFilter):
+        return f"{name}-a,{name}-b"
+
+    return name
+
+
+def filter_params(viewset) -> dict:
+    filterset_class = getattr(viewset, "filterset_class", None)
+
+    if filterset_class is None:
+        return {}
+
+    return {
+        name: sample_filter_value(name, filter)
+        for name, filter in filterset_class.base_filters.items()
+    }
+
+
+def explain(sql: str, params=()) -> list:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(sql: str, plan: list) -> list:
+    """
+    A plain ``SCAN`` is only a problem when the query filters rows; reading a
+    whole reference table (or one page of an index-ordered scan) is intended.
+    An in-memory sort for a page is only a problem when it orders a scan:
+    after index searches it keeps the top rows of the matches alone.
+    """
+    problems = []
+    upper_sql = sql.upper()
+    scans = any(detail.startswith("SCAN ") for detail in plan)
+
+    for detail in plan:
+        match = FULL_SCAN.match(detail)
+
+        if match and " WHERE " in upper_sql:
+            problems.append(f"varredura completa de {match.group(1)}")
+
+        if detail == TEMP_SORT and " LIMIT " in upper_sql and scans:
+            problems.append("ordenação em memória para paginação")
+
+    return problems
+
+
+def viewset_queries(registry) -> list:
+    """
+    Runs the list endpoint of every registered viewset, once plain and once
+    per declared filter, and builds its detail lookup inside a rolled back
+    transaction, returning ``(label, sql, params)`` for every SELECT they
+    issue.
+    """
+    factory = APIRequestFactory()
+    queries = []
+    # Pagination links resolve the request host, which is "testserver".
+    hosts = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+
+    with hosts, transaction.atomic():
+        user = User.objects.create_user(
+            username="query-plan-check", is_staff=True, is_superuser=True
+        )
+
+        for prefix, viewset, basename in registry:
+            list_view = viewset.as_view({"get": "list"})
+            variants = [("listagem", {})] + [
+                (f"filtro {name}", {name: value})
+                for name, value in filter_params(viewset).items()
+            ]
+
+            for label, params in variants:
+                request = factory.get(f"/api/{prefix}/", params)
+                force_authenticate(request, user=user)
+
+                with CaptureQueriesContext(connection) as context:
+                    list_view(request)
+
+                queries.extend(
+                    (f"{basename}: {label}", query["sql"], ())
+                    for query in context.captured_queries
+                    if query["sql"].upper().startswith("SELECT")
+                )
+
+                # An empty result skips the page query, so build it as well.
+                view = viewset(action="list", format_kwarg=None, kwargs={})
+                view.request = Request(request)
+                view.request.user = user
+                queryset = view.filter_queryset(view.get_queryset())
+                page_size = getattr(view.paginator, "page_size", None)
+
+                if page_size:
+                    page = queryset[:page_size].query.sql_with_params()
+                    queries.append((f"{basename}: página ({label})", *page))
+
+            view.action = "retrieve"
+            lookup = view.lookup_field
+            sql, params = (
+                view.get_queryset()
+                .filter(**{lookup: 0 if lookup == "pk" else ""})
+                .query.sql_with_params()
+            )
+            queries.append((f"{basename}: detalhe", sql, params))
+
+        transaction.set_rollback(True)
+
+    return queries
+
+
+def hot_queries() -> list:
+    return [
+        (label, *build().query.sql_with_params())
+        for label, build in HOT_QUERIES.items()
+    ]
@@ -0,0 +1,694 @@
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from users.models import Department, Institute, Profile
+
+from ..models import Delivery, Project, Requisition, StatisticsRollup, Tag
+from .fulfillment import (
+    STATE_TAGS,
+    apply_delivered_delta,
+    delivery_counts,
+    state_flags,
+    update_requisition_state,
+)
+from .statistics import STATISTICS_DIMENSIONS, empty_bucket, format_dimension_key
+
+
+ROLLUP_COUNTERS = [
+    "requisitions",
+    "required_males",
+    "required_females",
+    "delivered_males",
+    "delivered_females",
+]
+
+ROLLUP_BATCH = 250
+
+# Rollups are keyed by ids, so renames never strand a bucket; the labels
+# STATISTICS_DIMENSIONS groups by are resolved when the rollups are read.
+# The protocol of a requisition never changes and is its own label.
+ROLLUP_DIMENSIONS = [
+    ("by_protocol", ("protocol",)),
+    ("by_institute", ("project__advisor__institute",)),
+    (
+        "by_department",
+        ("project__advisor__department", "project__advisor__institute"),
+    ),
+    ("by_advisor", ("project__advisor",)),
+    ("by_author", ("project__author",)),
+    ("by_project", ("project",)),
+    ("by_tags", ("tags",)),
+]
+
+KEY_DIMENSIONS = [
+    (dimension, fields)
+    for dimension, fields in ROLLUP_DIMENSIONS
+    if dimension != "by_tags"
+]
+
+LABEL_SOURCES = {
+    "project__advisor__institute": (Institute, "abbreviation"),
+    "project__advisor__department": (Department, "name"),
+    "project__advisor": (Profile, "name"),
+    "project__author": (Profile, "name"),
+    "project": (Project, "title"),
+    "tags": (Tag, "name"),
+}
+
+KEY_SEPARATOR = ":"
+
+_state = threading.local()
+
+
+def _tracked_requisitions() -> list:
+    if not hasattr(_state, "tracked"):
+        _state.tracked = []
+
+    return _state.tracked
+
+
+def _untrack(*requisitions):
+    untracked = {id(requisition) for requisition in requisitions}
+    tracked = _tracked_requisitions()
+    tracked[:] = [item for item in tracked if id(item) not in untracked]
+
+
+def _is_tracked(requisition) -> bool:
+    return any(
+        tracked is requisition
+        or (requisition.pk is not None and tracked.pk == requisition.pk)
+        for tracked in _tracked_requisitions()
+    )
+
+
+def rollup_key(values):
+    return KEY_SEPARATOR.join("" if value is None else str(value) for value in values)
+
+
+def parse_rollup_key(dimension: str, key: str) -> tuple:
+    fields = dict(ROLLUP_DIMENSIONS)[dimension]
+
+    if key is None:
+        return (None,) * len(fields)
+
+    return tuple(
+        part if field not in LABEL_SOURCES else int(part) if part else None
+        for field, part in zip(fields, key.split(KEY_SEPARATOR))
+    )
+
+
+def requisition_snapshots(requisition_ids) -> dict:
+    """
+    What the rollups read of each requisition with deliveries: its row (key
+    fields and fulfillment counters), the totals and number of its
+    deliveries, and its tags by id.
+    """
+    requisition_ids = [pk for pk in requisition_ids if pk is not None]
+
+    if not requisition_ids:
+        return {}
+
+    deliveries = {
+        requisition_id: (males, females, count)
+        for requisition_id, males, females, count in Delivery.objects.filter(
+            requisition_id__in=requisition_ids
+        )
+        .values("requisition_id")
+        .annotate(
+            males=Sum("males", default=0),
+            females=Sum("females", default=0),
+            count=Count("id"),
+        )
+        .order_by()
+        .values_list("requisition_id", "males", "females", "count")
+    }
+
+    if not deliveries:
+        return {}
+
+    lookups = [field for _, fields in KEY_DIMENSIONS for field in fields]
+    rows = Requisition.objects.filter(id__in=list(deliveries)).values(
+        "id",
+        "date",
+        "males",
+        "females",
+        "delivered_males",
+        "delivered_females",
+        *lookups,
+    )
+    snapshots = {
+        row["id"]: {"row": row, "deliveries": deliveries[row["id"]], "tags": {}}
+        for row in rows
+    }
+
+    for requisition_id, tag_id, name in Requisition.tags.through.objects.filter(
+        requisition_id__in=list(snapshots)
+    ).values_list("requisition_id", "tag_id", "tag__name"):
+        snapshots[requisition_id]["tags"][tag_id] = name
+
+    return snapshots
+
+
+def snapshot_contribution(snapshot, delivered=None, tag_ids=None) -> dict:
+    """
+    The rollup buckets of a ``requisition_snapshots`` entry, optionally with
+    other delivered totals or tags.
+    """
+    row = snapshot["row"]
+    delivered = delivered or snapshot["deliveries"][:2]
+    tag_ids = snapshot["tags"] if tag_ids is None else tag_ids
+    counters = (1, row["males"], row["females"], *delivered)
+    contribution = {("by_total", None, row["date"]): counters}
+
+    for dimension, fields in KEY_DIMENSIONS:
+        key = rollup_key([row[field] for field in fields])
+        contribution[(dimension, key, row["date"])] = counters
+
+    for tag_id in tag_ids:
+        contribution[("by_tags", rollup_key((tag_id,)), row["date"])] = counters
+
+    return contribution
+
+
+def requisition_contributions(requisition_ids) -> dict:
+    return {
+        requisition_id: snapshot_contribution(snapshot)
+        for requisition_id, snapshot in requisition_snapshots(requisition_ids).items()
+    }
+
+
+def requisition_contribution(requisition_id) -> dict:
+    return requisition_contributions([requisition_id]).get(requisition_id, {})
+
+
+def merge_contributions(contributions) -> dict:
+    merged = {}
+
+    for contribution in contributions:
+        for bucket, counters in contribution.items():
+            current = merged.get(bucket, (0,) * len(ROLLUP_COUNTERS))
+            merged[bucket] = tuple(a + b for a, b in zip(current, counters))
+
+    return merged
+
+
+def apply_rollup_delta(before: dict, after: dict):
+    deltas = {}
+
+    for bucket in set(before) | set(after):
+        old = before.get(bucket, (0,) * len(ROLLUP_COUNTERS))
+        new = after.get(bucket, (0,) * len(ROLLUP_COUNTERS))
+        delta = dict(zip(ROLLUP_COUNTERS, (n - o for n, o in zip(new, old))))
+
+        if any(delta.values()):
+            deltas[bucket] = delta
+
+    if not deltas:
+        return
+
+    buckets = list(deltas)
+    existing = {}
+
+    # SQLite nests each OR one level deeper and caps the depth at 1000; the
+    # UPDATE follows the same batches to keep its CASE and parameters bounded.
+    for start in range(0, len(buckets), ROLLUP_BATCH):
+        lookup = Q()
+        for dimension, key, date in buckets[start : start + ROLLUP_BATCH]:
+            lookup |= Q(dimension=dimension, key=key, date=date)
+
+        existing.update(
+            ((dimension, key, date), pk)
+            for pk, dimension, key, date in StatisticsRollup.objects.filter(
+                lookup
+            ).values_list("pk", "dimension", "key", "date")
+        )
+
+    matched = list(existing.items())
+
+    for start in range(0, len(matched), ROLLUP_BATCH):
+        batch = matched[start : start + ROLLUP_BATCH]
+        StatisticsRollup.objects.filter(pk__in=[pk for _, pk in batch]).update(
+            **{
+                field: F(field)
+                + Case(
+                    *[
+                        When(pk=pk, then=Value(deltas[bucket][field]))
+                        for bucket, pk in batch
+                    ],
+                    default=Value(0),
+                )
+                for field in ROLLUP_COUNTERS
+            }
+        )
+
+    StatisticsRollup.objects.bulk_create(
+        [
+            StatisticsRollup(dimension=dimension, key=key, date=date, **delta)
+            for (dimension, key, date), delta in deltas.items()
+            if (dimension, key, date) not in existing
+        ]
+    )
+
+
+def begin_tracking(requisition):
+    if _is_tracked(requisition):
+        return None
+
+    _tracked_requisitions().append(requisition)
+    return requisition_contribution(requisition.pk)
+
+
+def end_tracking(requisition, before):
+    if before is None:
+        return
+
+    _untrack(requisition)
+    apply_rollup_delta(before, requisition_contribution(requisition.pk))
+
+
+def _pending_changes() -> dict:
+    if not hasattr(_state, "pending"):
+        _state.pending = {}
+
+    return _state.pending
+
+
+def begin_tags_change(instance, requisitions):
+    _pending_changes()[id(instance)] = [
+        (requisition, begin_tracking(requisition)) for requisition in requisitions
+    ]
+
+
+def end_tags_change(instance) -> list:
+    changes = _pending_changes().pop(id(instance), [])
+
+    for requisition, before in changes:
+        end_tracking(requisition, before)
+
+    return [requisition for requisition, _ in changes]
+
+
+def _pending_deletes() -> dict:
+    if not hasattr(_state, "deletes"):
+        _state.deletes = {}
+
+    return _state.deletes
+
+
+def begin_cascade_delete(origin, requisitions=(), deliveries=()):
+    """
+    Counts one pre_delete of the deletion started by ``origin`` and snapshots
+    the ``requisitions`` it cascades into that no outer write is tracking.
+    Cascades skip ``Requisition.delete`` and ``Delivery.delete``, so the
+    delete receivers take over their rollup bookkeeping and the delivered
+    counters of the cascaded ``deliveries``.
+    """
+    pending = _pending_deletes().get(id(origin))
+
+    if pending is None or pending["origin"] is not origin:
+        pending = _pending_deletes()[id(origin)] = {
+            "origin": origin,
+            "remaining": 0,
+            "requisitions": [],
+            "before": {},
+            "delivered": {},
+        }
+
+    pending["remaining"] += 1
+
+    for requisition_id, (males, females) in delivery_counts(deliveries).items():
+        delivered = pending["delivered"].get(requisition_id, (0, 0))
+        pending["delivered"][requisition_id] = (
+            delivered[0] + males,
+            delivered[1] + females,
+        )
+
+    requisitions = [
+        requisition for requisition in requisitions if not _is_tracked(requisition)
+    ]
+
+    if requisitions:
+        _tracked_requisitions().extend(requisitions)
+        before = requisition_contributions(
+            [requisition.pk for requisition in requisitions]
+        )
+        pending["requisitions"].extend(requisitions)
+        pending["before"] = merge_contributions([pending["before"], *before.values()])
+
+
+def end_cascade_delete(origin):
+    """
+    Applies the snapshot on the last post_delete of ``origin``. Deletion
+    order only follows non-nullable foreign keys, so the first post_delete
+    of the deleted model may come before the rows it cascaded into are gone.
+    """
+    pending = _pending_deletes().get(id(origin))
+
+    if pending is None or pending["origin"] is not origin:
+        return
+
+    pending["remaining"] -= 1
+
+    if pending["remaining"]:
+        return
+
+    del _pending_deletes()[id(origin)]
+    requisitions = pending["requisitions"]
+    delivered = pending["delivered"]
+
+    if delivered:
+        # Requisitions deleted by the same cascade took their counters along.
+        remaining = Requisition.objects.filter(pk__in=list(delivered)).values_list(
+            "pk", flat=True
+        )
+        delivered = {pk: delivered[pk] for pk in remaining}
+        apply_delivered_delta(delivered, {})
+
+        for requisition_id in delivered:
+            update_requisition_state(requisition_id)
+
+    if requisitions:
+        _untrack(*requisitions)
+        after = requisition_contributions(
+            [requisition.pk for requisition in requisitions]
+        )
+        apply_rollup_delta(pending["before"], merge_contributions(after.values()))
+
+
+@contextmanager
+def track_requisition(requisition):
+    with transaction.atomic():
+        before = begin_tracking(requisition)
+
+        try:
+            yield
+        except Exception:
+            _untrack(requisition)
+            raise
+
+        end_tracking(requisition, before)
+
+
+@contextmanager
+def track_new_delivery(delivery):
+    """
+    ``track_requisition`` for inserting ``delivery``, resolving the state of
+    its requisition on the way out. One snapshot, taken after the insert,
+    serves both: the contribution before the insert only lacks the delivery,
+    and the state reuses the snapshot's row instead of reading it again.
+    """
+    requisition = delivery.requisition
+
+    with transaction.atomic():
+        if _is_tracked(requisition):
+            yield
+            update_requisition_state(requisition.pk)
+            return
+
+        _tracked_requisitions().append(requisition)
+
+        try:
+            yield
+        finally:
+            _untrack(requisition)
+
+        snapshot = requisition_snapshots([requisition.pk])[requisition.pk]
+        flags = state_flags(snapshot["tags"].values())
+        state = update_requisition_state(requisition.pk, {**snapshot["row"], **flags})
+        tag_ids = snapshot["tags"]
+
+        if {current for current in STATE_TAGS if flags[current]} != {state}:
+            tag_ids = Requisition.tags.through.objects.filter(
+                requisition_id=requisition.pk
+            ).values_list("tag_id", flat=True)
+
+        males, females, count = snapshot["deliveries"]
+        before = {}
+
+        if count > 1:
+            before = snapshot_contribution(
+                snapshot, delivered=(males - delivery.males, females - delivery.females)
+            )
+
+        apply_rollup_delta(before, snapshot_contribution(snapshot, tag_ids=tag_ids))
+
+
+@contextmanager
+def track_requisitions(requisitions):
+    """
+    ``track_requisition`` for many requisitions, snapshotted together.
+    """
+    with transaction.atomic():
+        requisitions = [
+            requisition for requisition in requisitions if not _is_tracked(requisition)
+        ]
+        requisition_ids = [requisition.pk for requisition in requisitions]
+        _tracked_requisitions().extend(requisitions)
+        before = requisition_contributions(requisition_ids)
+
+        try:
+            yield
+        finally:
+            _untrack(*requisitions)
+
+        after = requisition_contributions(requisition_ids)
+        apply_rollup_delta(
+            merge_contributions(before.values()), merge_contributions(after.values())
+        )
+
+
+@contextmanager
+def track_key_change(instance, fields, lookup: Q, update_fields=None):
+    """
+    Tracks the requisitions matching ``lookup`` across a save of ``instance``
+    that moves any of ``fields``, foreign keys their rollups are keyed by.
+    Saves that leave those fields alone only cost reading them back.
+    """
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+
+    columns = [instance._meta.get_field(field).attname for field in fields]
+
+    with transaction.atomic():
+        stored = None
+
+        if columns and not instance._state.adding:
+            stored = (
+                type(instance)
+                ._base_manager.filter(pk=instance.pk)
+                .values_list(*columns)
+                .first()
+            )
+
+        if stored is None or stored == tuple(
+            getattr(instance, column) for column in columns
+        ):
+            yield
+            return
+
+        with track_requisitions(
+            Requisition.objects.filter(lookup).distinct().only("pk")
+        ):
+            yield
+
+
+def build_rollups(apps=global_apps) -> list:
+    """
+    Computes every rollup row from scratch. Migrations pass their historical
+    ``apps`` registry.
+    """
+    Delivery = apps.get_model("requisitions", "Delivery")
+    Requisition = apps.get_model("requisitions", "Requisition")
+    StatisticsRollup = apps.get_model("requisitions", "StatisticsRollup")
+
+    requisitions = Requisition.objects.filter(
+        id__in=Delivery.objects.order_by().values("requisition_id")
+    )
+    buckets = {}
+
+    total_rows = (
+        requisitions.order_by()
+        .values("date")
+        .annotate(
+            requisitions=Count("id"),
+            required_males=Sum("males", default=0),
+            required_females=Sum("females", default=0),
+        )
+        .values_list("date", "requisitions", "required_males", "required_females")
+    )
+    for date, count, males, females in total_rows:
+        buckets[("by_total", None, date)] = [count, males, females, 0, 0]
+
+    for dimension, fields in ROLLUP_DIMENSIONS:
+        size = len(fields)
+        rows = (
+            requisitions.order_by()
+            .values("date", *fields)
+            .annotate(
+                requisitions=Count("id", distinct=True),
+                required_males=Sum("males", default=0),
+                required_females=Sum("females", default=0),
+            )
+            .values_list(
+                "date", *fields, "requisitions", "required_males", "required_females"
+            )
+        )
+        for row in rows:
+            if dimension == "by_tags" and row[1] is None:
+                continue
+
+            key = rollup_key(row[1 : size + 1])
+            counters = buckets.setdefault((dimension, key, row[0]), [0] * 5)
+            for index, value in enumerate(row[size + 1 :]):
+                counters[index] += value
+
+    for dimension, fields in [("by_total", ())] + ROLLUP_DIMENSIONS:
+        size = len(fields)
+        lookups = ["requisition__date"] + [f"requisition__{field}" for field in fields]
+        rows = (
+            Delivery.objects.order_by()
+            .values(*lookups)
+            .annotate(
+                delivered_males=Sum("males", default=0),
+                delivered_females=Sum("females", default=0),
+            )
+            .values_list(*lookups, "delivered_males", "delivered_females")
+        )
+        for row in rows:
+            if dimension == "by_tags" and row[1] is None:
+                continue
+
+            key = rollup_key(row[1 : size + 1]) if size else None
+            counters = buckets.setdefault((dimension, key, row[0]), [0] * 5)
+            counters[3] += row[size + 1]
+            counters[4] += row[size + 2]
+
+    return [
+        StatisticsRollup(
+            dimension=dimension,
+            key=key,
+            date=date,
+            **dict(zip(ROLLUP_COUNTERS, counters)),
+        )
+        for (dimension, key, date), counters in buckets.items()
+    ]
+
+
+def rebuild_rollups(apps=global_apps) -> int:
+    StatisticsRollup = apps.get_model("requisitions", "StatisticsRollup")
+    rollups = build_rollups(apps)
+
+    with transaction.atomic():
+        StatisticsRollup.objects.all().delete()
+        StatisticsRollup.objects.bulk_create(rollups, batch_size=500)
+
+    return len(rollups)
+
+
+def rollup_rows(start_date=None, end_date=None):
+    queryset = StatisticsRollup.objects.all()
+
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+
+    return (
+        queryset.order_by()
+        .values("dimension", "key")
+        .annotate(**{f"sum_{field}": Sum(field) for field in ROLLUP_COUNTERS})
+        .filter(sum_requisitions__gt=0)
+        .order_by("dimension", "key")
+        .values_list(
+            "dimension", "key", *[f"sum_{field}" for field in ROLLUP_COUNTERS[1:]]
+        )
+    )
+
+
+def rollup_labels(rows) -> dict:
+    """
+    Maps each ``(dimension, key)`` of ``rows`` to the key ``generate_statistics``
+    reports for it, with one query per label table.
+    """
+    values = {}
+    ids = {}
+
+    for dimension, key in rows:
+        if dimension == "by_total":
+            continue
+
+        fields = dict(ROLLUP_DIMENSIONS)[dimension]
+        values[(dimension, key)] = parse_rollup_key(dimension, key)
+
+        for field, value in zip(fields, values[(dimension, key)]):
+            if field in LABEL_SOURCES and value is not None:
+                ids.setdefault(LABEL_SOURCES[field], set()).add(value)
+
+    names = {
+        (model, name): dict(
+            model.objects.filter(pk__in=pks).values_list("pk", name).order_by()
+        )
+        for (model, name), pks in ids.items()
+    }
+    labels = {}
+
+    for (dimension, key), parts in values.items():
+        fields = dict(ROLLUP_DIMENSIONS)[dimension]
+        labels[(dimension, key)] = format_dimension_key(
+            dimension,
+            tuple(
+                names.get(LABEL_SOURCES[field], {}).get(value)
+                if field in LABEL_SOURCES
+                else value
+                for field, value in zip(fields, parts)
+            ),
+        )
+
+    return labels
+
+
+def labeled_rollup_rows(start_date=None, end_date=None, chunk_size=None):
+    """
+    ``rollup_rows`` with the id keys replaced by their labels. With a
+    ``chunk_size`` the rows are streamed and labelled one chunk at a time.
+    """
+    rows = rollup_rows(start_date, end_date)
+
+    if chunk_size:
+        rows = rows.iterator(chunk_size=chunk_size)
+
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        labels = rollup_labels((dimension, key) for dimension, key, *_ in chunk)
+
+        for dimension, key, *counters in chunk:
+            label = labels.get((dimension, key))
+
+            if dimension == "by_tags" and label is None:
+                continue
+
+            yield (dimension, label, *counters)
+
+
+def statistics_from_rollups(start_date=None, end_date=None) -> dict:
+    data = {"by_total": empty_bucket()}
+    data.update({dimension: {} for dimension, _ in STATISTICS_DIMENSIONS})
+
+    for dimension, label, *counters in labeled_rollup_rows(start_date, end_date):
+        if dimension == "by_total":
+            data["by_total"] = dict(zip(ROLLUP_COUNTERS[1:], counters))
+            continue
+
+        # Distinct ids can share a label, as two advisors with one name do.
+        bucket = data[dimension].setdefault(label, empty_bucket())
+        for field, value in zip(ROLLUP_COUNTERS[1:], counters):
+            bucket[field] += value
+
+    return data
@@ -0,0 +1,110 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+
+SEARCH_TABLE = "requisitions_search"
+SEARCH_KINDS = {"projects": 0, "profiles": 1, "requisitions": 2, "deliveries": 3}
+SEARCH_LIMIT = 20
+SEARCH_WEIGHTS = (0.0, 10.0, 1.0)
+
+
+def build_match_query(text: str):
+    terms = re.findall(r"\w+", text or "")
+
+    if not terms:
+        return None
+
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search(text: str, kinds=None, limit: int = SEARCH_LIMIT) -> list:
+    """
+    Ranked full-text search over the FTS5 index kept by triggers (see the
+    ``0006_search_index`` migration). Matching is prefix based and accent
+    insensitive.
+    """
+    match = build_match_query(text)
+
+    if match is None:
+        return []
+
+    codes = [SEARCH_KINDS[kind] for kind in kinds or SEARCH_KINDS]
+    names = {code: kind for kind, code in SEARCH_KINDS.items()}
+    placeholders = ", ".join(["%s"] * len(codes))
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, key, title, "
+            f"snippet({SEARCH_TABLE}, 2, '[', ']', '…', 12), "
+            f"bm25({SEARCH_TABLE}, {weights}) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"AND (rowid & 3) IN ({placeholders}) ORDER BY rank LIMIT %s",
+            [match, *codes, limit],
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "type": names[rowid & 3],
+            "id": rowid >> 2,
+            "key": key,
+            "title": title,
+            "snippet": snippet,
+            "rank": rank,
+        }
+        for rowid, key, title, snippet, rank in rows
+    ]
+
+
+def match_ids(match: str, kind: str) -> RawSQL:
+    return RawSQL(
+        f"SELECT rowid >> 2 FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND (rowid & 3) = %s",
+        [match, SEARCH_KINDS[kind]],
+    )
+
+
+def match_rank(match: str, kind: str, model) -> RawSQL:
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+    pk = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+
+    return RawSQL(
+        f"SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = {pk} * 4 + %s",
+        [match, SEARCH_KINDS[kind]],
+    )
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ``?q=`` backed by the FTS5 index. The match runs as a subquery, so the
+    other filters, the counts and the cursor bounds see every match. Results
+    keep the relevance order unless the request asks for an explicit
+    ``ordering``.
+    """
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param)
+
+        if not text:
+            return queryset
+
+        match = build_match_query(text)
+
+        if match is None:
+            return queryset.none()
+
+        queryset = queryset.filter(pk__in=match_ids(match, view.search_kind))
+
+        if "ordering" in request.query_params:
+            return queryset
+
+        return queryset.order_by(
+            match_rank(match, view.search_kind, queryset.model).asc(), "-pk"
+        )
@@ -0,0 +1,104 @@
+from django.db.models import Sum
+
+from ..models import Requisition
+
+
+STATISTICS_DIMENSIONS = [
+    ("by_protocol", ("protocol",)),
+    ("by_institute", ("project__advisor__institute__abbreviation",)),
+    (
+        "by_department",
+        (
+            "project__advisor__department__name",
+            "project__advisor__institute__abbreviation",
+        ),
+    ),
+    ("by_advisor", ("project__advisor__name",)),
+    ("by_author", ("project__author__name",)),
+    ("by_project", ("project__title",)),
+    ("by_tags", ("tags__name",)),
+]
+
+
+def empty_bucket() -> dict:
+    return {
+        "required_males": 0,
+        "required_females": 0,
+        "delivered_males": 0,
+        "delivered_females": 0,
+    }
+
+
+def format_dimension_key(dimension: str, values: tuple):
+    if dimension == "by_department":
+        department, institute = values
+        return f"{department} ({institute})"
+
+    return values[0]
+
+
+def _sum(field: str):
+    return Sum(field, default=0)
+
+
+def _grouped_rows(queryset, lookups: list):
+    return (
+        queryset.order_by()
+        .values(*lookups)
+        .annotate(males_sum=_sum("males"), females_sum=_sum("females"))
+        .order_by(*lookups)
+        .values_list(*lookups, "males_sum", "females_sum")
+    )
+
+
+def generate_statistics(deliveries) -> dict:
+    requisitions = Requisition.objects.filter(
+        id__in=deliveries.order_by().values("requisition_id")
+    )
+
+    data = {"by_total": empty_bucket()}
+
+    required_total = requisitions.order_by().aggregate(
+        males=_sum("males"), females=_sum("females")
+    )
+    delivered_total = deliveries.order_by().aggregate(
+        males=_sum("males"), females=_sum("females")
+    )
+    data["by_total"]["required_males"] = required_total["males"]
+    data["by_total"]["required_females"] = required_total["females"]
+    data["by_total"]["delivered_males"] = delivered_total["males"]
+    data["by_total"]["delivered_females"] = delivered_total["females"]
+
+    for dimension, fields in STATISTICS_DIMENSIONS:
+        buckets = data.setdefault(dimension, {})
+        size = len(fields)
+
+        for row in _grouped_rows(requisitions, list(fields)):
+            if dimension == "by_tags" and row[0] is None:
+                continue
+
+            key = format_dimension_key(dimension, row[:size])
+            bucket = buckets.setdefault(key, empty_bucket())
+            bucket["required_males"] += row[size]
+            bucket["required_females"] += row[size + 1]
+
+        lookups = [f"requisition__{field}" for field in fields]
+
+        for row in _grouped_rows(deliveries, lookups):
+            if dimension == "by_tags" and row[0] is None:
+                continue
+
+            key = format_dimension_key(dimension, row[:size])
+            bucket = buckets.setdefault(key, empty_bucket())
+            bucket["delivered_males"] += row[size]
+            bucket["delivered_females"] += row[size + 1]
+
+    return data
+
+
+def statistics_rows(data: dict):
+    yield ("by_total", None, *data["by_total"].values())
+
+    for dimension, _ in STATISTICS_DIMENSIONS:
+        for key, bucket in data[dimension].items():
+            yield (dimension, key, *bucket.values())
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from requisitions.models import Delivery, Project, Requisition
+from users.models import Profile
+
+
+STRESS_USERNAME = "stress-database"
+
+
+@contextmanager
+def profile_database(profile: str):
+    """
+    Registers a temporary database alias that uses connection ``profile``
+    (see ``settings.DATABASE_PROFILES``) on a snapshot of the default
+    database, and removes both on exit.
+    """
+    source = connections[DEFAULT_DB_ALIAS].settings_dict
+    handle, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+
+    with sqlite3.connect(source["NAME"]) as origin, sqlite3.connect(path) as copy:
+        origin.backup(copy)
+
+    alias = f"stress-{profile}"
+    config = {
+        "ENGINE": source["ENGINE"],
+        "NAME": path,
+        **settings.DATABASE_PROFILES[profile],
+    }
+    connections.settings[alias] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: config}
+    )[DEFAULT_DB_ALIAS]
+
+    try:
+        yield alias
+    finally:
+        connections[alias].close()
+        del connections.settings[alias]
+
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def stress_requisition(alias: str) -> int:
+    """
+    Returns a requisition to attach the writes to, creating a minimal one
+    directly in ``alias`` when the snapshot has none.
+    """
+    requisition_id = (
+        Requisition.objects.using(alias).values_list("pk", flat=True).first()
+    )
+
+    if requisition_id is not None:
+        return requisition_id
+
+    user = User.objects.db_manager(alias).create_user(STRESS_USERNAME)
+    profile = Profile.objects.using(alias).create(user=user, name=STRESS_USERNAME)
+    project = Project.objects.using(alias).bulk_create(
+        [
+            Project(
+                title=STRESS_USERNAME,
+                slug=STRESS_USERNAME,
+                ceua_protocol="0",
+                author=profile,
+                advisor=profile,
+            )
+        ]
+    )[0]
+    requisition = Requisition.objects.using(alias).bulk_create(
+        [
+            Requisition(
+                protocol="0.0",
+                date=date.today(),
+                project=project,
+                author=profile,
+            )
+        ]
+    )[0]
+
+    return requisition.pk
+
+
+def write_delivery(alias: str, requisition_id: int):
+    # Read-then-write, like DeliveryViewSet.create: with a deferred BEGIN the
+    # lock upgrade fails at once when another writer holds it.
+    with transaction.atomic(using=alias):
+        Requisition.objects.using(alias).filter(pk=requisition_id).values(
+            "males"
+        ).first()
+        Delivery.objects.using(alias).bulk_create(
+            [Delivery(date=date.today(), requisition_id=requisition_id, males=1)]
+        )
+        Requisition.objects.using(alias).filter(pk=requisition_id).update(
+            last_updated=timezone.now()
+        )
+
+
+def read_dashboard(alias: str):
+    deliveries = Delivery.objects.using(alias).filter(is_active=True)
+    deliveries.aggregate(males=Sum("males"), count=Count("pk"))
+    list(deliveries.order_by("-timestamp")[:25])
+
+
+def run_stress(alias: str, writers: int, readers: int, duration: float) -> dict:
+    """
+    Runs ``writers`` + ``readers`` threads against ``alias`` for
+    ``duration`` seconds. Each operation is followed by the same
+    connection cleanup Django does at the end of a request, so
+    ``CONN_MAX_AGE`` is exercised too.
+    """
+    requisition_id = stress_requisition(alias)
+    connections[alias].close()
+    totals = {"writes": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(kind, operation):
+        done = errors = 0
+
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    operation()
+                    done += 1
+                except OperationalError:
+                    errors += 1
+                finally:
+                    connections[alias].close_if_unusable_or_obsolete()
+        finally:
+            connections[alias].close()
+
+            with lock:
+                totals[f"{kind}s"] += done
+                totals[f"{kind}_errors"] += errors
+
+    threads = [
+        threading.Thread(
+            target=worker, args=("write", lambda: write_delivery(alias, requisition_id))
+        )
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=worker, args=("read", lambda: read_dashboard(alias)))
+        for _ in range(readers)
+    ]
+    started = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+    attempts = sum(totals.values())
+    errors = totals["write_errors"] + totals["read_errors"]
+
+    return {
+        **totals,
+        "writes_per_second": totals["writes"] / elapsed,
+        "reads_per_second": totals["reads"] / elapsed,
+        "error_rate": errors / attempts if attempts else 0.0,
+    }
@@ -0,0 +1,61 @@
+import threading
+
+from ..models import Tag
+from .cache import bump_data_version, get_data_version
+from .utils import generate_unique_slugs
+
+
+TAGS_VERSION_NAME = "tags"
+
+
+class TagRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._version = None
+
+    def refresh(self) -> dict:
+        version = get_data_version(TAGS_VERSION_NAME)
+
+        if version != self._version:
+            ids = dict(Tag.objects.values_list("name", "id"))
+
+            with self._lock:
+                self._ids, self._version = ids, version
+
+        return self._ids
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+        bump_data_version(TAGS_VERSION_NAME)
+
+    def resolve(self, names) -> dict:
+        names = list(dict.fromkeys(name for name in names if name))
+        ids = self.refresh()
+        missing = [name for name in names if name not in ids]
+
+        if missing:
+            Tag.objects.bulk_create(
+                [
+                    Tag(name=name, slug=slug)
+                    for name, slug in zip(missing, generate_unique_slugs(Tag, missing))
+                ],
+                ignore_conflicts=True,
+            )
+            created = dict(
+                Tag.objects.filter(name__in=missing).values_list("name", "id")
+            )
+
+            for name in missing:
+                if name not in created:
+                    created[name] = Tag.objects.get_or_create(name=name)[0].id
+
+            self.invalidate()
+            ids = {**ids, **created}
+
+        return {name: ids[name] for name in names}
+
+
+tag_registry = TagRegistry()
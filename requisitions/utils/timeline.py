@@ -0,0 +1,232 @@
+import base64
+import binascii
+
+from django.db.models import Exists, OuterRef, Q, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import _positive_int
+from rest_framework.utils.urls import replace_query_param
+
+from core.pagination import TimestampCursorPagination
+from core.querysets import plan_queryset
+
+from ..models import Delivery, Event, Status
+from ..serializers import DeliverySerializer, EventSerializer, StatusSerializer
+
+
+# Entry type -> (model, row condition, serializer). The types are ordered
+# alphabetically because the type breaks ties between rows of different
+# tables that share a timestamp.
+TIMELINE_SOURCES = {
+    "delivery": (Delivery, Q(is_active=True), DeliverySerializer),
+    "event": (Event, Q(), EventSerializer),
+    "status": (Status, Q(), StatusSerializer),
+}
+
+TIMELINE_ORDER = ["-timestamp", "-type", "-id"]
+
+
+def has_every_entry_type() -> Q:
+    """Requisitions whose timeline has at least one entry of each type."""
+    return Q(
+        *(
+            Exists(model.objects.filter(condition, requisition=OuterRef("pk")))
+            for model, condition, _ in TIMELINE_SOURCES.values()
+        )
+    )
+
+
+def keyset_condition(kind: str, position) -> Q:
+    """
+    Rows of ``kind`` that come after ``position`` in ``TIMELINE_ORDER``.
+    The type is constant within a table, so the tie-breaker collapses into
+    a plain range over the ``(requisition, timestamp, id)`` index.
+    """
+    timestamp, position_kind, pk = position
+
+    if kind < position_kind:
+        return Q(timestamp__lte=timestamp)
+
+    if kind > position_kind:
+        return Q(timestamp__lt=timestamp)
+
+    # The redundant upper bound lets the index range stop at the cursor.
+    return Q(timestamp__lte=timestamp) & (Q(timestamp__lt=timestamp) | Q(id__lt=pk))
+
+
+def timeline_queryset(requisition_id: int, position=None, since=None):
+    """
+    ``(timestamp, type, id)`` of every status, event and active delivery of
+    a requisition, newest first, as one ``UNION ALL``. Each arm is a
+    search on its table's ``(requisition, timestamp, id)`` index, and the
+    cursor and ``since`` bounds are applied inside the arms.
+    """
+    arms = []
+
+    for kind, (model, condition, _) in TIMELINE_SOURCES.items():
+        queryset = model.objects.filter(condition, requisition_id=requisition_id)
+
+        if since is not None:
+            queryset = queryset.filter(timestamp__gt=since)
+
+        if position is not None:
+            queryset = queryset.filter(keyset_condition(kind, position))
+
+        arms.append(
+            queryset.annotate(type=Value(kind)).values_list("timestamp", "type", "id")
+        )
+
+    first, *others = arms
+
+    return first.union(*others, all=True).order_by(*TIMELINE_ORDER)
+
+
+def timeline_serializer(serializer_class, instance, context: dict):
+    serializer = serializer_class(instance, many=True, context=context)
+    # Entries always render in full: ``?fields=`` describes the requisition.
+    serializer.child._field_trees = (None, None)
+
+    return serializer
+
+
+def serialize_timeline(rows: list, context: dict) -> list:
+    """
+    Loads the objects behind ``rows`` with one query per type and renders
+    them in timeline order.
+    """
+    data = {}
+
+    for kind, (model, _, serializer_class) in TIMELINE_SOURCES.items():
+        ids = [pk for _, row_kind, pk in rows if row_kind == kind]
+
+        if not ids:
+            continue
+
+        serializer = timeline_serializer(serializer_class, None, context)
+        objects = list(plan_queryset(model.objects.filter(pk__in=ids), serializer))
+        serializer = timeline_serializer(serializer_class, objects, context)
+
+        for instance, item in zip(objects, serializer.data):
+            data[(kind, instance.pk)] = item
+
+    timestamp_field = serializers.DateTimeField()
+
+    return [
+        {
+            "type": kind,
+            "timestamp": timestamp_field.to_representation(timestamp),
+            "data": data[(kind, pk)],
+        }
+        for timestamp, kind, pk in rows
+    ]
+
+
+class TimelinePagination(TimestampCursorPagination):
+    """
+    Keyset pagination over a requisition's timeline, newest first. The
+    cursor carries the entry type besides ``(timestamp, id)``; ``?since=``
+    stops the stream at a moment the client has already seen.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+    since_query_param = "since"
+    latest_query_param = "timeline"
+
+    def encode_cursor(self, timestamp, kind, pk) -> str:
+        position = f"{timestamp.isoformat()}|{kind}|{pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, value: str):
+        if not value:
+            return None
+
+        try:
+            timestamp, kind, pk = (
+                base64.urlsafe_b64decode(value.encode()).decode().split("|")
+            )
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if timestamp is None or kind not in TIMELINE_SOURCES:
+            raise NotFound(self.invalid_cursor_message)
+
+        return timestamp, kind, pk
+
+    def get_since(self, request):
+        value = request.query_params.get(self.since_query_param)
+
+        if value is None:
+            return None
+
+        # An unescaped "+" in the offset arrives as a space.
+        since = parse_datetime(value.replace(" ", "+"))
+
+        if since is None:
+            raise ValidationError({self.since_query_param: "Data e hora inválidas."})
+
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+        return since
+
+    def get_latest_size(self, request) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.latest_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except ValueError:
+            raise ValidationError(
+                {self.latest_query_param: "Informe um número inteiro positivo."}
+            )
+
+    def timeline_page(self, requisition_id: int, page_size: int, position, since):
+        rows = list(timeline_queryset(requisition_id, position, since)[: page_size + 1])
+        self.next_position = None
+
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_position = rows[-1]
+
+        return rows
+
+    def paginate_timeline(self, requisition_id: int, request) -> list:
+        self.request = request
+        self.cursor_mode = True
+        position = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param, "")
+        )
+
+        return self.timeline_page(
+            requisition_id,
+            self.get_page_size(request),
+            position,
+            self.get_since(request),
+        )
+
+    def latest_timeline(self, requisition_id: int, request) -> list:
+        """
+        The newest ``?timeline=N`` entries, for the detail endpoint.
+        """
+        self.request = request
+        self.cursor_mode = True
+
+        return self.timeline_page(
+            requisition_id, self.get_latest_size(request), None, None
+        )
+
+    def get_next_cursor_link(self, url=None):
+        if self.next_position is None:
+            return None
+
+        return replace_query_param(
+            url or self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(*self.next_position),
+        )
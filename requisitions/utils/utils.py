@@ -1,14 +1,82 @@
-import random
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
 
-def generate_slug(text: str, slug_max_length:int):
+SLUG_SUFFIX_LENGTH = 7
+SLUG_SAVE_ATTEMPTS = 5
+SLUG_PREFIX_BATCH = 500
+
+
+def generate_slug(text: str, slug_max_length: int):
     return slugify(text)[:slug_max_length]
 
 
-def generate_unique_slug(text: str, random_suffix_length: int = 6, slug_max_length: int = 50) -> str:
-    random_suffix = ''.join([str(random.randint(0, 9)) for _ in range(random_suffix_length)])
-    slug = generate_slug(text, slug_max_length)[:slug_max_length-random_suffix_length+1]
+def slug_candidate(base: str, counter: int, slug_max_length: int) -> str:
+    if counter == 1:
+        return base
+
+    suffix = f"-{counter}"
+    return f"{base[:slug_max_length - len(suffix)].rstrip('-')}{suffix}"
+
+
+def generate_unique_slugs(model, texts, field: str = "slug") -> list:
+    """
+    Returns one free slug per text (``base``, ``base-2``, ``base-3``...) using
+    one prefix query per ``SLUG_PREFIX_BATCH`` distinct stems. The unique
+    index still decides under concurrency; see ``save_with_unique_slug``.
+    """
+    slug_max_length = model._meta.get_field(field).max_length
+    stem_length = slug_max_length - SLUG_SUFFIX_LENGTH
+    bases = [
+        generate_slug(text, slug_max_length) or model._meta.model_name for text in texts
+    ]
+    stems = sorted({base[:stem_length].rstrip("-") for base in bases})
+
+    if not stems:
+        return []
+
+    taken = set()
+
+    # SQLite nests each OR one level deeper and caps the depth at 1000.
+    for start in range(0, len(stems), SLUG_PREFIX_BATCH):
+        prefixes = Q()
+        for stem in stems[start : start + SLUG_PREFIX_BATCH]:
+            prefixes |= Q(**{f"{field}__startswith": stem})
+
+        taken.update(model.objects.filter(prefixes).values_list(field, flat=True))
+
+    slugs = []
+
+    for base in bases:
+        counter = 1
+        while slug_candidate(base, counter, slug_max_length) in taken:
+            counter += 1
+
+        slug = slug_candidate(base, counter, slug_max_length)
+        taken.add(slug)
+        slugs.append(slug)
+
+    return slugs
+
+
+def generate_unique_slug(model, text: str, field: str = "slug") -> str:
+    return generate_unique_slugs(model, [text], field)[0]
+
+
+def save_with_unique_slug(instance, text: str, save, *args, **kwargs):
+    model = type(instance)
+    assigned = not instance.slug
+
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        if assigned:
+            instance.slug = generate_unique_slug(model, text)
+
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            taken = model.objects.filter(slug=instance.slug).exclude(pk=instance.pk)
 
-    return f'{slug}-{random_suffix}'
-                        
\ No newline at end of file
+            if not assigned or attempt == SLUG_SAVE_ATTEMPTS - 1 or not taken.exists():
+                raise
@@ -1,12 +1,18 @@
+from django.conf import settings
+from django.db.models import Count, Max
 from django_filters import rest_framework as django_filters
 from rest_framework import viewsets, status, filters
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.parsers import MultiPartParser
+from rest_framework.views import APIView
 
 
 from .models import (
+    REQUISITION_OPTIONS,
     Requisition,
     Event,
     Status,
@@ -25,14 +31,56 @@ from .serializers import (
     StatisticsSerializer,
 )
 
+from .utils.bulk import bulk_create_deliveries
+from .utils.cache import cache_info, get_or_compute
+from .utils.export import (
+    DELIVERY_EXPORT_FIELDS,
+    DELIVERY_EXPORT_HEADER,
+    EXPORT_CHUNK_SIZE,
+    STATISTICS_EXPORT_HEADER,
+    export_response,
+)
+from .utils.fulfillment import RECEIVED, STATE_TAGS, outstanding
+from .utils.imports import import_type_for, read_rows, run_import
+from .utils.rollups import labeled_rollup_rows, statistics_from_rollups
+from .utils.search import SEARCH_KINDS, SEARCH_LIMIT, FullTextSearchFilter, search
+from .utils.statistics import generate_statistics, statistics_rows
+from .utils.tags import tag_registry
+from .utils.timeline import TimelinePagination, serialize_timeline
+
+from core.pagination import TimestampCursorPagination
+from core.views import ConditionalGetMixin, DynamicFieldsViewSetMixin
 from users.models import Profile
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def import_response(request, kind: str) -> Response:
+    upload = request.FILES.get("file")
+
+    if upload is None:
+        raise ValidationError("Envie um arquivo no campo 'file'.")
+
+    import_type = request.query_params.get("type") or import_type_for(upload.name)
+    dry_run = request.query_params.get("dry_run", "").lower() in ["1", "true"]
+    report = run_import(kind, read_rows(upload.file, import_type), dry_run=dry_run)
+
+    if dry_run:
+        response_status = status.HTTP_200_OK
+    elif report["created"] == report["total"]:
+        response_status = status.HTTP_201_CREATED
+    elif report["created"]:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+
+    return Response(report, status=response_status)
+
+
+class ProjectViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
-    filter_backends = [SearchFilter]
+    filter_backends = [SearchFilter, FullTextSearchFilter]
     parser_classes = [MultiPartParser]
     search_fields = ["title"]
+    search_kind = "projects"
     lookup_field = "slug"
 
     def get_queryset(self):
@@ -85,11 +133,110 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return Response(project_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_rows(self, request):
+        return import_response(request, "projects")
+
+
+class RequisitionFilter(django_filters.FilterSet):
+    """
+    List filters on the requisition columns. ``DeliveryFilter`` reuses them
+    through ``requisition_prefix``; every filter has an index behind it (see
+    ``check_query_plans``).
+    """
+
+    requisition_prefix = ""
+
+    status = django_filters.ChoiceFilter(
+        field_name="current_status",
+        choices=REQUISITION_OPTIONS,
+        method="filter_requisition",
+    )
+    tags = django_filters.BaseInFilter(field_name="any", method="filter_tags")
+    tags_all = django_filters.BaseInFilter(field_name="all", method="filter_tags")
+    project = django_filters.CharFilter(
+        field_name="project__slug", method="filter_requisition"
+    )
+    advisor = django_filters.NumberFilter(
+        field_name="project__advisor", method="filter_requisition"
+    )
+    author = django_filters.NumberFilter(
+        field_name="author", method="filter_requisition"
+    )
+    institute = django_filters.NumberFilter(
+        field_name="project__advisor__institute", method="filter_requisition"
+    )
+    department = django_filters.NumberFilter(
+        field_name="project__advisor__department", method="filter_requisition"
+    )
+    start_date = django_filters.DateFilter(field_name="date", lookup_expr="gte")
+    end_date = django_filters.DateFilter(field_name="date", lookup_expr="lte")
+    created_after = django_filters.IsoDateTimeFilter(
+        field_name="timestamp", lookup_expr="gte"
+    )
+    created_before = django_filters.IsoDateTimeFilter(
+        field_name="timestamp", lookup_expr="lte"
+    )
+    outstanding = django_filters.BooleanFilter(method="filter_outstanding")
+
+    class Meta:
+        model = Requisition
+        fields = []
+
+    def filter_requisition(self, queryset, name, value):
+        return queryset.filter(**{f"{self.requisition_prefix}{name}": value})
+
+    def filter_tags(self, queryset, name, value):
+        # IN (subquery) rather than EXISTS: the tag index bounds both the
+        # page and the count to the tagged requisitions.
+        slugs = set(value)
+        links = Requisition.tags.through.objects.filter(tag__slug__in=slugs)
+
+        if name == "all":
+            links = (
+                links.values("requisition_id")
+                .annotate(matched=Count("tag_id"))
+                .filter(matched=len(slugs))
+            )
+
+        return queryset.filter(
+            **{f"{self.requisition_prefix}pk__in": links.values("requisition_id")}
+        )
+
+    def filter_outstanding(self, queryset, name, value):
+        condition = outstanding(self.requisition_prefix)
+
+        return queryset.filter(condition if value else ~condition)
+
 
-class DeliveryViewSet(viewsets.ModelViewSet):
+class DeliveryFilter(RequisitionFilter):
+    requisition_prefix = "requisition__"
+
+    class Meta:
+        model = Delivery
+        fields = []
+
+
+class DeliveryExportFilter(django_filters.FilterSet):
+    start_date = django_filters.DateFilter(field_name="date", lookup_expr="gte")
+    end_date = django_filters.DateFilter(field_name="date", lookup_expr="lte")
+
+    class Meta:
+        model = Delivery
+        fields = ["start_date", "end_date"]
+
+
+class DeliveryViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = DeliverySerializer
-    filter_backends = [OrderingFilter]
+    pagination_class = TimestampCursorPagination
+    filter_backends = [
+        django_filters.DjangoFilterBackend,
+        FullTextSearchFilter,
+        OrderingFilter,
+    ]
+    filterset_class = DeliveryFilter
     ordering_fields = ["timestamp"]
+    search_kind = "deliveries"
 
     def get_queryset(self):
         queryset = Delivery.objects.filter(is_active=True)
@@ -100,11 +247,11 @@ class DeliveryViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
-        instance.update_tags()
+
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def create(self, request, *args, **kwargs):
-        author_instance = Profile.objects.get(user__username=request.user)
+        author_instance = request.user.profile
         requisition_protocol = request.data.get("requisition")
         requisition_instance = Requisition.objects.get(protocol=requisition_protocol)
         deliver_serializer = DeliverySerializer(data=request.data)
@@ -120,11 +267,65 @@ class DeliveryViewSet(viewsets.ModelViewSet):
 
         return Response(deliver_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        items = request.data
+
+        if isinstance(items, dict):
+            items = items.get("deliveries")
+
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Envie uma lista de entregas.")
+
+        author_instance = request.user.profile
+        results = bulk_create_deliveries(items, author_instance)
+        created = sum(1 for result in results if "id" in result)
+
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {"created": created, "results": results}, status=response_status
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        filterset = DeliveryExportFilter(
+            request.query_params, queryset=self.get_queryset(), request=request
+        )
+
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        rows = filterset.qs.values_list(*DELIVERY_EXPORT_FIELDS).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+
+        return export_response(
+            DELIVERY_EXPORT_HEADER,
+            rows,
+            request.query_params.get("type", "csv"),
+            "entregas",
+        )
+
 
-class RequisitionViewSet(viewsets.ModelViewSet):
+class RequisitionViewSet(
+    ConditionalGetMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet
+):
     serializer_class = RequisitionSerializer
-    filter_backends = [OrderingFilter]
-    ordering_fields = ["timestamp"]
+    pagination_class = TimestampCursorPagination
+    filter_backends = [
+        django_filters.DjangoFilterBackend,
+        FullTextSearchFilter,
+        OrderingFilter,
+    ]
+    filterset_class = RequisitionFilter
+    ordering_fields = ["timestamp", "fulfillment_ratio"]
+    search_kind = "requisitions"
     lookup_field = "protocol"
     lookup_value_regex = r"[0-9]+\.[0-9]+"
     http_method_names = ["get", "post", "put", "patch", "delete"]
@@ -135,16 +336,83 @@ class RequisitionViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def wants_timeline(self) -> bool:
+        return (
+            self.action == "retrieve"
+            and TimelinePagination.latest_query_param in self.request.query_params
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["timeline"] = self.request is not None and self.wants_timeline()
+
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.wants_timeline():
+            return super().retrieve(request, *args, **kwargs)
+
+        paginator = TimelinePagination()
+        paginator.get_latest_size(request)
+        response = super().retrieve(request, *args, **kwargs)
+
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        requisition = response.data.serializer.instance
+        rows = paginator.latest_timeline(requisition.pk, request)
+        url = replace_query_param(
+            self.reverse_action("timeline", args=[requisition.protocol]),
+            paginator.page_size_query_param,
+            len(rows),
+        )
+        response.data["timeline"] = {
+            "next": paginator.get_next_cursor_link(url),
+            "results": serialize_timeline(rows, self.get_serializer_context()),
+        }
+
+        return response
+
+    def get_validator_state(self, queryset) -> dict:
+        if self.action != "timeline":
+            return super().get_validator_state(queryset)
+
+        # The protocol is unique, so the same aggregate yields the id the
+        # timeline is read by.
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count("pk"),
+            requisition_id=Max("pk"),
+        )
+        self.timeline_requisition_id = state.pop("requisition_id")
+
+        return state
+
+    @action(detail=True, methods=["get"])
+    def timeline(self, request, protocol=None):
+        queryset = self.get_queryset().filter(protocol=protocol)
+
+        return self.conditional_response(request, queryset, self.timeline_response)
+
+    def timeline_response(self, request):
+        if self.timeline_requisition_id is None:
+            raise NotFound()
+
+        paginator = TimelinePagination()
+        rows = paginator.paginate_timeline(self.timeline_requisition_id, request)
+
+        return paginator.get_paginated_response(
+            serialize_timeline(rows, self.get_serializer_context())
+        )
+
     def create(self, request, *args, **kwargs):
         project_id = request.data.get("project").split("-")[-1]
         project_instance = Project.objects.get(id=project_id)
         author_instance = Profile.objects.get(id=project_instance.author.id)
         requisition_serializer = RequisitionSerializer(data=request.data)
-
-        received_tag, _ = Tag.objects.get_or_create(name="Recebida")
-        tags = [received_tag] + [
-            Tag.objects.get_or_create(name=tag)[0] for tag in request.data.get("tags")
-        ]
+        tags = tag_registry.resolve(
+            [STATE_TAGS[RECEIVED], *(request.data.get("tags") or [])]
+        ).values()
 
         if requisition_serializer.is_valid(raise_exception=True):
             requisition_instance = requisition_serializer.save(
@@ -162,9 +430,19 @@ class RequisitionViewSet(viewsets.ModelViewSet):
             requisition_serializer.errors, status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_rows(self, request):
+        return import_response(request, "requisitions")
+
 
-class RequisitionEventViewSet(viewsets.ModelViewSet):
+class RequisitionEventViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = EventSerializer
+    pagination_class = TimestampCursorPagination
     filter_backends = [OrderingFilter]
     ordering_fields = ["timestamp"]
 
@@ -172,7 +450,7 @@ class RequisitionEventViewSet(viewsets.ModelViewSet):
         user = self.request.user
 
         if user.is_staff:
-            return Event.objects.all()
+            return Event.objects.order_by("-timestamp")
 
         else:
             raise PermissionDenied(
@@ -180,16 +458,17 @@ class RequisitionEventViewSet(viewsets.ModelViewSet):
             )
 
 
-class RequisitionStatusViewSet(viewsets.ModelViewSet):
+class RequisitionStatusViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = StatusSerializer
+    pagination_class = TimestampCursorPagination
     filter_backends = [OrderingFilter]
     ordering_fields = ["timestamp"]
 
     def get_queryset(self):
-        return Status.objects.all()
+        return Status.objects.order_by("-timestamp")
 
 
-class RequisitionTagViewSet(viewsets.ModelViewSet):
+class RequisitionTagViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = TagSerializer
     pagination_class = None
 
@@ -212,7 +491,7 @@ class StatisticsFilter(django_filters.FilterSet):
         fields = ["start_date", "end_date"]
 
 
-class StatisticsViewSet(viewsets.ModelViewSet):
+class StatisticsViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = StatisticsSerializer
     filter_backends = [django_filters.DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = StatisticsFilter
@@ -224,176 +503,92 @@ class StatisticsViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-    def generate_statistics(self, queryset): 
-        data = {
-            "by_total": {
-                "required_males": 0,
-                "required_females": 0,
-                "delivered_males": 0,
-                "delivered_females": 0,
-            },
-            "by_protocol": {},
-            "by_institute": {},
-            "by_department": {},
-            "by_advisor": {},
-            "by_author": {},
-            "by_project": {},
-            "by_tags": {},
-        }
+    def generate_statistics(self, queryset):
+        return generate_statistics(queryset)
+
+    def compute_statistics(self, filterset):
+        if settings.STATISTICS_USE_ROLLUPS:
+            return statistics_from_rollups(
+                filterset.form.cleaned_data.get("start_date"),
+                filterset.form.cleaned_data.get("end_date"),
+            )
 
-        for query in queryset:
-            protocol = query.requisition.protocol
-            institute = query.requisition.project.advisor.institute
-            department = query.requisition.project.advisor.department
-            advisor = query.requisition.project.advisor
-            author = query.requisition.project.author
-            project = query.requisition.project
-
-            mapping = {
-                "by_protocol": protocol,
-                "by_institute": institute.abbreviation,
-                "by_department": f"{department.name} ({institute.abbreviation})",
-                "by_advisor": advisor.name,
-                "by_author": author.name,
-                "by_project": project.title,
-            }
-            for key, value in zip(mapping.keys(), mapping.values()):
-                if not value in data[key]:
-                    data[key][value] = {
-                        "required_males": 0,
-                        "required_females": 0,
-                        "delivered_males": 0,
-                        "delivered_females": 0,
-                    }
-
-            for tag in query.requisition.tags.all():
-                data["by_tags"][tag.name] = {
-                    "required_males": 0,
-                    "required_females": 0,
-                    "delivered_males": 0,
-                    "delivered_females": 0,
-                }
-
-        processed = []
-
-        for query in queryset:
-            protocol = query.requisition.protocol
-            institute = query.requisition.project.advisor.institute
-            department = query.requisition.project.advisor.department
-            advisor = query.requisition.project.advisor
-            author = query.requisition.project.author
-            project = query.requisition.project
-
-            if protocol not in processed:
-                data["by_protocol"][protocol][
-                    "required_males"
-                ] += query.requisition.males
-                data["by_protocol"][protocol][
-                    "required_females"
-                ] += query.requisition.females
-
-                data["by_institute"][institute.abbreviation][
-                    "required_males"
-                ] += query.requisition.males
-                data["by_institute"][institute.abbreviation][
-                    "required_females"
-                ] += query.requisition.females
-
-                data["by_department"][
-                    f"{department.name} ({institute.abbreviation})"
-                ]["required_males"] += query.requisition.males
-                data["by_department"][
-                    f"{department.name} ({institute.abbreviation})"
-                ]["required_females"] += query.requisition.females
-
-                data["by_advisor"][advisor.name][
-                    "required_males"
-                ] += query.requisition.males
-                data["by_advisor"][advisor.name][
-                    "required_females"
-                ] += query.requisition.females
-
-                data["by_author"][author.name][
-                    "required_males"
-                ] += query.requisition.males
-                data["by_author"][author.name][
-                    "required_females"
-                ] += query.requisition.females
-
-                data["by_project"][project.title][
-                    "required_males"
-                ] += query.requisition.males
-                data["by_project"][project.title][
-                    "required_females"
-                ] += query.requisition.females
-
-                for tag in query.requisition.tags.all():
-                    data["by_tags"][tag.name][
-                        "required_males"
-                    ] += query.requisition.males
-                    data["by_tags"][tag.name][
-                        "required_females"
-                    ] += query.requisition.females
-
-                data["by_total"]["required_males"] += query.requisition.males
-                data["by_total"]["required_females"] += query.requisition.females
-
-            data["by_protocol"][protocol][
-                "delivered_males"
-            ] += query.males
-            data["by_protocol"][protocol][
-                "delivered_females"
-            ] += query.females
-
-
-            data["by_institute"][institute.abbreviation][
-                "delivered_males"
-            ] += query.males
-            data["by_institute"][institute.abbreviation][
-                "delivered_females"
-            ] += query.females
-
-            data["by_department"][f"{department.name} ({institute.abbreviation})"][
-                "delivered_males"
-            ] += query.males
-            data["by_department"][f"{department.name} ({institute.abbreviation})"][
-                "delivered_females"
-            ] += query.females
-
-            data["by_advisor"][advisor.name][
-                "delivered_males"
-            ] += query.males
-            data["by_advisor"][advisor.name][
-                "delivered_females"
-            ] += query.females
-
-            data["by_author"][author.name][
-                "delivered_males"
-            ] += query.males
-            data["by_author"][author.name][
-                "delivered_females"
-            ] += query.females
-
-            data["by_project"][project.title][
-                "delivered_males"
-            ] += query.males
-            data["by_project"][project.title][
-                "delivered_females"
-            ] += query.females
-
-            data["by_total"]["delivered_males"] += query.males
-            data["by_total"]["delivered_females"] += query.females
-
-            for tag in query.requisition.tags.all():
-                data["by_tags"][tag.name]["delivered_males"] += query.males
-                data["by_tags"][tag.name]["delivered_females"] += query.females
-
-            processed.append(protocol)
-
-        return data
+        return self.generate_statistics(filterset.qs)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        data = self.generate_statistics(queryset)
+        queryset = self.get_queryset()
+        filterset = self.filterset_class(
+            request.query_params, queryset=queryset, request=request
+        )
+
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        params = {
+            **filterset.form.cleaned_data,
+            "ordering": filters.OrderingFilter().get_ordering(request, queryset, self),
+            "rollups": settings.STATISTICS_USE_ROLLUPS,
+        }
+        data, hit = get_or_compute(
+            "statistics", params, lambda: self.compute_statistics(filterset)
+        )
+
+        response = Response(data)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+
+        return response
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset(), request=request
+        )
+
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        if settings.STATISTICS_USE_ROLLUPS:
+            rows = labeled_rollup_rows(
+                filterset.form.cleaned_data.get("start_date"),
+                filterset.form.cleaned_data.get("end_date"),
+                chunk_size=EXPORT_CHUNK_SIZE,
+            )
+        else:
+            rows = statistics_rows(self.generate_statistics(filterset.qs))
+
+        return export_response(
+            STATISTICS_EXPORT_HEADER,
+            rows,
+            request.query_params.get("type", "csv"),
+            "estatisticas",
+        )
+
+    @action(detail=False, methods=["get"])
+    def cache(self, request):
+        return Response(cache_info())
+
+
+class SearchView(APIView):
+    max_limit = 100
+
+    def get(self, request, format=None):
+        kinds = [
+            kind for kind in request.query_params.get("type", "").split(",") if kind
+        ]
+        unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+
+        if unknown:
+            raise ValidationError({"type": f"Tipos inválidos: {', '.join(unknown)}."})
+
+        try:
+            limit = int(request.query_params.get("limit", SEARCH_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Informe um número inteiro."})
+
+        results = search(
+            request.query_params.get("q", ""),
+            kinds or None,
+            max(1, min(limit, self.max_limit)),
+        )
 
-        return Response(data)
+        return Response({"count": len(results), "results": results})
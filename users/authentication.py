@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+TOKEN_CACHE_PREFIX = "token"
+
+
+def token_cache():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key: str) -> str:
+    return f"{TOKEN_CACHE_PREFIX}:{key}"
+
+
+def get_token_user(key: str):
+    """
+    Returns the user owning ``key`` with its profile already joined, or
+    ``None``. Hits are served from a bounded TTL cache, without touching the
+    database; see ``users.signals`` for the invalidation rules.
+    """
+    cache = token_cache()
+    user = cache.get(token_cache_key(key))
+
+    if user is None:
+        token = Token.objects.select_related("user__profile").filter(key=key).first()
+
+        if token is None:
+            return None
+
+        user = token.user
+        cache.set(token_cache_key(key), user, settings.AUTH_TOKEN_CACHE_TTL)
+
+    return user
+
+
+async def aget_token_user(key: str):
+    """
+    Async counterpart of ``get_token_user`` sharing the same cache entries.
+    """
+    cache = token_cache()
+    user = await cache.aget(token_cache_key(key))
+
+    if user is None:
+        token = (
+            await Token.objects.select_related("user__profile").filter(key=key).afirst()
+        )
+
+        if token is None:
+            return None
+
+        user = token.user
+        await cache.aset(token_cache_key(key), user, settings.AUTH_TOKEN_CACHE_TTL)
+
+    return user
+
+
+def invalidate_token(key: str):
+    token_cache().delete(token_cache_key(key))
+
+
+def invalidate_user_tokens(user_id):
+    keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+    token_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        user = get_token_user(key)
+
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        return (user, key)
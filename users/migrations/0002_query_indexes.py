@@ -0,0 +1,16 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(fields=["name", "is_hidden"], name="profile_name_idx"),
+        ),
+    ]
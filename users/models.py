@@ -44,5 +44,21 @@ class Profile(models.Model):
     phone = models.CharField(max_length=25, null=True, blank=True)
     is_hidden = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=["name", "is_hidden"], name="profile_name_idx")]
+
     def __str__(self):
         return f"{self.name} - {self.institute}/{self.department}"
+
+    def save(self, *args, **kwargs):
+        from requisitions.utils.rollups import track_key_change
+
+        # Statistics group requisitions by the institute and department of
+        # their project's advisor.
+        with track_key_change(
+            self,
+            ["institute", "department"],
+            models.Q(project__advisor=self.pk),
+            kwargs.get("update_fields"),
+        ):
+            super().save(*args, **kwargs)
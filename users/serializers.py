@@ -1,26 +1,28 @@
 from rest_framework import serializers
-from rest_framework.authtoken.models import Token
 
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 
+from core.serializers import DynamicFieldsMixin
+
+from .authentication import get_token_user
 from .models import Profile, Institute, Department
 
 
-class InstituteSerializer(serializers.ModelSerializer):
+class InstituteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Institute
         fields = "__all__"
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     institute = InstituteSerializer(read_only=True)
     class Meta:
         model = Department
         fields = "__all__"
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -44,7 +46,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     institute = InstituteSerializer(read_only=True)
     department = DepartmentSerializer(read_only=True)
@@ -74,6 +76,8 @@ class TokenValidationSerializer(serializers.Serializer):
 
     def validate(self, data):
         request_token = data.get("token")
-        token_query = Token.objects.get(key=request_token)
 
-        return token_query
+        if get_token_user(request_token) is None:
+            raise serializers.ValidationError("Token inválido.")
+
+        return request_token
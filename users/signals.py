@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .models import Profile
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_profile_tokens(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.user_id)
@@ -1,5 +1,12 @@
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
 from django.test import TestCase
 from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
 from .models import Institute, Department, Profile
@@ -129,3 +136,102 @@ class ProfileViewSetTestCase(TestCase):
         serializer = ProfileSerializer(profiles, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        caches["tokens"].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        self.profile = Profile.objects.create(user=self.user, name="Test User")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_token_lookup_is_cached_with_profile(self):
+        self.assertEqual(self.client.get("/api/tags/").status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tags/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user.profile, self.profile)
+
+    def test_cache_is_invalidated_on_deactivation(self):
+        self.client.get("/api/tags/")
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get("/api/tags/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cache_is_invalidated_on_token_deletion(self):
+        self.client.get("/api/tags/")
+        self.token.delete()
+
+        response = self.client.get("/api/tags/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revocation_reaches_workers_sharing_the_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory.name,
+        }
+        cached_elsewhere = mock.patch(
+            "users.authentication.token_cache",
+            return_value=FileBasedCache(directory.name, {}),
+        )
+
+        with self.settings(CACHES={**settings.CACHES, "tokens": shared}):
+            with cached_elsewhere:
+                self.assertEqual(
+                    self.client.get("/api/tags/").status_code, status.HTTP_200_OK
+                )
+
+            self.user.is_active = False
+            self.user.save()
+
+            with cached_elsewhere:
+                response = self.client.get("/api/tags/")
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+            self.user.is_active = True
+            self.user.save()
+
+            with cached_elsewhere:
+                self.client.get("/api/tags/")
+
+            self.token.delete()
+
+            with cached_elsewhere:
+                response = self.client.get("/api/tags/")
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_changes_only_drop_their_users_tokens(self):
+        other_token = Token.objects.create(
+            user=User.objects.create_user(username="other")
+        )
+        other_client = APIClient()
+        other_client.credentials(HTTP_AUTHORIZATION=f"Token {other_token.key}")
+        self.client.get("/api/tags/")
+        other_client.get("/api/tags/")
+
+        self.profile.name = "Outro Nome"
+        self.profile.save()
+
+        # The edited user's token is loaded again; the other one stays cached.
+        with self.assertNumQueries(2):
+            self.client.get("/api/tags/")
+
+        with self.assertNumQueries(1):
+            other_client.get("/api/tags/")
+
+    def test_verify_token(self):
+        response = self.client.post("/verify-token/", {"token": self.token.key})
+        self.assertTrue(response.data["is_token_valid"])
+
+        response = self.client.post("/verify-token/", {"token": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
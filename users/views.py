@@ -11,6 +11,9 @@ from rest_framework.filters import OrderingFilter
 
 from django.contrib.auth.models import User
 
+from core.views import DynamicFieldsViewSetMixin
+from requisitions.utils.search import FullTextSearchFilter
+
 from .models import Profile, Institute, Department
 from .serializers import (
     UserAuthenticationSerializer,
@@ -23,7 +26,7 @@ from .serializers import (
 from .utils.utils import generate_random_password, generate_random_username
 
 
-class InstituteViewSet(viewsets.ModelViewSet):
+class InstituteViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Institute.objects.all()
     serializer_class = InstituteSerializer
     filter_backends = [SearchFilter]
@@ -31,7 +34,7 @@ class InstituteViewSet(viewsets.ModelViewSet):
     pagination_class = None
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     filter_backends = [SearchFilter]
@@ -58,11 +61,12 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         return Response(department_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = ProfileSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
+    filter_backends = [SearchFilter, FullTextSearchFilter, OrderingFilter]
     search_fields = ["name"]
     ordering_fields = ["name"] 
+    search_kind = "profiles"
 
     def get_queryset(self):
         queryset = Profile.objects.all().exclude(is_hidden=True)
@@ -140,7 +144,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
         return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(Profile.objects.all().exclude(is_hidden=True))
+        queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(queryset)
 
@@ -183,16 +187,14 @@ class TokenVerifierView(APIView):
 
         if serializer.is_valid(raise_exception=True):
             token = serializer.validated_data
-            fetched_token = Token.objects.filter(key=token).first()
-
-            if fetched_token:
-                return Response(
-                    {
-                        "success": True,
-                        "message": "Token válido.",
-                        "is_token_valid": True,
-                        "token": fetched_token.key,
-                    }
-                )
+
+            return Response(
+                {
+                    "success": True,
+                    "message": "Token válido.",
+                    "is_token_valid": True,
+                    "token": token,
+                }
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)